@@ -0,0 +1,322 @@
+"""
+    Benchmark suite of the builders and the handlers, used to catch performance regressions between versions.
+
+    Synthetic inputs are generated from the parameters of the run:
+        - a properties file of C{width} sections holding C{width} options each, with labels of C{label_size}
+        characters and one dynamic option per section;
+        - a set of C{entries} dynamic sections per dynamic option;
+        - a menu of C{depth} levels of C{width} sections for the navigation (properties files only describe
+        2 levels). Only the first section of each level has sub sections, so the menu holds C{depth * width}
+        sections whatever its depth.
+
+    Each benchmark runs in its own process so that its peak memory (C{ru_maxrss}) is its own, and is timed
+    C{repeat} times, its fastest run being kept: slower runs mostly measure the rest of the system. The peak
+    memory is reported once its inputs are ready (C{setup_rss}) and at its end (C{peak_rss}):
+        - C{build_cold}: L{PropertiesMenuBuilder.build<simple_menu.builders.PropertiesMenuBuilder.
+        PropertiesMenuBuilder.build>} parsing the properties file.
+        - C{build_warm}: the same build loading the L{snapshot<simple_menu.builders.MenuSnapshot.
+        MenuSnapshot>} of the properties file.
+        - C{build_flat}: L{PropertiesMenuBuilder.build_flat<simple_menu.builders.PropertiesMenuBuilder.
+        PropertiesMenuBuilder.build_flat>} with the snapshot.
+        - C{walk}: a long random walk of L{MenuHandler<simple_menu.handlers.MenuHandler.MenuHandler>}
+        C{next/previous/forward/back} moves on the synthetic menu.
+        - C{walk_flat}: the same walk on the flat copy of the synthetic menu.
+
+    Results are printed and can be saved as JSON; a saved result can then be compared with a new run, runs
+    slower than the threshold being reported as regressions (non zero exit status).
+
+    Usage:
+        python benchmarks/benchmark_suite.py [--width W] [--depth D] [--label-size L] [--entries E]
+                                             [--moves M] [--repeat R] [--only NAME ...]
+                                             [--output results.json] [--compare baseline.json]
+                                             [--threshold 0.1]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from timeit import default_timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+from simple_menu.handlers.MenuHandler import MenuHandler
+
+
+FORMAT = 3
+""" Version of the format of the saved results; results of different formats are not compared. """
+
+OPERATIONS = (['next'] * 4) + (['previous'] * 4) + ['forward', 'back']
+""" Mostly up/down moves, as on a device, with a few moves in and out of the sections. """
+
+
+def make_label(rnd, label_size):
+    return u''.join(rnd.choice(u'abcdefghijklmnopqrstuvwxyz \xe9') for _ in xrange(label_size)).strip() or u'x'
+
+
+def write_properties(properties_file, width, label_size, seed=0):
+    """
+        Writes a synthetic properties file of L{width} sections holding L{width} options each (plus one
+        dynamic option named C{dynamic<section index>}).
+    """
+    rnd = random.Random(seed)
+    lines = []
+    for section_idx in xrange(width):
+        lines.append(u'[section %d]' % (section_idx,))
+        for option_idx in xrange(width):
+            lines.append(u'option%d.label = %s' % (option_idx, make_label(rnd, label_size),))
+            lines.append(u'option%d.callback = CALLBACK%d' % (option_idx, option_idx % 8,))
+        lines.append(u'dynamic%d.dynamic = true' % (section_idx,))
+    lines.append(u'[default_settings]')
+    lines.append(u'callback = ROOT')
+    with open(properties_file, 'w') as f:
+        f.write(u'\n'.join(lines).encode('utf-8'))
+
+
+def make_dynamic_sections(width, entries, label_size, seed=0):
+    """
+        Returns the synthetic dynamic sections of the properties file written by L{write_properties}.
+    """
+    rnd = random.Random(seed)
+    return dict(('dynamic%d' % (section_idx,),
+                 [(make_label(rnd, label_size), 'CALLBACK%d' % (idx % 8,)) for idx in xrange(entries)],)
+                for section_idx in xrange(width))
+
+
+def make_script(moves, seed=0):
+    rnd = random.Random(seed)
+    return [rnd.choice(OPERATIONS) for _ in xrange(moves)]
+
+
+def bench_build(params, work_dir, use_snapshot, flat=False):
+    properties_file = os.path.join(work_dir, 'menu.properties')
+    dynamic_sections = make_dynamic_sections(params['width'], params['entries'], params['label_size'])
+    if use_snapshot: # the snapshot is written beforehand, by another builder
+        PropertiesMenuBuilder(properties_file, use_snapshot=True).build(dynamic_sections)
+    builder = PropertiesMenuBuilder(properties_file, use_snapshot=use_snapshot)
+    build = builder.build_flat if flat else builder.build
+    setup_rss = get_peak_rss()
+
+    def run():
+        start = default_timer()
+        build(dynamic_sections)
+        return default_timer() - start
+
+    return min(run() for _ in xrange(params['repeat'])), 1, setup_rss
+
+
+def bench_walk(params, work_dir, flat=False):
+    menu = build_walk_menu(params['depth'], params['width'])
+    if flat:
+        template = AbstractMenuBuilder.Template(tuple(to_template(s) for s in menu.sections), menu.callback)
+        menu = FlatMenu(template, {})
+    script = make_script(params['moves'])
+    setup_rss = get_peak_rss()
+
+    def run():
+        handler = MenuHandler(menu, {'ROOT': lambda: None})
+        for _ in xrange(params['depth'] - 1): # start from the deepest level
+            handler.forward()
+        start = default_timer()
+        for operation in script:
+            getattr(handler, operation)()
+        return default_timer() - start
+
+    return min(run() for _ in xrange(params['repeat'])), len(script), setup_rss
+
+
+def build_walk_menu(depth, width):
+    """
+        Returns a menu of L{depth} levels of L{width} sections in which only the first section of each level
+        has sub sections.
+
+        @rtype: AbstractMenuBuilder.Menu
+    """
+    Section = AbstractMenuBuilder.Section
+    sections = None
+    for level in xrange(depth, 0, -1):
+        sections = tuple(Section('s%d.%d' % (level, idx,),
+                                 'Label %d.%d' % (level, idx,),
+                                 None,
+                                 sections if idx == 0 else None) for idx in xrange(width))
+    return AbstractMenuBuilder.Menu(sections, 'ROOT')
+
+
+def to_template(section):
+    """
+        Returns the template node of the given L{section}.
+    """
+    return (section.name,
+            section.label,
+            section.callback,
+            None if section.sections is None else tuple(to_template(s) for s in section.sections),)
+
+
+def get_peak_rss():
+    """
+        Returns the peak memory of this process: kilobytes on Linux, bytes on OS X.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+BENCHMARKS = (
+    ('build_cold', lambda params, work_dir: bench_build(params, work_dir, False),),
+    ('build_warm', lambda params, work_dir: bench_build(params, work_dir, True),),
+    ('build_flat', lambda params, work_dir: bench_build(params, work_dir, True, flat=True),),
+    ('walk', lambda params, work_dir: bench_walk(params, work_dir),),
+    ('walk_flat', lambda params, work_dir: bench_walk(params, work_dir, flat=True),),
+)
+""" Benchmarks by name, in run order. """
+
+
+def run_one(name, params, work_dir):
+    """
+        Runs the benchmark L{name} in this process and returns its result.
+
+        @rtype: DictType
+    """
+    duration, operations, setup_rss = dict(BENCHMARKS)[name](params, work_dir)
+    return {'seconds': duration,
+            'us_per_op': duration * 1e6 / operations,
+            'setup_rss': setup_rss,
+            'peak_rss': get_peak_rss()}
+
+
+def run_suite(params, names):
+    """
+        Runs the given benchmarks, each one in its own process, and returns the results of the suite.
+
+        @rtype: DictType
+    """
+    work_dir = tempfile.mkdtemp(prefix='simple_menu_benchmark')
+    try:
+        write_properties(os.path.join(work_dir, 'menu.properties'), params['width'], params['label_size'])
+        results = {}
+        for name in names:
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                              '--run', name,
+                                              '--params', json.dumps(params),
+                                              '--work-dir', work_dir])
+            results[name] = json.loads(output)
+    finally:
+        shutil.rmtree(work_dir)
+
+    return {'format': FORMAT,
+            'version': git_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'params': params,
+            'results': results}
+
+
+def git_version():
+    """
+        Returns the description of the checked out version of the repository, if any.
+    """
+    try:
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(['git', 'describe', '--always', '--dirty'],
+                                           cwd=os.path.dirname(os.path.abspath(__file__)),
+                                           stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_suite(suite):
+    print 'version=%s python=%s %s' % (suite['version'], suite['python'],
+                                       ' '.join('%s=%s' % item for item in sorted(suite['params'].iteritems())),)
+    for name, _ in BENCHMARKS:
+        if name in suite['results']:
+            result = suite['results'][name]
+            print '%-12s %10.2f ms %10.3f us/op %10d setup rss %10d peak rss' % (name,
+                                                                                 result['seconds'] * 1000,
+                                                                                 result['us_per_op'],
+                                                                                 result['setup_rss'],
+                                                                                 result['peak_rss'],)
+
+
+def compare(baseline, suite, threshold):
+    """
+        Prints the comparison of the given L{suite} results with the L{baseline} ones.
+
+        @return: the names of the benchmarks slower than the baseline by more than the L{threshold} ratio.
+        @rtype: ListType
+    """
+    if baseline.get('format') != suite['format']:
+        raise ValueError('Baseline format %s cannot be compared with format %s.' % (baseline.get('format'),
+                                                                                    suite['format'],))
+    if baseline['params'] != suite['params']:
+        print 'warning: the baseline was run with other parameters: %s' % (baseline['params'],)
+
+    regressions = []
+    print 'compared with version=%s' % (baseline['version'],)
+    for name, _ in BENCHMARKS:
+        if name not in suite['results'] or name not in baseline['results']:
+            continue
+        before = baseline['results'][name]
+        after = suite['results'][name]
+        ratio = after['seconds'] / before['seconds'] - 1
+        memory_ratio = float(after['peak_rss']) / before['peak_rss'] - 1
+        regressed = ratio > threshold
+        if regressed:
+            regressions.append(name)
+        print '%-12s time %+7.1f%%   peak rss %+7.1f%%%s' % (name, ratio * 100, memory_ratio * 100,
+                                                             '   REGRESSION' if regressed else '',)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite of simple_menu.')
+    parser.add_argument('--width', type=int, default=8, help='sections per level and options per section')
+    parser.add_argument('--depth', type=int, default=8, help='levels of the navigation menu')
+    parser.add_argument('--label-size', type=int, default=24, help='characters per label')
+    parser.add_argument('--entries', type=int, default=1000, help='dynamic sections per dynamic option')
+    parser.add_argument('--moves', type=int, default=100000, help='moves of the random walks')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per benchmark, the fastest being kept')
+    parser.add_argument('--only', nargs='+', choices=[name for name, _ in BENCHMARKS], help='benchmarks to run')
+    parser.add_argument('--output', help='file the results are saved to, as JSON')
+    parser.add_argument('--compare', help='results file saved by a former run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1, help='slow down ratio reported as regression')
+    # internal: runs one benchmark in a child process
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    parser.add_argument('--params', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print json.dumps(run_one(args.run, json.loads(args.params), args.work_dir))
+        return 0
+
+    params = {'width': args.width,
+              'depth': args.depth,
+              'label_size': args.label_size,
+              'entries': args.entries,
+              'moves': args.moves,
+              'repeat': args.repeat}
+    suite = run_suite(params, args.only or [name for name, _ in BENCHMARKS])
+    print_suite(suite)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(suite, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, suite, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
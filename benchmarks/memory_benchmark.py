@@ -0,0 +1,78 @@
+"""
+    Compares the memory used and the time taken to build a large menu as a tree of L{sections<simple_menu.
+    builders.AbstractMenuBuilder.AbstractMenuBuilder.Section>} and as a L{flat menu<simple_menu.builders.
+    FlatMenu.FlatMenu>}.
+
+    Usage: python benchmarks/memory_benchmark.py [dynamic entries]
+"""
+from array import array
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+
+
+PROPERTIES = u"""[tracks]
+tracks.dynamic = true
+[settings]
+volume.label = Volume
+volume.callback = VOLUME
+[default_settings]
+callback = SHUTDOWN
+"""
+
+
+def deep_size(obj):
+    """
+        Returns the size in bytes of L{obj} and of all the objects it references, each object being counted
+        once.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, FlatMenu):
+            stack.append(vars(o))
+        elif isinstance(o, (tuple, list,)):
+            stack.extend(o)
+        elif isinstance(o, dict):
+            stack.extend(o.iterkeys())
+            stack.extend(o.itervalues())
+        elif not isinstance(o, (basestring, array, int, long, float,)) and o is not None:
+            raise TypeError('unexpected object %r' % (o,))
+    return size
+
+
+def main(entries=100000):
+    fd, properties_file = tempfile.mkstemp(suffix='.properties')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+
+        builder = PropertiesMenuBuilder(properties_file)
+        dynamic_sections = {'tracks': [(u'Track number %d' % idx, 'PLAY') for idx in xrange(entries)]}
+
+        print 'dynamic entries=%d' % (entries,)
+        for name, build in (('tree', builder.build,), ('flat', builder.build_flat,),):
+            duration = min(timeit.repeat(lambda: build(dynamic_sections), number=1, repeat=3))
+            size = deep_size(build(dynamic_sections))
+            print '%-5s build %8.1f ms   size %8.1f KiB   %6.1f bytes/entry' % (name,
+                                                                               duration * 1000,
+                                                                               size / 1024.0,
+                                                                               float(size) / entries,)
+    finally:
+        os.remove(properties_file)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
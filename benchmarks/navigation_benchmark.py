@@ -0,0 +1,156 @@
+"""
+    Micro benchmark of the navigation of L{MenuHandler<simple_menu.handlers.MenuHandler.MenuHandler>}.
+
+    It compares the current handler, which keeps the parents of its current location, with a copy of the
+    former handler which walked the menu from its root on every move.
+
+    Usage: python benchmarks/navigation_benchmark.py [depth] [width] [moves]
+"""
+import collections
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.handlers.MenuHandler import MenuHandler
+
+
+class WalkingMenuHandler(object):
+    """
+        Navigation of the former L{MenuHandler}: every move walks the menu from its root.
+    """
+
+    def __init__(self, menu, callbacks=None):
+        self.__menu = menu
+        self.__callbacks = callbacks
+        self.__current_location = collections.deque()
+        self.__current_location.append(0)
+
+    def back(self):
+        if len(self.__current_location) > 1:
+            self.__current_location.pop()
+            use_callback = False
+        else:
+            use_callback = True
+
+        return self.get_current_location(use_callback)
+
+    def forward(self):
+        section = self.__get_location(self.__menu.sections, iter(self.__current_location))
+        if section.sections is not None:
+            use_callback = False
+            self.__current_location.append(0)
+        else:
+            use_callback = True
+
+        return self.get_current_location(use_callback)
+
+    def next(self):
+        parent_section = self.__get_parent_current_location()
+
+        if parent_section.sections is not None:
+            current_idx = self.__current_location.pop()
+            next_idx = current_idx + 1
+
+            if len(parent_section.sections) == next_idx:
+                next_idx = 0
+
+            self.__current_location.append(next_idx)
+
+        return self.get_current_location()
+
+    def previous(self):
+        parent_section = self.__get_parent_current_location()
+        if parent_section.sections is not None:
+            current_idx = self.__current_location.pop()
+
+            if current_idx == 0:
+                current_idx = len(parent_section.sections)
+
+            self.__current_location.append(current_idx - 1)
+
+        return self.get_current_location()
+
+    def get_current_location(self, use_callback=False):
+        if len(self.__current_location) == 1 and use_callback:
+            section = self.__menu
+        else:
+            section = self.__get_location(self.__menu.sections, iter(self.__current_location))
+
+        if use_callback and section.callback is not None:
+            return self.__callbacks[section.callback]()
+
+        if section.label is not None:
+            return section.label
+
+        return section.name
+
+    def __get_parent_current_location(self,):
+        if len(self.__current_location) <= 1:
+            return self.__menu
+
+        last_index = len(self.__current_location) - 2
+
+        section = self.__menu
+        for idx, loc in enumerate(self.__current_location):
+            section = section.sections[loc]
+            if last_index == idx:
+                return section
+
+    def __get_location(self, sections, location_iterator):
+        idx = next(location_iterator)
+
+        try:
+            return self.__get_location(sections[idx].sections, location_iterator)
+        except StopIteration:
+            return sections[idx]
+
+
+def build_menu(depth, width):
+    """
+        Returns a menu of the given L{depth} where every section holds L{width} sub sections.
+
+        @rtype: AbstractMenuBuilder.Menu
+    """
+    Section = AbstractMenuBuilder.Section
+
+    def build_sections(level, prefix):
+        return tuple(Section('%s.%d' % (prefix, idx,),
+                             'Label %s.%d' % (prefix, idx,),
+                             None,
+                             build_sections(level + 1, '%s.%d' % (prefix, idx,)) if level < depth else None)
+                     for idx in xrange(width))
+
+    return AbstractMenuBuilder.Menu(build_sections(1, 's'), 'ROOT')
+
+
+def main(depth=8, width=4, moves=20000):
+    menu = build_menu(depth, width)
+    rnd = random.Random(0)
+    # mostly up/down moves, as on a device, with a few moves in and out of the sections
+    operations = (['next'] * 4) + (['previous'] * 4) + ['forward', 'back']
+    script = [rnd.choice(operations) for _ in xrange(moves)]
+
+    def run(handler_class):
+        handler = handler_class(menu, {'ROOT': lambda: None})
+        # start from the deepest level
+        for _ in xrange(depth - 1):
+            handler.forward()
+        for operation in script:
+            getattr(handler, operation)()
+
+    results = collections.OrderedDict()
+    for handler_class in (WalkingMenuHandler, MenuHandler,):
+        results[handler_class.__name__] = min(timeit.repeat(lambda: run(handler_class), number=1, repeat=5))
+
+    print 'depth=%d width=%d moves=%d' % (depth, width, moves,)
+    for name, duration in results.iteritems():
+        print '%-20s %8.2f ms %8.2f us/move' % (name, duration * 1000, duration * 1e6 / moves,)
+    print 'speedup: %.1fx' % (results['WalkingMenuHandler'] / results['MenuHandler'],)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,91 @@
+"""
+    Load benchmark of the L{menu server<simple_menu.servers.MenuServer.MenuServer>}.
+
+    Random navigation commands are sent for many sessions, first dispatched in process and then over a local
+    TCP socket by several client connections, each one pipelining the commands of its share of the
+    sessions. The number of commands per second sustained is reported for both.
+
+    Usage: python benchmarks/server_benchmark.py [sessions] [commands] [connections]
+"""
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from navigation_benchmark import build_menu
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.RateLimiter import RateLimiter
+from simple_menu.handlers.SessionMenuHandler import SessionMenuHandler
+from simple_menu.servers.MenuServer import MenuServer
+
+
+COMMANDS = (['next'] * 4) + (['previous'] * 4) + ['forward', 'back']
+""" Mostly up/down moves, as on a device, with a few moves in and out of the sections. """
+
+PIPELINE = 64
+""" Number of requests sent by a client connection before reading the responses. """
+
+
+def build_script(sessions, commands, seed=0):
+    rnd = random.Random(seed)
+    return [('s%d' % rnd.randrange(sessions), rnd.choice(COMMANDS),) for _ in xrange(commands)]
+
+
+def run_client(address, script, errors):
+    sock = socket.create_connection(address)
+    try:
+        rfile = sock.makefile('rb')
+        for start in xrange(0, len(script), PIPELINE):
+            chunk = script[start:start + PIPELINE]
+            sock.sendall(''.join('%s %s\n' % request for request in chunk))
+            for _ in chunk:
+                if not rfile.readline().startswith('OK'):
+                    errors.append(1)
+    finally:
+        sock.close()
+
+
+def main(sessions=5000, commands=200000, connections=8):
+    handler = SessionMenuHandler(build_menu(4, 8),
+                                 {'ROOT': CachedCallback(lambda: 'root', ttl=1)},
+                                 rate_limiter=RateLimiter({'ROOT': (100, 10)}))
+    print 'sessions=%d commands=%d connections=%d' % (sessions, commands, connections,)
+
+    server = MenuServer(handler, ('127.0.0.1', 0))
+    script = build_script(sessions, commands)
+    start = time.time()
+    for session, command in script:
+        server.dispatch(session, command)
+    duration = time.time() - start
+    print 'in process: %9.0f commands/s' % (commands / duration,)
+
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    try:
+        # each connection drives its own sessions
+        scripts = [[] for _ in xrange(connections)]
+        for session, command in build_script(sessions, commands, seed=1):
+            scripts[hash(session) % connections].append((session, command,))
+
+        errors = []
+        clients = [threading.Thread(target=run_client, args=(server.server_address, s, errors,)) for s in scripts]
+        start = time.time()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        duration = time.time() - start
+        print 'socket:     %9.0f commands/s (%d errors, %d sessions)' % (commands / duration,
+                                                                        len(errors),
+                                                                        server.session_count,)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -12,6 +12,7 @@ class AbstractMenuBuilder(object):
                                         (
                                        'sections',
                                         'callback',
+                                        'dynamic',
                                         )
                                   )
     """
@@ -20,6 +21,31 @@ class AbstractMenuBuilder(object):
             - sections: tuple of L{sections<AbstractMenuBuilder.Section>}
             - callback: single function to be executed without parameters. This is a function to run for this
             level.
+            - dynamic: (optional) tuple of L{locations<AbstractMenuBuilder.DynamicLocation>} of the
+            L{dynamic<AbstractMenuBuilder.DYNAMIC>} sections of this menu. It is used to
+            L{update<AbstractMenuBuilder.update_dynamic_sections>} them without a full rebuild. Lazily fetched
+            dynamic sections have no location, they are refreshed through L{PagedSections.invalidate
+            <simple_menu.builders.PagedSections.PagedSections.invalidate>}.
+    """
+    Menu.__new__.__defaults__ = (None,)
+
+    DynamicLocation = collections.namedtuple('DynamicLocation',
+                                             (
+                                              'opt_name',
+                                              'path',
+                                              'start',
+                                              'count',
+                                              )
+                                             )
+    """
+        Location of the sections generated for one L{dynamic<AbstractMenuBuilder.DYNAMIC>} option in a
+        L{menu<AbstractMenuBuilder.Menu>}.
+        Properties of the location:
+            - opt_name: name of the dynamic option.
+            - path: tuple of indexes leading from L{AbstractMenuBuilder.Menu.sections} to the section holding
+            the dynamic sections.
+            - start: index of the first dynamic section in its parent's sections.
+            - count: number of dynamic sections.
     """
 
     Section = collections.namedtuple(
@@ -47,6 +73,23 @@ class AbstractMenuBuilder(object):
         will be dynamically filled in at runtime.
     """
 
+    Template = collections.namedtuple('Template',
+                                      (
+                                       'roots',
+                                       'callback',
+                                       )
+                                      )
+    """
+        Intermediate, fully parsed form of a menu from which L{menus<AbstractMenuBuilder.Menu>} are
+        L{built<AbstractMenuBuilder._build_menu>}. It only holds builtin types (tuples, strings and C{None})
+        so it can be stored as is by a L{snapshot<simple_menu.builders.MenuSnapshot.MenuSnapshot>}.
+        Properties of the template:
+            - roots: tuple of nodes. A node is a tuple C{(name, label, callback, children)} where
+            C{children} is C{None} or a tuple of nodes. A 1-tuple C{(opt_name,)} instead of a node marks the
+            place where the L{dynamic<AbstractMenuBuilder.DYNAMIC>} sections of C{opt_name} are inserted.
+            - callback: callback of the L{menu root<AbstractMenuBuilder.Menu>}.
+    """
+
 
     def build(self, dynamic_sections_by_opt_name=None):
         """
@@ -54,13 +97,16 @@ class AbstractMenuBuilder(object):
             collected by this builder.
 
             @param dynamic_sections_by_opt_name: additional set of sections defined as L{AbstractMenuBuilder.
-            DYNAMIC}
+            DYNAMIC}. The sections of an option are either given as a sequence of C{(label, callback)} tuples or
+            by a provider (callable or iterable, see L{PagedSections<simple_menu.builders.PagedSections.
+            PagedSections>}) in which case the option becomes a section whose sub sections are fetched lazily.
+            Options are keyed by name, a unicode string for the names which are not ASCII.
             @rtype: AbstractMenuBuilder.Menu
 
             @precondition: dynamic_sections_by_opt_name is None or isinstance(dynamic_sections_by_opt_name, DictType)
             @precondition: dynamic_sections_by_opt_name is None or all(
-                            isinstance(k, StringType)
-                            and isinstance(v, (TupleType, ListType))
+                            isinstance(k, (StringType, UnicodeType))
+                            and (isinstance(v, (TupleType, ListType)) or callable(v) or hasattr(v, '__iter__'))
                             for k, v in dynamic_sections_by_opt_name.iteritems())
             @precondition: dynamic_sections_by_opt_name is None or all(
                             isinstance(v, (TupleType, ListType))
@@ -68,13 +114,14 @@ class AbstractMenuBuilder(object):
                             and isinstance(v[0], (StringType, UnicodeType))
                             and (v[1] is None or isinstance(v[1], (StringType, UnicodeType)))
                             for values in dynamic_sections_by_opt_name.itervalues()
+                            if isinstance(values, (TupleType, ListType))
                             for v in values
                                                             )
         """
         assert dynamic_sections_by_opt_name is None or isinstance(dynamic_sections_by_opt_name, DictType)
         assert dynamic_sections_by_opt_name is None or all(
-                            isinstance(k, StringType)
-                            and isinstance(v, (TupleType, ListType))
+                            isinstance(k, (StringType, UnicodeType))
+                            and (isinstance(v, (TupleType, ListType)) or callable(v) or hasattr(v, '__iter__'))
                             for k, v in dynamic_sections_by_opt_name.iteritems())
         assert dynamic_sections_by_opt_name is None or all(
                             isinstance(v, (TupleType, ListType))
@@ -82,6 +129,155 @@ class AbstractMenuBuilder(object):
                             and isinstance(v[0], (StringType, UnicodeType))
                             and (v[1] is None or isinstance(v[1], (StringType, UnicodeType)))
                             for values in dynamic_sections_by_opt_name.itervalues()
+                            if isinstance(values, (TupleType, ListType))
                             for v in values
                                                             )
         raise NotImplementedError()
+
+    def build_flat(self, dynamic_sections_by_opt_name=None):
+        """
+            Abstract method which builds and returns a new L{flat menu<simple_menu.builders.FlatMenu.FlatMenu>}
+            from the information collected by this builder. It holds the same sections as the menu returned by
+            L{AbstractMenuBuilder.build} in a much more compact form.
+
+            @param dynamic_sections_by_opt_name: see L{AbstractMenuBuilder.build}
+            @rtype: FlatMenu
+        """
+        raise NotImplementedError()
+
+    def _build_menu(self, template, dynamic_sections_by_opt_name=None):
+        """
+            Builds and returns a new L{AbstractMenuBuilder.Menu} from the given L{template} in which the
+            dynamic markers are replaced by the sections found in L{dynamic_sections_by_opt_name}.
+
+            @type template: AbstractMenuBuilder.Template
+            @param dynamic_sections_by_opt_name: see L{AbstractMenuBuilder.build}
+            @rtype: AbstractMenuBuilder.Menu
+
+            @precondition: isinstance(template, AbstractMenuBuilder.Template)
+        """
+        assert isinstance(template, AbstractMenuBuilder.Template)
+        # imported here as PagedSections depends on this module
+        from simple_menu.builders.PagedSections import PagedSections
+
+        Section = AbstractMenuBuilder.Section
+        DynamicLocation = AbstractMenuBuilder.DynamicLocation
+        dynamic = []
+
+        def build_sections(nodes, path):
+            sections = []
+            for node in nodes:
+                if len(node) == 1:
+                    opt_name = node[0]
+                    values = dynamic_sections_by_opt_name[opt_name]
+                    if isinstance(values, (TupleType, ListType)):
+                        start = len(sections)
+                        sections.extend(AbstractMenuBuilder.__build_dynamic_sections(opt_name, values))
+                        dynamic.append(DynamicLocation(opt_name, path, start, len(sections) - start))
+                    else:
+                        if not isinstance(values, PagedSections):
+                            values = PagedSections(opt_name, values)
+                        sections.append(Section(opt_name, None, None, values))
+                else:
+                    name, label, callback, children = node
+                    if children is not None:
+                        children = build_sections(children, path + (len(sections),))
+                        if not children:
+                            raise ValueError("Not sections could be found.")
+                    sections.append(Section(name, label, callback, children))
+            return tuple(sections)
+
+        sections = build_sections(template.roots, ())
+        return AbstractMenuBuilder.Menu(sections, template.callback, tuple(dynamic))
+
+    def update_dynamic_sections(self, menu, opt_name, dynamic_sections):
+        """
+            Returns a copy of the given L{menu} in which the sections of the L{dynamic<AbstractMenuBuilder.
+            DYNAMIC>} option L{opt_name} are replaced by L{dynamic_sections}.
+
+            Only the sections on the path leading to the dynamic sections are copied, everything else is shared
+            with L{menu}, and only L{dynamic_sections} are validated. The new menu can be given to live
+            L{menu handlers<simple_menu.handlers.MenuHandler.MenuHandler.menu>}.
+
+            @type menu: AbstractMenuBuilder.Menu
+            @param opt_name: name of the dynamic option as found in the L{dynamic locations
+            <AbstractMenuBuilder.Menu.dynamic>} of L{menu}.
+            @type opt_name: StringType
+            @param dynamic_sections: new sections of the option, in the format of the values of the
+            C{dynamic_sections_by_opt_name} given to L{AbstractMenuBuilder.build}.
+            @type dynamic_sections: TupleType or ListType
+            @rtype: AbstractMenuBuilder.Menu
+
+            @precondition: isinstance(menu, AbstractMenuBuilder.Menu)
+            @precondition: any(l.opt_name == opt_name for l in menu.dynamic)
+            @precondition: all(
+                            isinstance(v, (TupleType, ListType))
+                            and len(v) == 2
+                            and isinstance(v[0], (StringType, UnicodeType))
+                            and (v[1] is None or isinstance(v[1], (StringType, UnicodeType)))
+                            for v in dynamic_sections)
+            @raise ValueError: if the update would leave a section without sub sections.
+        """
+        assert isinstance(menu, AbstractMenuBuilder.Menu)
+        assert menu.dynamic is not None
+        assert any(l.opt_name == opt_name for l in menu.dynamic)
+        assert isinstance(dynamic_sections, (TupleType, ListType))
+        assert all(
+                    isinstance(v, (TupleType, ListType))
+                    and len(v) == 2
+                    and isinstance(v[0], (StringType, UnicodeType))
+                    and (v[1] is None or isinstance(v[1], (StringType, UnicodeType)))
+                    for v in dynamic_sections)
+
+        new_sections = AbstractMenuBuilder.__build_dynamic_sections(opt_name, dynamic_sections)
+        count = len(new_sections)
+
+        def splice(sections, path, start, old_count):
+            if not path:
+                sections = sections[:start] + new_sections + sections[start + old_count:]
+                if not sections:
+                    raise ValueError("Not sections could be found.")
+                return sections
+            idx = path[0]
+            section = sections[idx]
+            section = section._replace(sections=splice(section.sections, path[1:], start, old_count))
+            return sections[:idx] + (section,) + sections[idx + 1:]
+
+        sections = menu.sections
+        locations = list(menu.dynamic)
+        for i, location in enumerate(locations):
+            if location.opt_name != opt_name:
+                continue
+
+            sections = splice(sections, location.path, location.start, location.count)
+            locations[i] = location._replace(count=count)
+
+            delta = count - location.count
+            if delta:
+                # the sections following the updated ones in the same parent moved. Locations are kept in menu
+                # order so the ones in the same parent following this one come after it.
+                depth = len(location.path)
+                end = location.start + location.count
+                for j, other in enumerate(locations):
+                    if other.path == location.path:
+                        if j > i:
+                            locations[j] = other._replace(start=other.start + delta)
+                    elif other.path[:depth] == location.path and other.path[depth] >= end:
+                        path = other.path[:depth] + (other.path[depth] + delta,) + other.path[depth + 1:]
+                        locations[j] = other._replace(path=path)
+
+        return AbstractMenuBuilder.Menu(sections, menu.callback, tuple(locations))
+
+    @staticmethod
+    def __build_dynamic_sections(opt_name, dynamic_sections):
+        """
+            Returns the L{sections<AbstractMenuBuilder.Section>} of the L{dynamic<AbstractMenuBuilder.DYNAMIC>}
+            option L{opt_name}.
+
+            @type opt_name: StringType
+            @param dynamic_sections: iterable of C{(label, callback)} tuples.
+            @rtype: TupleType
+        """
+        Section = AbstractMenuBuilder.Section
+        return tuple(Section(opt_name + str(idx), s_label.encode('utf-8'), s_value, None)
+                     for idx, (s_label, s_value,) in enumerate(dynamic_sections))
@@ -0,0 +1,127 @@
+from types import DictType, StringType, UnicodeType
+import collections
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.PagedSections import PagedSections
+
+
+class CompiledMenu(collections.namedtuple('CompiledMenu', AbstractMenuBuilder.Menu._fields + ('function',
+                                                                                    'callbacks',)),
+                   AbstractMenuBuilder.Menu):
+    """
+        L{Menu<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Menu>} validated once against its
+        callbacks and sealed, as returned by L{CompiledMenu.compile}.
+
+        Each node (the menu and its L{sections<CompiledMenu.Section>}) holds its resolved callback function and
+        each section the text it displays (its label or name), so a L{menu handler<simple_menu.handlers.
+        MenuHandler.MenuHandler>} navigating a compiled menu neither checks nor looks anything up on each move.
+
+        A compiled menu is a menu: it can be given wherever a menu is expected. It is sealed however: its nodes
+        cannot be modified and the copies made by L{update_dynamic_sections<simple_menu.builders.
+        AbstractMenuBuilder.AbstractMenuBuilder.update_dynamic_sections>} are not compiled, the updated menu has
+        to be compiled again.
+
+        On top of the properties of a menu it has:
+            - function: resolved callback function of the menu or C{None}.
+            - callbacks: dictionary of the callbacks the menu was compiled with, C{None} if there were none.
+        The compiled nodes are tuples holding these extra properties after the ones of their plain counterpart,
+        which they still are instances of.
+    """
+
+    __slots__ = ()
+
+    class Section(collections.namedtuple('Section', AbstractMenuBuilder.Section._fields + ('function', 'text',)),
+                  AbstractMenuBuilder.Section):
+        """
+            L{Section<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Section>} of a L{compiled
+            menu<CompiledMenu>}. On top of the properties of a section it has:
+                - function: resolved callback function or C{None}.
+                - text: text displayed for the section: its label or, if it has none, its name.
+        """
+
+        __slots__ = ()
+
+    @staticmethod
+    def compile(menu, callbacks=None):
+        """
+            Validates the given L{menu} against the given L{callbacks} and returns its compiled copy. Checks
+            that:
+                - every callback of the menu and of its sections is found in L{callbacks} and callable;
+                - every section has a non empty name, a non empty label or none, and non empty sub sections or
+                none;
+                - every L{dynamic location<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.
+                DynamicLocation>} of the menu designates existing sections named after its option.
+
+            @type menu: AbstractMenuBuilder.Menu or FlatMenu
+            @param callbacks: dictionary of the callbacks by name, see L{MenuHandler.__init__<simple_menu.
+            handlers.MenuHandler.MenuHandler.__init__>}.
+            @type callbacks: DictType
+            @rtype: CompiledMenu
+            @raise ValueError: listing all the problems found, if any. Lazily fetched sections (L{PagedSections})
+            cannot be compiled.
+        """
+        assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+        assert callbacks is None or isinstance(callbacks, DictType)
+
+        callbacks = callbacks or {}
+        errors = []
+
+        def resolve(callback, path):
+            if callback is None:
+                return None
+            function = callbacks.get(callback)
+            if function is None:
+                errors.append('%s: callback %s is not registered.' % (path, callback,))
+            elif not callable(function):
+                errors.append('%s: callback %s is not callable.' % (path, callback,))
+            return function
+
+        def compile_sections(sections, path):
+            if isinstance(sections, PagedSections):
+                errors.append('%s: lazily fetched sections cannot be compiled.' % (path,))
+                return None
+            if not sections:
+                errors.append('%s: no sections.' % (path,))
+                return None
+
+            compiled = []
+            for idx, section in enumerate(sections):
+                name = section.name
+                section_path = '%s/%s' % (path, name,) if path else str(name)
+                if not isinstance(name, (StringType, UnicodeType,)) or not name:
+                    errors.append('%s: section %d has no name.' % (path or '/', idx,))
+                label = section.label
+                if label is not None and (not isinstance(label, (StringType, UnicodeType,)) or not label):
+                    errors.append('%s: empty label.' % (section_path,))
+
+                children = section.sections
+                if children is not None:
+                    children = compile_sections(children, section_path)
+
+                compiled.append(CompiledMenu.Section(name, label, section.callback, children,
+                                                     resolve(section.callback, section_path), label or name))
+            return tuple(compiled)
+
+        sections = compile_sections(menu.sections, '')
+        dynamic = getattr(menu, 'dynamic', None) or ()
+
+        for location in dynamic:
+            parent = menu
+            try:
+                for idx in location.path:
+                    parent = parent.sections[idx]
+                valid = (location.start >= 0
+                         and location.start + location.count <= len(parent.sections)
+                         and all(parent.sections[idx].name.startswith(location.opt_name)
+                                 for idx in xrange(location.start, location.start + location.count)))
+            except (IndexError, TypeError):
+                valid = False
+            if not valid:
+                errors.append('Dynamic location of %s does not match the sections.' % (location.opt_name,))
+
+        function = resolve(menu.callback, '/')
+        if errors:
+            raise ValueError('Invalid menu:\n' + '\n'.join(errors))
+
+        return CompiledMenu(sections, menu.callback, tuple(dynamic), function, dict(callbacks) or None)
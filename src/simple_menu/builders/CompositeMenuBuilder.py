@@ -0,0 +1,217 @@
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from types import StringType, DictType, TupleType, ListType, UnicodeType, BooleanType, IntType
+import threading
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FileSignature import FileSignature
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+
+
+def _parse_fragment(args):
+    """
+        Parses one fragment and returns its template as a plain tuple. It is a module function returning
+        builtin types so that it can be run by a process pool.
+
+        @param args: tuple of the builder class, the fragment file and the separator.
+        @return: tuple of the roots and the callback of the template.
+        @rtype: TupleType
+    """
+    builder_class, fragment_file, name_to_property_sep = args
+    return tuple(builder_class(fragment_file, name_to_property_sep).build_template())
+
+
+class CompositeMenuBuilder(AbstractMenuBuilder):
+    """
+        Implementation of a L{menu builder<simple_menu.AbstractMenuBuilder.AbstractMenuBuilder>}. Builds one menu
+        from several properties files (fragments), each one parsed by a L{PropertiesMenuBuilder} (or a subclass
+        of it).
+
+        The fragments are parsed in parallel by a pool of worker threads or processes and merged in the order
+        they are given: the root sections of the menu are the ones of the first fragment, followed by the ones
+        of the second fragment... Only one fragment may define the root menu callback (C{default_settings})
+        and a root section name may only be defined by one fragment; conflicts are all reported at once.
+
+        The pool of workers only lives for the build which needs it: it is started when several fragments
+        have to be parsed and stopped once they are, so a builder holds no thread or process between builds
+        and needs no closing. Starting workers is cheap next to parsing several fragments.
+
+        The templates of the fragments are kept: a fragment whose L{signature<FileSignature>} did not change
+        since it was last parsed is not parsed again, so rebuilding after editing one fragment only parses that
+        fragment.
+    """
+
+    WORKERS = 4
+    """ Default number of workers parsing the fragments. """
+
+    def __init__(self, fragment_files, name_to_property_sep=PropertiesMenuBuilder.SEPARATOR,
+                 builder_class=PropertiesMenuBuilder, workers=WORKERS, use_processes=False):
+        """
+            Initializes this menu builder from the given L{fragment_files}.
+
+            @param fragment_files: paths of the properties files, in menu order.
+            @type fragment_files: TupleType or ListType
+            @param name_to_property_sep: see L{PropertiesMenuBuilder.__init__}
+            @type name_to_property_sep: StringType
+            @param builder_class: class of the builder parsing each fragment.
+            @param workers: number of workers parsing the fragments.
+            @type workers: IntType
+            @param use_processes: if C{True}, the fragments are parsed by a pool of processes instead of
+            threads, which parallelizes the parsing itself but costs the transfer of the templates.
+            @type use_processes: BooleanType
+
+            @precondition: len(fragment_files) > 0
+            @precondition: all(len(f) > 0 for f in fragment_files)
+            @precondition: issubclass(builder_class, PropertiesMenuBuilder)
+            @precondition: workers > 0
+        """
+        assert isinstance(fragment_files, (TupleType, ListType,))
+        assert fragment_files
+        assert all(isinstance(f, StringType) and f for f in fragment_files)
+        assert isinstance(name_to_property_sep, StringType)
+        assert name_to_property_sep
+        assert issubclass(builder_class, PropertiesMenuBuilder)
+        assert isinstance(workers, IntType)
+        assert workers > 0
+        assert isinstance(use_processes, BooleanType)
+
+        self.__fragment_files = tuple(fragment_files)
+        self.__name_to_property_sep = name_to_property_sep
+        self.__builder_class = builder_class
+        self.__workers = workers
+        self.__use_processes = use_processes
+        self.__lock = threading.Lock()
+        # fragment file -> (signature, template)
+        self.__templates = {}
+
+    def build(self, dynamic_sections_by_opt_name=None):
+        assert dynamic_sections_by_opt_name is None or isinstance(dynamic_sections_by_opt_name, DictType)
+        assert dynamic_sections_by_opt_name is None or all(
+                            isinstance(k, (StringType, UnicodeType))
+                            and (isinstance(v, (TupleType, ListType)) or callable(v) or hasattr(v, '__iter__'))
+                            for k, v in dynamic_sections_by_opt_name.iteritems())
+
+        assert dynamic_sections_by_opt_name is None or all(
+                            isinstance(v, (TupleType, ListType))
+                            and len(v) == 2
+                            and isinstance(v[0], (StringType, UnicodeType))
+                            and (v[1] is None or isinstance(v[1], (StringType, UnicodeType)))
+                            for values in dynamic_sections_by_opt_name.itervalues()
+                            if isinstance(values, (TupleType, ListType))
+                            for v in values
+                                                            )
+
+        return self._build_menu(self.build_template(), dynamic_sections_by_opt_name)
+
+    def build_flat(self, dynamic_sections_by_opt_name=None):
+        assert dynamic_sections_by_opt_name is None or isinstance(dynamic_sections_by_opt_name, DictType)
+
+        return FlatMenu(self.build_template(), dynamic_sections_by_opt_name)
+
+    def build_template(self):
+        """
+            Parses the fragments which changed since they were last parsed and returns the merged L{template
+            <simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Template>} of all the fragments.
+
+            @rtype: AbstractMenuBuilder.Template
+            @raise ValueError: if several fragments define the root menu callback or the same root section.
+        """
+        with self.__lock:
+            templates = self.__templates
+            signatures = {}
+            changed = []
+            for f in self.__fragment_files:
+                former = templates.get(f)
+                signatures[f] = signature = CompositeMenuBuilder.__get_signature(f, former and former[0])
+                if former is None or not signature.matches(former[0]):
+                    changed.append(f)
+                else: # a racy signature is checked until it is not racy anymore
+                    templates[f] = (signature, former[1],)
+
+            if changed:
+                args = [(self.__builder_class, f, self.__name_to_property_sep,) for f in changed]
+                if len(changed) == 1: # not worth a round trip to the pool
+                    parsed = [_parse_fragment(args[0])]
+                else:
+                    pool_class = Pool if self.__use_processes else ThreadPool
+                    pool = pool_class(min(self.__workers, len(changed)))
+                    try:
+                        parsed = pool.map(_parse_fragment, args)
+                    finally: # map only returns or raises once all the fragments are parsed
+                        pool.close()
+                        pool.join()
+                for f, template in zip(changed, parsed):
+                    templates[f] = (signatures[f], AbstractMenuBuilder.Template(*template),)
+
+            return CompositeMenuBuilder.__merge([(f, templates[f][1],) for f in self.__fragment_files])
+
+    @staticmethod
+    def __merge(templates):
+        """
+            Merges the given templates, in order.
+
+            @param templates: list of C{(fragment file, template)} tuples.
+            @rtype: AbstractMenuBuilder.Template
+            @raise ValueError: if several fragments define the root menu callback or the same root section.
+        """
+        roots = []
+        root_callback = None
+        callback_file = None
+        files_by_name = {}
+        conflicts = []
+
+        for fragment_file, template in templates:
+            if template.callback is not None:
+                if callback_file is not None:
+                    conflicts.append('%s defined in %s and %s' % (PropertiesMenuBuilder.DEFAULT_SETTINGS,
+                                                                  callback_file,
+                                                                  fragment_file,))
+                else:
+                    root_callback = template.callback
+                    callback_file = fragment_file
+
+            for root in template.roots:
+                name = root[0]
+                if name in files_by_name:
+                    conflicts.append('Section %s defined in %s and %s' % (name, files_by_name[name], fragment_file,))
+                else:
+                    files_by_name[name] = fragment_file
+                    roots.append(root)
+
+        if conflicts:
+            raise ValueError('Conflicting fragments:\n' + '\n'.join(conflicts))
+        return AbstractMenuBuilder.Template(tuple(roots), root_callback,)
+
+    @staticmethod
+    def __get_signature(fragment_file, former):
+        """
+            Returns the signature of the given file.
+
+            @param former: signature of the file when it was last parsed, C{None} if it was not.
+            @type former: FileSignature
+            @rtype: FileSignature
+            @raise OSError: if the file cannot be read.
+        """
+        signature = FileSignature.read(fragment_file, former)
+        if signature is None:
+            raise OSError('Cannot read %s' % (fragment_file,))
+        return signature
+
+    def fragment_files(): # @NoSelf
+        def fget(self):
+            return self.__fragment_files
+        return locals()
+
+    fragment_files = property(**fragment_files())
+    """
+        Getter:
+        =======
+        Gets the paths of the properties files of this entity, in menu order.
+
+        @rtype: TupleType
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,95 @@
+from types import StringType
+import collections
+import os
+import time
+
+from simple_menu.builders.MenuSnapshot import MenuSnapshot
+
+
+class FileSignature(collections.namedtuple('FileSignature',
+                                           (
+                                            'size',
+                                            'mtime',
+                                            'ctime',
+                                            'inode',
+                                            'taken',
+                                            'digest',
+                                            )
+                                           )):
+    """
+        Signature of a file, used to notice its changes without reading it on each check, as a L{snapshot
+        <MenuSnapshot>} does.
+        Properties of the signature:
+            - size, mtime, ctime, inode: size, modification time, change time and inode of the file. Unlike the
+            modification time, the change time cannot be set back, so an edit keeping the size and the
+            modification time is noticed.
+            - taken: time the signature was taken.
+            - digest: SHA-1 digest of the file when it is L{racy<FileSignature.is_racy>}, C{None} otherwise.
+
+        File time stamps are coarse: a file changed less than L{MenuSnapshot.RACY_WINDOW} seconds before its
+        signature was taken could be edited again without its times changing. The digest of such a file is
+        therefore taken, and taken again by the next L{read<FileSignature.read>} given that signature.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def read(path, former=None):
+        """
+            Returns the signature of the file at the given L{path}.
+
+            @type path: StringType
+            @param former: former signature of the file, if any. Its digest is checked again if it was racy.
+            @type former: FileSignature
+            @return: the signature, C{None} if the file cannot be read.
+            @rtype: FileSignature
+        """
+        assert isinstance(path, StringType)
+        assert former is None or isinstance(former, FileSignature)
+
+        try:
+            st = os.stat(path)
+            taken = time.time()
+            digest = None
+            if (st.st_ctime >= taken - MenuSnapshot.RACY_WINDOW
+                or (former is not None and former.is_racy() and former.has_stat(st))):
+                digest = MenuSnapshot.digest(path)
+        except (IOError, OSError):
+            return None
+        return FileSignature(st.st_size, st.st_mtime, st.st_ctime, st.st_ino, taken, digest)
+
+    def has_stat(self, st):
+        """
+            Returns C{True} if the given result of C{os.stat} has the size, times and inode of this signature.
+
+            @rtype: BooleanType
+        """
+        return (self.size == st.st_size
+                and self.mtime == st.st_mtime
+                and self.ctime == st.st_ctime
+                and self.inode == st.st_ino)
+
+    def matches(self, other):
+        """
+            Returns C{True} if this signature and the given L{other} one, taken later or earlier, designate the
+            same content of the file: same size, times and inode and, when both have one, same digest.
+
+            @type other: FileSignature
+            @rtype: BooleanType
+        """
+        assert isinstance(other, FileSignature)
+
+        return (self.size == other.size
+                and self.mtime == other.mtime
+                and self.ctime == other.ctime
+                and self.inode == other.inode
+                and (self.digest is None or other.digest is None or self.digest == other.digest))
+
+    def is_racy(self):
+        """
+            Returns C{True} if the file changed too shortly before this signature was taken for its time stamps
+            to tell a later edit, see class contract.
+
+            @rtype: BooleanType
+        """
+        return self.ctime >= self.taken - MenuSnapshot.RACY_WINDOW
@@ -0,0 +1,352 @@
+from array import array
+from types import IntType, TupleType, ListType
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+
+
+class FlatMenu(object):
+    """
+        Compact alternative to the L{menu<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Menu>}
+        tree for very large menus.
+
+        Nodes are not Python objects but rows of C{array} columns holding the index of their parent, first
+        child and next sibling, their number of children and the index of their name, label and callback in a
+        single table of interned strings. The string table itself is one UTF-8 buffer and an C{array} of
+        offsets. Row 0 is the menu root. The children of a node always are contiguous
+        rows so the n-th child of a node is found in constant time.
+
+        A flat menu is navigated through the same properties as a menu tree (C{sections}, C{callback} and, for
+        its nodes, C{name}, C{label}, C{callback} and C{sections}): L{nodes<FlatMenu.Node>} and their
+        L{sections<FlatMenu.Sections>} are light views created on access. It can therefore be given to a
+        L{menu handler<simple_menu.handlers.MenuHandler.MenuHandler>} as is.
+
+        Flat menus are immutable: their dynamic sections cannot be L{updated<simple_menu.builders.
+        AbstractMenuBuilder.AbstractMenuBuilder.update_dynamic_sections>}, a new flat menu has to be built.
+    """
+
+    NONE = -1
+    """ Value of a column when the information is not available (no parent, no child, no label...). """
+
+    TYPECODE = 'i'
+    """ Type code of the columns. """
+
+    class Node(object):
+        """
+            View on one node (section) of a L{flat menu<FlatMenu>}.
+        """
+
+        __slots__ = ('__menu', '__row',)
+
+        def __init__(self, menu, row):
+            """
+                @type menu: FlatMenu
+                @param row: row of the node in L{menu}.
+                @type row: IntType
+            """
+            self.__menu = menu
+            self.__row = row
+
+        def name(): # @NoSelf
+            def fget(self):
+                return self.__menu.get_string(self.__menu.names[self.__row])
+            return locals()
+
+        name = property(**name())
+        """ Name of the section. """
+
+        def label(): # @NoSelf
+            def fget(self):
+                return self.__menu.get_string(self.__menu.labels[self.__row])
+            return locals()
+
+        label = property(**label())
+        """ Label of the section or C{None}. """
+
+        def callback(): # @NoSelf
+            def fget(self):
+                return self.__menu.get_string(self.__menu.callbacks[self.__row])
+            return locals()
+
+        callback = property(**callback())
+        """ Callback name of the section or C{None}. """
+
+        def sections(): # @NoSelf
+            def fget(self):
+                if self.__menu.child_counts[self.__row] == FlatMenu.NONE:
+                    return None
+                return FlatMenu.Sections(self.__menu, self.__row)
+            return locals()
+
+        sections = property(**sections())
+        """ L{Sub sections<FlatMenu.Sections>} of the section or C{None}. """
+
+        def row(): # @NoSelf
+            def fget(self):
+                return self.__row
+            return locals()
+
+        row = property(**row())
+        """ Row of the section in its flat menu. """
+
+        def __eq__(self, other):
+            return isinstance(other, FlatMenu.Node) and other.__menu is self.__menu and other.__row == self.__row
+
+        def __ne__(self, other):
+            return not self == other
+
+        def __hash__(self):
+            return hash((id(self.__menu), self.__row,))
+
+        def __repr__(self):
+            return 'Node(row=%d, name=%r, label=%r, callback=%r)' % (self.__row,
+                                                                      self.name,
+                                                                      self.label,
+                                                                      self.callback,)
+
+    class Sections(object):
+        """
+            Sequence view on the children of one node of a L{flat menu<FlatMenu>}.
+        """
+
+        __slots__ = ('__menu', '__first', '__count',)
+
+        def __init__(self, menu, row):
+            """
+                @type menu: FlatMenu
+                @param row: row of the parent node in L{menu}.
+                @type row: IntType
+            """
+            self.__menu = menu
+            self.__first = menu.first_children[row]
+            self.__count = menu.child_counts[row]
+
+        def __len__(self):
+            return self.__count
+
+        def __getitem__(self, idx):
+            assert isinstance(idx, IntType)
+            if idx < 0:
+                idx += self.__count
+            if not 0 <= idx < self.__count:
+                raise IndexError('section index out of range')
+            return FlatMenu.Node(self.__menu, self.__first + idx)
+
+        def __iter__(self):
+            menu = self.__menu
+            for row in xrange(self.__first, self.__first + self.__count):
+                yield FlatMenu.Node(menu, row)
+
+    def __init__(self, template, dynamic_sections_by_opt_name=None):
+        """
+            Builds a flat menu from the given L{template} and dynamic sections. This is the flat equivalent of
+            L{AbstractMenuBuilder._build_menu<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.
+            _build_menu>}: the resulting menu holds the same sections in the same order.
+
+            @type template: AbstractMenuBuilder.Template
+            @param dynamic_sections_by_opt_name: see L{AbstractMenuBuilder.build<simple_menu.builders.
+            AbstractMenuBuilder.AbstractMenuBuilder.build>}
+
+            @precondition: isinstance(template, AbstractMenuBuilder.Template)
+            @precondition: dynamic_sections_by_opt_name is None or all(
+                            isinstance(v, (TupleType, ListType))
+                            for v in dynamic_sections_by_opt_name.itervalues())
+            @raise ValueError: if a section ends up without sub sections.
+        """
+        assert isinstance(template, AbstractMenuBuilder.Template)
+        # lazily fetched sections cannot be stored in columns
+        assert dynamic_sections_by_opt_name is None or all(
+                            isinstance(v, (TupleType, ListType))
+                            for v in dynamic_sections_by_opt_name.itervalues())
+
+        TYPECODE = FlatMenu.TYPECODE
+        NONE = FlatMenu.NONE
+        NONES = array(TYPECODE, (NONE,))
+        self.__parents = parents = array(TYPECODE)
+        self.__first_children = first_children = array(TYPECODE)
+        self.__next_siblings = next_siblings = array(TYPECODE)
+        self.__child_counts = child_counts = array(TYPECODE)
+        self.__names = names = array(TYPECODE)
+        self.__labels = labels = array(TYPECODE)
+        self.__callbacks = callbacks = array(TYPECODE)
+        strings = []
+        # str and unicode strings are interned apart as equal strings of both types have the same hash
+        string_indexes = {str: {}, unicode: {}}
+        dynamic = []
+
+        def string_index(s):
+            if s is None:
+                return NONE
+            indexes = string_indexes[type(s)]
+            idx = indexes.get(s)
+            if idx is None:
+                indexes[s] = idx = len(strings)
+                strings.append(s)
+            return idx
+
+        def add_children(row, nodes, path):
+            # the children are expanded first so that they get contiguous rows
+            entries = []
+            for node in nodes:
+                if len(node) == 1:
+                    opt_name = node[0]
+                    start = len(entries)
+                    entries.extend((opt_name + str(idx), s_label.encode('utf-8'), s_value, None,)
+                                   for idx, (s_label, s_value,)
+                                   in enumerate(dynamic_sections_by_opt_name[opt_name]))
+                    dynamic.append(AbstractMenuBuilder.DynamicLocation(opt_name, path, start, len(entries) - start))
+                else:
+                    entries.append(node)
+
+            if not entries:
+                raise ValueError("Not sections could be found.")
+
+            count = len(entries)
+            first = len(parents)
+            first_children[row] = first
+            child_counts[row] = count
+            parents.extend(array(TYPECODE, (row,)) * count)
+            first_children.extend(NONES * count)
+            child_counts.extend(NONES * count)
+            next_siblings.extend(xrange(first + 1, first + count))
+            next_siblings.append(NONE)
+            names.extend([string_index(e[0]) for e in entries])
+            labels.extend([string_index(e[1]) for e in entries])
+            callbacks.extend([string_index(e[2]) for e in entries])
+
+            for idx, (_, _, _, children) in enumerate(entries):
+                if children is not None:
+                    add_children(first + idx, children, path + (idx,))
+
+        # the menu root
+        parents.append(NONE)
+        first_children.append(NONE)
+        next_siblings.append(NONE)
+        child_counts.append(NONE)
+        names.append(NONE)
+        labels.append(NONE)
+        callbacks.append(string_index(template.callback))
+
+        add_children(0, template.roots, ())
+        self.__dynamic = tuple(dynamic)
+
+        # the interned strings are packed in one buffer
+        string_indexes = None # releases the interning tables before packing
+        self.__string_unicode = array('b', [type(s) is unicode for s in strings])
+        strings = [s.encode('utf-8') if type(s) is unicode else s for s in strings]
+        self.__string_offsets = string_offsets = array(TYPECODE, (0,)) * (len(strings) + 1)
+        offset = 0
+        for idx, s in enumerate(strings):
+            offset += len(s)
+            string_offsets[idx + 1] = offset
+        self.__string_data = ''.join(strings)
+
+    def get_string(self, idx):
+        """
+            Returns the string at the given index of the string table.
+
+            @type idx: IntType
+            @return: the string or C{None} if L{idx} is L{FlatMenu.NONE}.
+        """
+        if idx == FlatMenu.NONE:
+            return None
+        s = self.__string_data[self.__string_offsets[idx]:self.__string_offsets[idx + 1]]
+        if self.__string_unicode[idx]:
+            return s.decode('utf-8')
+        return s
+
+    def __len__(self):
+        """
+            Returns the number of nodes in this menu, root included.
+        """
+        return len(self.__parents)
+
+    def sections(): # @NoSelf
+        def fget(self):
+            return FlatMenu.Sections(self, 0)
+        return locals()
+
+    sections = property(**sections())
+    """ Root L{sections<FlatMenu.Sections>}, see L{AbstractMenuBuilder.Menu.sections}. """
+
+    def callback(): # @NoSelf
+        def fget(self):
+            return self.get_string(self.__callbacks[0])
+        return locals()
+
+    callback = property(**callback())
+    """ Callback of the menu root, see L{AbstractMenuBuilder.Menu.callback}. """
+
+    def dynamic(): # @NoSelf
+        def fget(self):
+            return self.__dynamic
+        return locals()
+
+    dynamic = property(**dynamic())
+    """ Locations of the dynamic sections, see L{AbstractMenuBuilder.Menu.dynamic}. """
+
+    def parents(): # @NoSelf
+        def fget(self):
+            return self.__parents
+        return locals()
+
+    parents = property(**parents())
+    """ Column of the parent row of each node (C{array}). """
+
+    def first_children(): # @NoSelf
+        def fget(self):
+            return self.__first_children
+        return locals()
+
+    first_children = property(**first_children())
+    """ Column of the first child row of each node (C{array}). """
+
+    def next_siblings(): # @NoSelf
+        def fget(self):
+            return self.__next_siblings
+        return locals()
+
+    next_siblings = property(**next_siblings())
+    """ Column of the next sibling row of each node (C{array}). """
+
+    def child_counts(): # @NoSelf
+        def fget(self):
+            return self.__child_counts
+        return locals()
+
+    child_counts = property(**child_counts())
+    """ Column of the number of children of each node, L{FlatMenu.NONE} for leaves (C{array}). """
+
+    def names(): # @NoSelf
+        def fget(self):
+            return self.__names
+        return locals()
+
+    names = property(**names())
+    """ Column of the string index of the name of each node (C{array}). """
+
+    def labels(): # @NoSelf
+        def fget(self):
+            return self.__labels
+        return locals()
+
+    labels = property(**labels())
+    """ Column of the string index of the label of each node (C{array}). """
+
+    def callbacks(): # @NoSelf
+        def fget(self):
+            return self.__callbacks
+        return locals()
+
+    callbacks = property(**callbacks())
+    """ Column of the string index of the callback of each node (C{array}). """
+
+    def strings(): # @NoSelf
+        def fget(self):
+            return tuple(self.get_string(idx) for idx in xrange(len(self.__string_unicode)))
+        return locals()
+
+    strings = property(**strings())
+    """
+        Table of the interned strings (C{tuple}). The strings are stored as one UTF-8 encoded buffer, this
+        property decodes all of them.
+    """
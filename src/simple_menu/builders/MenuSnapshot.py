@@ -0,0 +1,218 @@
+from types import StringType
+import hashlib
+import marshal
+import os
+import struct
+import time
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+
+
+class MenuSnapshot(object):
+    """
+        Compiled snapshot of a L{menu template<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.
+        Template>} stored next to the file it was parsed from.
+
+        The snapshot file is made of a fixed size header followed by the template serialized with
+        C{marshal}. The header holds the size, the modification and change times, the inode and the SHA-1
+        digest of the source file the template was compiled from:
+            - when the size, the times and the inode of the source still match, the template is loaded from the
+            snapshot without reading the source file at all. Unlike the modification time, the
+            change time cannot be set back, so an edit keeping the size and the modification time is noticed.
+            - when they differ but the digest of the source still matches (the file was touched or copied),
+            the header is refreshed and the template is loaded from the snapshot.
+            - otherwise the template is compiled again and the snapshot rewritten.
+
+        File time stamps are coarse: a source changed less than L{MenuSnapshot.RACY_WINDOW} seconds before its
+        snapshot was written could be edited again without its times changing, so its digest is checked.
+
+        Snapshots are an optimization only: a snapshot which cannot be read is ignored and one which cannot
+        be written (read only file system, ...) is silently skipped.
+    """
+
+    EXTENSION = '.snapshot'
+    """ Extension appended to the source file name to get the default snapshot file name. """
+
+    MAGIC = 'SMSNAP02'
+    """ First bytes of a snapshot file. Changes whenever the format of the snapshot changes. """
+
+    HEADER = struct.Struct('<8sQddQd20s20sI')
+    """
+        Header of a snapshot file: magic, source size, source modification time, source change time, source
+        inode, time the snapshot was written, source digest, variant digest and length of the marshalled
+        template.
+    """
+
+    RACY_WINDOW = 2.0
+    """ Resolution in seconds of the coarsest file time stamps (FAT), see class contract. """
+
+    def __init__(self, source_file, variant='', snapshot_file=None):
+        """
+            Initializes this snapshot for the given L{source_file}.
+
+            @param source_file: path of the file the template is compiled from.
+            @type source_file: StringType
+            @param variant: string identifying how the source file is compiled (separator, builder, ...). A
+            snapshot compiled with a different variant is never reused.
+            @type variant: StringType
+            @param snapshot_file: path of the snapshot file. Defaults to L{source_file} followed by
+            L{MenuSnapshot.EXTENSION}.
+            @type snapshot_file: StringType
+
+            @precondition: len(source_file) > 0
+            @precondition: snapshot_file is None or len(snapshot_file) > 0
+        """
+        assert isinstance(source_file, StringType)
+        assert source_file
+        assert isinstance(variant, StringType)
+        assert snapshot_file is None or isinstance(snapshot_file, StringType)
+        assert snapshot_file is None or snapshot_file
+
+        self.__source_file = source_file
+        self.__variant_digest = hashlib.sha1(variant).digest()
+        if snapshot_file is None:
+            snapshot_file = source_file + MenuSnapshot.EXTENSION
+        self.__snapshot_file = snapshot_file
+
+    def load(self, compile_template):
+        """
+            Returns the template of the source file, from the snapshot when it is up to date or from
+            L{compile_template} otherwise (in which case the snapshot is regenerated).
+
+            @param compile_template: function invoked without parameters which parses the source file and
+            returns its template.
+            @rtype: AbstractMenuBuilder.Template
+
+            @precondition: callable(compile_template)
+            @postcondition: isinstance(return, AbstractMenuBuilder.Template)
+        """
+        assert callable(compile_template)
+
+        st = os.stat(self.__source_file)
+        header, payload = self.__read()
+
+        if header is not None:
+            _, size, mtime, ctime, inode, written, digest, variant_digest, _ = header
+            if variant_digest == self.__variant_digest:
+                if (size == st.st_size
+                    and mtime == st.st_mtime
+                    and ctime == st.st_ctime
+                    and inode == st.st_ino
+                    and ctime < written - MenuSnapshot.RACY_WINDOW):
+                    return AbstractMenuBuilder.Template(*marshal.loads(payload))
+
+                source_digest = MenuSnapshot.digest(self.__source_file)
+                if digest == source_digest:
+                    template = AbstractMenuBuilder.Template(*marshal.loads(payload))
+                    self.__write(st, source_digest, payload)
+                    return template
+
+        # the source is hashed before being compiled so a concurrent edit makes the snapshot stale rather
+        # than wrong
+        source_digest = MenuSnapshot.digest(self.__source_file)
+        template = compile_template()
+        assert isinstance(template, AbstractMenuBuilder.Template)
+        self.__write(st, source_digest, marshal.dumps(tuple(template)))
+        return template
+
+    def invalidate(self):
+        """
+            Removes the snapshot file if any.
+        """
+        try:
+            os.remove(self.__snapshot_file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def digest(path):
+        """
+            Returns the SHA-1 digest of the file at the given L{path}.
+
+            @type path: StringType
+            @rtype: StringType
+            @raise IOError: if the file cannot be read.
+        """
+        assert isinstance(path, StringType)
+
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), ''):
+                sha1.update(chunk)
+        return sha1.digest()
+
+    def __read(self):
+        """
+            Reads the snapshot file.
+
+            @return: a tuple C{(header, payload)}. Both are C{None} if there is no valid snapshot.
+            @rtype: TupleType
+        """
+        HEADER = MenuSnapshot.HEADER
+        try:
+            with open(self.__snapshot_file, 'rb') as f:
+                data = f.read(HEADER.size)
+                if len(data) < HEADER.size:
+                    return None, None
+
+                header = HEADER.unpack(data)
+                if header[0] != MenuSnapshot.MAGIC or os.fstat(f.fileno()).st_size != HEADER.size + header[-1]:
+                    return None, None
+
+                # marshal only loads strings: the payload is read in one piece, which mapping the file would
+                # only copy
+                payload = f.read(header[-1])
+                if len(payload) != header[-1]:
+                    return None, None
+                return header, payload
+        except (IOError, OSError):
+            return None, None
+
+    def __write(self, st, source_digest, payload):
+        """
+            Writes the snapshot file. The file is first written aside and then renamed so readers never see a
+            partially written snapshot.
+
+            @param st: result of C{os.stat} on the source file.
+            @param source_digest: SHA-1 digest of the source file.
+            @param payload: marshalled template.
+        """
+        header = MenuSnapshot.HEADER.pack(MenuSnapshot.MAGIC,
+                                          st.st_size,
+                                          st.st_mtime,
+                                          st.st_ctime,
+                                          st.st_ino,
+                                          time.time(),
+                                          source_digest,
+                                          self.__variant_digest,
+                                          len(payload))
+        tmp_file = '%s.%d.tmp' % (self.__snapshot_file, os.getpid(),)
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(header)
+                f.write(payload)
+            os.rename(tmp_file, self.__snapshot_file)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
+    def snapshot_file(): # @NoSelf
+        def fget(self):
+            return self.__snapshot_file
+        return locals()
+
+    snapshot_file = property(**snapshot_file())
+    """
+        Getter:
+        =======
+        Gets the path of the snapshot file.
+
+        @rtype: StringType
+        @postcondition: len(return) > 0
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,227 @@
+from types import StringType, UnicodeType, IntType, TupleType, ListType
+import collections
+import itertools
+import threading
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+
+
+class PagedSections(object):
+    """
+        Lazy sequence of the L{sections<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Section>}
+        of a L{dynamic<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.DYNAMIC>} option, backed by
+        a provider.
+
+        Nothing is fetched until a section is accessed, which a L{menu handler<simple_menu.handlers.
+        MenuHandler.MenuHandler>} only does once its user moves L{forward<simple_menu.handlers.MenuHandler.
+        MenuHandler.forward>} into the dynamic option. Sections are then fetched one page (window of
+        L{page_size} entries) at a time, as the cursor reaches them, and the least recently used pages are
+        evicted once more than L{max_pages} pages are held.
+
+        The provider is either:
+            - a callable invoked with C{(offset, limit)} and returning a sequence of at most C{limit}
+            C{(label, callback)} tuples starting at C{offset}. A sequence shorter than C{limit} marks the end of
+            the entries. Evicted pages are fetched again when needed.
+            - an iterable of C{(label, callback)} tuples. It is read lazily, page by page. When it can be
+            iterated again (list, container...) its pages are evicted as the ones of a callable, an evicted page
+            being read again by iterating from the start. When it is an iterator (generator, file...) it cannot
+            be rewound: its pages are never evicted, so it is held in memory as far as it was read.
+
+        The number of entries is only known once the last page has been fetched: getting the L{length
+        <PagedSections.__len__>} of the sequence (e.g. going to the last entry with L{previous<simple_menu.
+        handlers.MenuHandler.MenuHandler.previous>} from the first one) fetches the pages up to the end, which
+        reads the whole provider (and, for an iterator, holds all of it).
+
+        The sequence may be read from several threads (sessions of a L{menu server<simple_menu.servers.
+        MenuServer.MenuServer>}, L{prefetch<simple_menu.handlers.Prefetcher.Prefetcher>} workers...): the
+        lookup and the eviction of the pages are done holding a lock, as are the invocations of the provider.
+    """
+
+    PAGE_SIZE = 32
+    """ Default number of entries per page. """
+
+    MAX_PAGES = 4
+    """ Default number of pages kept in memory. """
+
+    def __init__(self, opt_name, provider, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+        """
+            Initializes this lazy sequence.
+
+            @param opt_name: name of the dynamic option. The sections are named after it as the sections of a
+            non lazy dynamic option.
+            @type opt_name: StringType
+            @param provider: callable or iterable providing the entries (see class contract).
+            @param page_size: number of entries fetched at once.
+            @type page_size: IntType
+            @param max_pages: number of pages kept in memory.
+            @type max_pages: IntType
+
+            @precondition: len(opt_name) > 0
+            @precondition: page_size > 0
+            @precondition: max_pages > 0
+        """
+        assert isinstance(opt_name, (StringType, UnicodeType,))
+        assert opt_name
+        assert isinstance(page_size, IntType)
+        assert page_size > 0
+        assert isinstance(max_pages, IntType)
+        assert max_pages > 0
+
+        self.__opt_name = opt_name
+        self.__page_size = page_size
+        self.__max_pages = max_pages
+        if callable(provider):
+            self.__provider = provider
+            self.__iterator = None
+            self.__evictable = True
+        else:
+            self.__provider = None
+            self.__iterable = provider
+            self.__iterator = iter(provider)
+            # an iterable giving a new iterator each time can be read again
+            self.__evictable = self.__iterator is not provider
+        # index of the page the iterator of an iterable provider is at
+        self.__next_page_idx = 0
+        self.__lock = threading.RLock()
+        self.__pages = collections.OrderedDict()
+        self.__length = None
+        # number of entries known to exist
+        self.__min_length = 0
+
+    def invalidate(self):
+        """
+            Drops all the fetched pages so that the entries are fetched again from the provider. For an iterable
+            provider, the iteration starts over on the iterable given to the initializer.
+        """
+        with self.__lock:
+            self.__pages.clear()
+            self.__length = None
+            self.__min_length = 0
+            if self.__provider is None:
+                self.__iterator = iter(self.__iterable)
+                self.__next_page_idx = 0
+
+    def __nonzero__(self):
+        try:
+            self[0]
+        except IndexError:
+            return False
+        return True
+
+    def __len__(self):
+        with self.__lock:
+            page_idx = self.__min_length // self.__page_size
+            while self.__length is None:
+                self.__get_page(page_idx)
+                page_idx += 1
+            return self.__length
+
+    def __getitem__(self, idx):
+        assert isinstance(idx, IntType)
+        with self.__lock:
+            if idx < 0:
+                idx += len(self)
+                if idx < 0:
+                    raise IndexError('section index out of range')
+
+            page_idx, offset = divmod(idx, self.__page_size)
+            if self.__length is not None and idx >= self.__length:
+                raise IndexError('section index out of range')
+
+            page = self.__get_page(page_idx)
+            if offset >= len(page):
+                raise IndexError('section index out of range')
+            return page[offset]
+
+    def __iter__(self):
+        idx = 0
+        while True:
+            try:
+                yield self[idx]
+            except IndexError:
+                return
+            idx += 1
+
+    def __get_page(self, page_idx):
+        """
+            Returns the sections of the given page, fetching it if needed. The lock must be held.
+
+            @type page_idx: IntType
+            @rtype: TupleType
+        """
+        pages = self.__pages
+        try:
+            page = pages.pop(page_idx)
+        except KeyError:
+            if not self.__evictable:
+                # an iterator can only be read once, in order: the pages it skips are kept
+                next_page_idx = self.__next_page_idx
+                while next_page_idx < page_idx:
+                    pages[next_page_idx] = self.__fetch(next_page_idx)
+                    next_page_idx += 1
+            page = self.__fetch(page_idx)
+            if self.__evictable:
+                while len(pages) >= self.__max_pages:
+                    pages.popitem(last=False)
+
+        pages[page_idx] = page # most recently used
+        return page
+
+    def __fetch(self, page_idx):
+        """
+            Fetches the given page from the provider.
+
+            @type page_idx: IntType
+            @rtype: TupleType
+        """
+        page_size = self.__page_size
+        offset = page_idx * page_size
+        if self.__provider is None:
+            if page_idx < self.__next_page_idx: # an evicted page is read again from the start
+                self.__iterator = iter(self.__iterable)
+                self.__next_page_idx = 0
+            skipped = (page_idx - self.__next_page_idx) * page_size
+            if skipped:
+                next(itertools.islice(self.__iterator, skipped, skipped), None)
+            entries = tuple(itertools.islice(self.__iterator, page_size))
+            self.__next_page_idx = page_idx + 1
+        else:
+            entries = self.__provider(offset, page_size)
+            assert isinstance(entries, (TupleType, ListType))
+            assert len(entries) <= page_size
+
+        assert all(
+                    isinstance(v, (TupleType, ListType))
+                    and len(v) == 2
+                    and isinstance(v[0], (StringType, UnicodeType))
+                    and (v[1] is None or isinstance(v[1], (StringType, UnicodeType)))
+                    for v in entries)
+
+        if entries:
+            self.__min_length = max(self.__min_length, offset + len(entries))
+        if len(entries) < page_size and (entries or offset <= self.__min_length):
+            # a short page is the last one, an empty one only is if the previous one was full
+            self.__length = offset + len(entries)
+
+        Section = AbstractMenuBuilder.Section
+        opt_name = self.__opt_name
+        return tuple(Section(opt_name + str(idx), s_label.encode('utf-8'), s_value, None)
+                     for idx, (s_label, s_value,) in enumerate(entries, offset))
+
+    def opt_name(): # @NoSelf
+        def fget(self):
+            return self.__opt_name
+        return locals()
+
+    opt_name = property(**opt_name())
+    """
+        Getter:
+        =======
+        Gets the name of the dynamic option of this entity.
+
+        @rtype: StringType
+
+        Setter:
+        =======
+        Not settable.
+    """
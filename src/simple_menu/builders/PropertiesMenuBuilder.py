@@ -1,9 +1,12 @@
 from ConfigParser import RawConfigParser
-from types import StringType, DictType, TupleType, ListType, UnicodeType
+from types import StringType, DictType, TupleType, ListType, UnicodeType, BooleanType
 import codecs
 import collections
 
 from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.MenuSnapshot import MenuSnapshot
+from simple_menu.instrumentation.Observer import Observer
 
 
 class PropertiesMenuBuilder(AbstractMenuBuilder):
@@ -30,7 +33,7 @@ class PropertiesMenuBuilder(AbstractMenuBuilder):
     CALLBACK = "callback"
     """ Portion of an option of a section used in the property file to setup a hook for a callback. """
 
-    def __init__(self, properties_file, name_to_property_sep=SEPARATOR):
+    def __init__(self, properties_file, name_to_property_sep=SEPARATOR, use_snapshot=False, observer=None):
         """
              Initializes this menu builder from the given L{properties_file}.
 
@@ -38,6 +41,13 @@ class PropertiesMenuBuilder(AbstractMenuBuilder):
              @param name_to_property_sep: separator used in the properties files. Each property should follow
              the format C{property}L{name_to_property_sep}C{PropertiesMenuBuilder.LABEL}.
              @type name_to_property_sep: StringType
+             @param use_snapshot: if C{True}, the parsed properties file is kept in a L{compiled snapshot
+             <simple_menu.builders.MenuSnapshot.MenuSnapshot>} next to it and the file is only parsed again
+             when it changes.
+             @type use_snapshot: BooleanType
+             @param observer: observer notified of the timings of the builds and of the parsing of the
+             properties file. When C{None}, nothing is timed.
+             @type observer: Observer
 
              @precondition: len(properties_file) > 0
              @precondition: len(name_to_property_sep) > 0
@@ -46,15 +56,23 @@ class PropertiesMenuBuilder(AbstractMenuBuilder):
         assert properties_file
         assert isinstance(name_to_property_sep, StringType)
         assert name_to_property_sep
+        assert isinstance(use_snapshot, BooleanType)
+        assert observer is None or isinstance(observer, Observer)
 
         self.__properties_file = properties_file
         self.__name_to_property_sep = name_to_property_sep
+        if use_snapshot:
+            self.__snapshot = MenuSnapshot(properties_file,
+                                           variant=type(self).__name__ + name_to_property_sep)
+        else:
+            self.__snapshot = None
+        self.__observer = observer
 
     def build(self, dynamic_sections_by_opt_name=None):
         assert dynamic_sections_by_opt_name is None or isinstance(dynamic_sections_by_opt_name, DictType)
         assert dynamic_sections_by_opt_name is None or all(
-                            isinstance(k, StringType)
-                            and isinstance(v, (TupleType, ListType))
+                            isinstance(k, (StringType, UnicodeType))
+                            and (isinstance(v, (TupleType, ListType)) or callable(v) or hasattr(v, '__iter__'))
                             for k, v in dynamic_sections_by_opt_name.iteritems())
 
         assert dynamic_sections_by_opt_name is None or all(
@@ -63,9 +81,53 @@ class PropertiesMenuBuilder(AbstractMenuBuilder):
                             and isinstance(v[0], (StringType, UnicodeType))
                             and (v[1] is None or isinstance(v[1], (StringType, UnicodeType)))
                             for values in dynamic_sections_by_opt_name.itervalues()
+                            if isinstance(values, (TupleType, ListType))
                             for v in values
                                                             )
 
+        observer = self.__observer
+        if observer is None:
+            return self._build_menu(self.__get_template(), dynamic_sections_by_opt_name)
+
+        start = observer.clock()
+        menu = self._build_menu(self.__get_template(), dynamic_sections_by_opt_name)
+        observer.on_build('build', observer.clock() - start)
+        return menu
+
+    def build_flat(self, dynamic_sections_by_opt_name=None):
+        assert dynamic_sections_by_opt_name is None or isinstance(dynamic_sections_by_opt_name, DictType)
+
+        observer = self.__observer
+        if observer is None:
+            return FlatMenu(self.__get_template(), dynamic_sections_by_opt_name)
+
+        start = observer.clock()
+        menu = FlatMenu(self.__get_template(), dynamic_sections_by_opt_name)
+        observer.on_build('build_flat', observer.clock() - start)
+        return menu
+
+    def build_template(self):
+        """
+            Parses the properties file and returns its L{template<simple_menu.builders.AbstractMenuBuilder.
+            AbstractMenuBuilder.Template>}. This never uses the snapshot.
+
+            @rtype: AbstractMenuBuilder.Template
+        """
+        observer = self.__observer
+        if observer is None:
+            return self._parse()
+
+        start = observer.clock()
+        template = self._parse()
+        observer.on_build('parse', observer.clock() - start)
+        return template
+
+    def _parse(self):
+        """
+            Hook parsing the properties file and returning its template.
+
+            @rtype: AbstractMenuBuilder.Template
+        """
         with codecs.open(self.__properties_file, 'r', encoding='utf8') as f:
             parser = RawConfigParser()
             parser.readfp(f)
@@ -88,8 +150,7 @@ class PropertiesMenuBuilder(AbstractMenuBuilder):
                     if len(option_l) == 2:
                         opt_name, opt_property = option_l
                         if opt_property == DYNAMIC:
-                            for idx, (s_label, s_value,) in enumerate(dynamic_sections_by_opt_name[opt_name]):
-                                sections[opt_name + str(idx)] = (s_label, s_value,)
+                            sections[(opt_name, DYNAMIC,)] = None
                         else:
                             if opt_name not in sections:
                                 sections[opt_name] = [None] * 2
@@ -100,12 +161,42 @@ class PropertiesMenuBuilder(AbstractMenuBuilder):
                             else:
                                 print u'Unknown option %s' % opt_name.encode('utf-8')
 
-                sections = tuple(AbstractMenuBuilder.Section(k, s[0].encode('utf-8'), s[1], None) for k, s in sections.iteritems())
                 if not sections:
                     raise ValueError("Not sections could be found.")
-                roots.append(AbstractMenuBuilder.Section(section_name.encode('utf-8'), None, None, sections))
 
-        return AbstractMenuBuilder.Menu(tuple(roots), root_callback,)
+                nodes = tuple((k[0],) if s is None else (k, s[0] and s[0].encode('utf-8'), s[1], None,)
+                              for k, s in sections.iteritems())
+                roots.append((section_name.encode('utf-8'), None, None, nodes,))
+
+        return AbstractMenuBuilder.Template(tuple(roots), root_callback,)
+
+    def __get_template(self):
+        """
+            Returns the template of the properties file, from the snapshot if enabled.
+
+            @rtype: AbstractMenuBuilder.Template
+        """
+        if self.__snapshot is None:
+            return self.build_template()
+        return self.__snapshot.load(self.build_template)
+
+    def properties_file(): # @NoSelf
+        def fget(self):
+            return self.__properties_file
+        return locals()
+
+    properties_file = property(**properties_file())
+    """
+        Getter:
+        =======
+        Gets the path of the properties file of this entity.
+
+        @rtype: StringType
+
+        Setter:
+        =======
+        Not settable.
+    """
 
     def name_to_property_sep(): # @NoSelf
         def fget(self):
@@ -126,3 +217,20 @@ class PropertiesMenuBuilder(AbstractMenuBuilder):
         Not settable.
     """
 
+    def observer(): # @NoSelf
+        def fget(self):
+            return self.__observer
+        return locals()
+
+    observer = property(**observer())
+    """
+        Getter:
+        =======
+        Gets the observer of the timings of this entity, C{None} if it is not instrumented.
+
+        @rtype: Observer
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,216 @@
+from ConfigParser import DEFAULTSECT, NoOptionError
+import codecs
+import re
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+
+
+class StreamingMenuBuilder(PropertiesMenuBuilder):
+    """
+        L{Properties menu builder<PropertiesMenuBuilder>} which parses the properties file line by line, in one
+        pass, and supports menus of any depth.
+
+        Options are paths of section names followed by a property, joined by the separator: in the section
+        C{[menu]}, C{a.b.c.label = ...} sets the label of the section C{c}, sub section of C{b}, itself sub
+        section of C{a}, sub section of C{menu}. Intermediate sections are created as needed and sections are
+        kept in the order they first appear in the file. C{a.b.name.dynamic = true} inserts the dynamic sections
+        of C{name} in the sub sections of C{b}. Two level files are built into the same template as by
+        L{PropertiesMenuBuilder}, option names included (unicode strings), but for the malformed options below.
+
+        The syntax is the one of C{RawConfigParser}: C{=} or C{:} separates the option from its value, lines
+        starting with C{#}, C{;} or C{rem} are comments, indented lines continue the value of the previous
+        option, option names are lower cased and the options of the C{[DEFAULT]} section are given to every
+        other section (before their own options, which override them). Unlike C{RawConfigParser}, the file is
+        never held in memory as a whole and errors are reported with their line number: an option which is not
+        a path of at least one section name and a property is an error, where L{PropertiesMenuBuilder} ignores
+        it.
+    """
+
+    COMMENTS = u'#;'
+    """ First characters of the comment lines. """
+
+    SECTION_HEADER = re.compile(r'\[([^]]+)\]')
+    """ Section header, as matched by C{RawConfigParser}: anything following the closing bracket is ignored. """
+
+    def _parse(self):
+        # node: [name, label, callback, children (list of nodes and dynamic markers), index of the children]
+        roots = []
+        roots_by_name = {}
+        headers = {}
+        properties_file = self.properties_file
+        name_to_property_sep = self.name_to_property_sep.decode('utf-8')
+        LABEL = StreamingMenuBuilder.LABEL
+        CALLBACK = StreamingMenuBuilder.CALLBACK
+        DYNAMIC = StreamingMenuBuilder.DYNAMIC
+        DEFAULT_SETTINGS = StreamingMenuBuilder.DEFAULT_SETTINGS
+        COMMENTS = StreamingMenuBuilder.COMMENTS
+        SECTION_HEADER = StreamingMenuBuilder.SECTION_HEADER
+        # options of the DEFAULT section and callbacks of the root menu (in default_settings and DEFAULT)
+        defaults = [DEFAULTSECT, None, None, [], {}]
+        settings = [DEFAULT_SETTINGS, None, None, None, None]
+        default_settings = [DEFAULTSECT, None, None, None, None]
+        has_settings = False
+
+        def error(lineno, message):
+            return ValueError('%s:%d: %s' % (properties_file, lineno, message,))
+
+        def get_child(node, key, name):
+            index = node[4]
+            child = index.get(key)
+            if child is None:
+                if isinstance(key, tuple): # dynamic marker
+                    child = (name,)
+                else:
+                    child = [name, None, None, None, None]
+                node[3].append(child)
+                index[key] = child
+            return child
+
+        def get_key(child):
+            return child if len(child) == 1 else child[0]
+
+        def merge(default, node):
+            # node holding the options of default overridden by the ones of node
+            if len(node) == 1:
+                return node
+            name, label, callback, children, _ = node
+            if label is None:
+                label = default[1]
+            if callback is None:
+                callback = default[2]
+            if children is None:
+                children = default[3]
+            elif default[3]:
+                index = dict((get_key(child), child) for child in children)
+                merged = []
+                for child in default[3]:
+                    own = index.pop(get_key(child), None)
+                    merged.append(child if own is None else merge(child, own))
+                merged.extend(child for child in children if get_key(child) in index)
+                children = merged
+            return [name, label, callback, children, None]
+
+        section = section_name = None
+        # node and slot of the value of the last option, for continuation lines: the node is None when the value
+        # is not kept, the whole tuple is None when the last line is not an option
+        last = None
+        with codecs.open(properties_file, 'r', encoding='utf8') as f:
+            for lineno, line in enumerate(f, 1):
+                stripped = line.strip()
+                if not stripped or stripped[0] in COMMENTS:
+                    continue
+                if line[0] in u'rR' and stripped.split(None, 1)[0].lower() == u'rem':
+                    continue
+
+                if line[0].isspace():
+                    if last is None:
+                        raise error(lineno, 'Continuation line without option.')
+                    node, slot = last
+                    if node is not None and node[slot] is not None:
+                        node[slot] += u'\n' + stripped
+                    continue
+
+                header = SECTION_HEADER.match(line)
+                if header is not None:
+                    section_name = header.group(1)
+                    last = None
+                    if section_name == DEFAULT_SETTINGS:
+                        section = None
+                        has_settings = True
+                        continue
+                    if section_name == DEFAULTSECT:
+                        section = defaults
+                        continue
+                    section = roots_by_name.get(section_name)
+                    if section is None:
+                        section = [section_name, None, None, [], {}]
+                        roots.append(section)
+                        roots_by_name[section_name] = section
+                        headers[section_name] = lineno
+                    continue
+
+                equal = line.find(u'=')
+                colon = line.find(u':')
+                if equal == -1 or (colon != -1 and colon < equal):
+                    equal = colon
+                if equal == -1:
+                    raise error(lineno, 'Option without value.')
+                option_str = line[:equal].strip().lower()
+                value = line[equal + 1:].rstrip(u'\n').lstrip()
+                comment = value.find(u';')
+                if comment != -1 and value[comment - 1].isspace():
+                    value = value[:comment]
+                value = value.strip()
+                if value == u'""':
+                    value = u''
+                if not option_str:
+                    raise error(lineno, 'Option without name.')
+
+                if section is None:
+                    if section_name != DEFAULT_SETTINGS:
+                        raise error(lineno, 'Option outside of a section.')
+                    if option_str == CALLBACK:
+                        settings[2] = value
+                        last = settings, 2
+                    else:
+                        print u'Unknown option %s at line %d' % (option_str.encode('utf-8'), lineno,)
+                        last = None, None
+                    continue
+
+                if section is defaults and option_str == CALLBACK: # default of the root menu callback
+                    default_settings[2] = value
+                    last = default_settings, 2
+                    continue
+
+                option_l = option_str.split(name_to_property_sep)
+                if len(option_l) < 2 or not all(option_l):
+                    raise error(lineno, 'Malformed option %s.' % (option_str.encode('utf-8'),))
+
+                node = section
+                for name in option_l[:-2]:
+                    node = get_child(node, name, name)
+                    if node[3] is None:
+                        node[3] = []
+                        node[4] = {}
+
+                opt_name = option_l[-2]
+                opt_property = option_l[-1]
+                if opt_property == DYNAMIC:
+                    get_child(node, (opt_name,), opt_name)
+                    last = None, None
+                    continue
+
+                node = get_child(node, opt_name, opt_name)
+                if opt_property == LABEL:
+                    node[1] = value
+                    last = node, 1
+                elif opt_property == CALLBACK:
+                    node[2] = value
+                    last = node, 2
+                else:
+                    print u'Unknown option %s at line %d' % (option_str.encode('utf-8'), lineno,)
+                    last = None, None
+
+        def to_template(node):
+            # option names are kept unicode, as by RawConfigParser
+            if len(node) == 1:
+                return (node[0],)
+            name, label, callback, children, _ = node
+            if children is not None:
+                children = tuple(to_template(child) for child in children)
+            return (name, label and label.encode('utf-8'), callback, children,)
+
+        if defaults[3]:
+            roots = [merge(defaults, section) for section in roots]
+        for section in roots:
+            if not section[3]:
+                raise error(headers[section[0]], "Not sections could be found.")
+
+        root_callback = settings[2]
+        if root_callback is None and has_settings:
+            root_callback = default_settings[2]
+        if root_callback is None and has_settings:
+            raise NoOptionError(CALLBACK, DEFAULT_SETTINGS)
+        roots = tuple((section[0].encode('utf-8'),) + to_template(section)[1:] for section in roots)
+        return AbstractMenuBuilder.Template(roots, root_callback,)
@@ -0,0 +1,369 @@
+from multiprocessing.pool import ThreadPool
+from types import DictType, StringType, UnicodeType, IntType, FloatType
+import collections
+import threading
+
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.MenuHandler import MenuHandler
+
+
+class AsyncMenuHandler(MenuHandler):
+    """
+        L{Menu handler<MenuHandler>} which runs the callbacks in a pool of worker threads instead of the thread
+        navigating the menu, so that a slow callback (network mount, hardware I/O...) does not freeze the input
+        handling and the display.
+
+        When a callback is triggered, L{get_current_location<MenuHandler.get_current_location>} (and therefore
+        L{forward<MenuHandler.forward>} or L{back<MenuHandler.back>}) returns the L{placeholder} label right
+        away. Once the callback is over, its L{result<AsyncMenuHandler.Result>} is given to the
+        L{result_listener} (from a worker thread) and can also be L{polled<AsyncMenuHandler.poll>} from the
+        navigating thread. A fresh result of a L{cached callback<CachedCallback>} is returned right away
+        instead of the placeholder.
+
+        Only one callback is pending at a time:
+            - moving away (L{next<MenuHandler.next>}, L{previous<MenuHandler.previous>}, ...) or triggering
+            another callback cancels the pending one. A cancelled callback which has not started yet is never
+            run, one which has started runs to the end but its result is discarded.
+            - a callback which does not end within its timeout is reported as timed out and its result
+            discarded.
+            - replacing the L{menu<AsyncMenuHandler.menu>} (or L{remapping<AsyncMenuHandler.remap>} it) cancels
+            the pending callback as well, so that no result of the former menu is delivered afterwards.
+
+        Callbacks without timeout are run by the pool of L{workers}: a cancelled one which has started holds its
+        worker until it returns. A callback which times out cannot be stopped either and keeps running until it
+        returns: callbacks with a timeout are therefore run in their own (daemon) thread so that a hung
+        callback never holds a worker and delays the following callbacks. At most one such thread runs a given
+        callback: activating a callback whose former run is not over yet waits for that run (within its own
+        timeout) rather than starting another thread.
+    """
+
+    PLACEHOLDER = '...'
+    """ Default label returned while a callback is running. """
+
+    MAX_RESULTS = 16
+    """ Number of results kept for L{polling<AsyncMenuHandler.poll>}, the oldest ones are dropped first. """
+
+    Result = collections.namedtuple('Result',
+                                    (
+                                     'callback',
+                                     'value',
+                                     'error',
+                                     'timed_out',
+                                     )
+                                    )
+    """
+        Result of a callback run by an L{asynchronous menu handler<AsyncMenuHandler>}.
+        Properties of the result:
+            - callback: name of the callback.
+            - value: string returned by the callback or C{None}.
+            - error: exception raised by the callback or C{None}.
+            - timed_out: C{True} if the callback did not end within its timeout.
+    """
+
+    class Task(object):
+        """
+            Callback submitted to the worker threads.
+        """
+
+        def __init__(self, callback_name):
+            self.callback_name = callback_name
+            self.cancelled = False
+            self.done = False
+            self.timer = None
+
+    def __init__(self, menu, callbacks=None, workers=1, timeouts=None, default_timeout=None,
+                 placeholder=PLACEHOLDER, result_listener=None, options=None):
+        """
+            Initializes this menu handler.
+
+            @param menu: see L{MenuHandler.__init__}
+            @param callbacks: see L{MenuHandler.__init__}
+            @param workers: number of worker threads running the callbacks without timeout.
+            @type workers: IntType
+            @param timeouts: timeout in seconds by callback name.
+            @type timeouts: DictType
+            @param default_timeout: timeout in seconds of the callbacks not found in L{timeouts}. C{None} for no
+            timeout.
+            @type default_timeout: FloatType
+            @param placeholder: label returned while a callback is running.
+            @type placeholder: StringType
+            @param result_listener: function invoked with the L{result<AsyncMenuHandler.Result>} of each
+            callback that was neither cancelled nor discarded. It is invoked from a worker or timer thread.
+            @param options: see L{MenuHandler.__init__}. The callbacks are timed by the observer in the worker
+            threads and the timeouts are notified from the timer threads. A callback being prefetched is run
+            again by the worker threads if activated before its prefetch is over.
+            @type options: MenuHandler.Options
+
+            @precondition: workers > 0
+            @precondition: timeouts is None or all(isinstance(k, (StringType, UnicodeType))
+                                                   and v > 0 for k, v in timeouts.iteritems())
+            @precondition: default_timeout is None or default_timeout > 0
+            @precondition: result_listener is None or callable(result_listener)
+        """
+        assert isinstance(workers, IntType)
+        assert workers > 0
+        assert timeouts is None or isinstance(timeouts, DictType)
+        assert timeouts is None or all(isinstance(k, (StringType, UnicodeType,))
+                                       and isinstance(v, (IntType, FloatType,))
+                                       and v > 0 for k, v in timeouts.iteritems())
+        assert default_timeout is None or isinstance(default_timeout, (IntType, FloatType,))
+        assert default_timeout is None or default_timeout > 0
+        assert isinstance(placeholder, (StringType, UnicodeType,))
+        assert result_listener is None or callable(result_listener)
+
+        super(AsyncMenuHandler, self).__init__(menu, callbacks, options)
+
+        self.__pool = ThreadPool(workers)
+        self.__timeouts = timeouts or {}
+        self.__default_timeout = default_timeout
+        self.__placeholder = placeholder
+        self.__result_listener = result_listener
+        self.__lock = threading.Lock()
+        self.__pending = None
+        # callback name -> tasks waiting for the thread running that callback with a timeout
+        self.__running = {}
+        self.__results = collections.deque(maxlen=AsyncMenuHandler.MAX_RESULTS)
+
+    def back(self):
+        self.cancel()
+        return super(AsyncMenuHandler, self).back()
+
+    def forward(self):
+        self.cancel()
+        return super(AsyncMenuHandler, self).forward()
+
+    def next(self):
+        self.cancel()
+        return super(AsyncMenuHandler, self).next()
+
+    def previous(self):
+        self.cancel()
+        return super(AsyncMenuHandler, self).previous()
+
+    def jump_to(self, location):
+        self.cancel()
+        return super(AsyncMenuHandler, self).jump_to(location)
+
+    def process(self, events):
+        events = tuple(events)
+        if events: # as the first event would
+            self.cancel()
+        return super(AsyncMenuHandler, self).process(events)
+
+    def remap(self, menu):
+        self.cancel()
+        super(AsyncMenuHandler, self).remap(menu)
+
+    def cancel(self):
+        """
+            Cancels the pending callback if any.
+
+            @return: C{True} if a callback was cancelled.
+            @rtype: BooleanType
+        """
+        with self.__lock:
+            task = self.__pending
+            if task is None:
+                return False
+            self.__pending = None
+            task.cancelled = True
+
+        if task.timer is not None:
+            task.timer.cancel()
+        return True
+
+    def poll(self):
+        """
+            Returns the oldest L{result<AsyncMenuHandler.Result>} not polled yet, C{None} if there is none.
+            Only the results of the callbacks which were neither cancelled nor discarded are kept.
+
+            @rtype: AsyncMenuHandler.Result
+        """
+        try:
+            return self.__results.popleft()
+        except IndexError:
+            return None
+
+    def close(self):
+        """
+            Cancels the pending callback and stops the worker threads. This entity must not be used afterwards.
+        """
+        self.cancel()
+        self.__pool.close()
+        self.__pool.join()
+
+    def _invoke_callback(self, callback_name):
+        callback = self.callbacks[callback_name]
+
+        self.cancel()
+        if isinstance(callback, CachedCallback):
+            found, value = self.callback_cache.get(callback_name)
+            if found:
+                return value
+
+        task = AsyncMenuHandler.Task(callback_name)
+        with self.__lock:
+            self.__pending = task
+
+        timeout = self.__timeouts.get(callback_name, self.__default_timeout)
+        if timeout is None:
+            self.__pool.apply_async(self.__run, (task, callback,))
+        else:
+            task.timer = threading.Timer(timeout, self.__time_out, (task,))
+            task.timer.daemon = True
+            with self.__lock:
+                waiting = self.__running.get(callback_name)
+                if waiting is None:
+                    self.__running[callback_name] = [task]
+                else: # a former run is not over yet (timed out or cancelled): its result is used
+                    waiting.append(task)
+            task.timer.start()
+            if waiting is None:
+                # a timed out callback keeps running: it must not hold a worker of the pool
+                thread = threading.Thread(target=self.__run_timed, args=(callback_name, callback,),
+                                          name='AsyncMenuHandler')
+                thread.daemon = True
+                thread.start()
+        return self.__placeholder
+
+    def _leave_callback(self):
+        self.cancel()
+
+    def __run(self, task, callback):
+        """
+            Runs the given L{callback} for the given L{task} in a worker thread.
+        """
+        if task.cancelled:
+            return
+
+        value, error = self.__call(task.callback_name, callback)
+        if error is None and isinstance(callback, CachedCallback) and not task.cancelled:
+            self.callback_cache.put(task.callback_name, value, callback.ttl)
+        self.__complete(task, AsyncMenuHandler.Result(task.callback_name, value, error, False))
+
+    def __run_timed(self, callback_name, callback):
+        """
+            Runs the given L{callback}, which has a timeout, in its own thread and completes the tasks waiting
+            for it: the task it was started for and the ones activated again before it was over.
+        """
+        value, error = self.__call(callback_name, callback)
+
+        with self.__lock:
+            tasks = self.__running.pop(callback_name)
+        for task in tasks:
+            task.timer.cancel()
+        if error is None and isinstance(callback, CachedCallback) and not all(t.cancelled for t in tasks):
+            self.callback_cache.put(callback_name, value, callback.ttl)
+        result = AsyncMenuHandler.Result(callback_name, value, error, False)
+        for task in tasks:
+            self.__complete(task, result)
+
+    def __call(self, callback_name, callback):
+        """
+            Invokes the given L{callback}, timed by the observer if any.
+
+            @return: tuple of the value returned by the callback and of the exception it raised (C{None} if any).
+            @rtype: TupleType
+        """
+        observer = self.observer
+        if observer is not None:
+            start = observer.clock()
+
+        value = error = None
+        try:
+            value = callback()
+            assert value is None or isinstance(value, (StringType, UnicodeType,)), str(value)
+        except Exception as e:
+            error = e
+
+        if observer is not None:
+            observer.on_callback(callback_name, observer.clock() - start, error)
+        return value, error
+
+    def __time_out(self, task):
+        """
+            Reports the given L{task} as timed out.
+        """
+        if self.__complete(task, AsyncMenuHandler.Result(task.callback_name, None, None, True)):
+            if self.observer is not None:
+                self.observer.on_callback_timeout(task.callback_name)
+
+    def __complete(self, task, result):
+        """
+            Records and notifies the L{result} of the given L{task} unless it was cancelled or already
+            completed.
+
+            @return: C{True} if the result was recorded.
+            @rtype: BooleanType
+        """
+        with self.__lock:
+            if task.cancelled or task.done:
+                return False
+            task.done = True
+            if self.__pending is task:
+                self.__pending = None
+            self.__results.append(result)
+
+        if self.__result_listener is not None:
+            self.__result_listener(result)
+        return True
+
+    def menu(): # @NoSelf
+        def fget(self):
+            return MenuHandler.menu.fget(self)
+
+        def fset(self, menu):
+            self.cancel()
+            MenuHandler.menu.fset(self, menu)
+        return locals()
+
+    menu = property(**menu())
+    """
+        Getter:
+        =======
+        Gets the menu handled by this entity.
+
+        @rtype: AbstractMenuBuilder.Menu or FlatMenu
+
+        Setter:
+        =======
+        Cancels the pending callback, if any, and replaces the menu handled by this entity, see L{MenuHandler.
+        menu}.
+    """
+
+    def pending(): # @NoSelf
+        def fget(self):
+            task = self.__pending
+            return None if task is None else task.callback_name
+        return locals()
+
+    pending = property(**pending())
+    """
+        Getter:
+        =======
+        Gets the name of the pending callback of this entity, C{None} if there is none.
+
+        @rtype: StringType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def placeholder(): # @NoSelf
+        def fget(self):
+            return self.__placeholder
+        return locals()
+
+    placeholder = property(**placeholder())
+    """
+        Getter:
+        =======
+        Gets the label returned by this entity while a callback is running.
+
+        @rtype: StringType
+
+        Setter:
+        =======
+        Not settable.
+    """
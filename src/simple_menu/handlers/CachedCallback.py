@@ -0,0 +1,95 @@
+from types import IntType, FloatType, BooleanType
+
+
+class CachedCallback(object):
+    """
+        Wraps a callback, in the callbacks given to a L{menu handler<simple_menu.handlers.MenuHandler.
+        MenuHandler>}, whose result should be memoized in the handler's L{callback cache<simple_menu.handlers.
+        CallbackCache.CallbackCache>}.
+
+        It suits callbacks returning a label which is expensive to compute and only changes every now and then
+        (sensor reading, IP address, status line...): while the cached result is fresh, activating the section
+        returns it without invoking the callback. Callbacks with side effects should not be cached.
+
+        Cached callbacks can also be marked for L{prefetching<simple_menu.handlers.Prefetcher.Prefetcher>}:
+        their results are then computed ahead of time, in a worker thread, while the user is near their section.
+    """
+
+    def __init__(self, function, ttl=None, prefetch=False):
+        """
+            Initializes this cached callback.
+
+            @param function: callback invoked without parameters.
+            @param ttl: number of seconds the result stays fresh. C{None} to keep it until it is explicitly
+            L{invalidated<simple_menu.handlers.CallbackCache.CallbackCache.invalidate>} or evicted.
+            @type ttl: FloatType
+            @param prefetch: if C{True}, the callback may be invoked speculatively, from a worker thread, before
+            its section is activated.
+            @type prefetch: BooleanType
+
+            @precondition: callable(function)
+            @precondition: ttl is None or ttl > 0
+        """
+        assert callable(function)
+        assert ttl is None or isinstance(ttl, (IntType, FloatType,))
+        assert ttl is None or ttl > 0
+        assert isinstance(prefetch, BooleanType)
+
+        self.__function = function
+        self.__ttl = ttl
+        self.__prefetch = prefetch
+
+    def __call__(self):
+        return self.__function()
+
+    def function(): # @NoSelf
+        def fget(self):
+            return self.__function
+        return locals()
+
+    function = property(**function())
+    """
+        Getter:
+        =======
+        Gets the wrapped callback of this entity.
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def ttl(): # @NoSelf
+        def fget(self):
+            return self.__ttl
+        return locals()
+
+    ttl = property(**ttl())
+    """
+        Getter:
+        =======
+        Gets the number of seconds the result of this entity stays fresh, C{None} for no limit.
+
+        @rtype: FloatType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def prefetch(): # @NoSelf
+        def fget(self):
+            return self.__prefetch
+        return locals()
+
+    prefetch = property(**prefetch())
+    """
+        Getter:
+        =======
+        Gets whether this entity may be invoked speculatively, before its section is activated.
+
+        @rtype: BooleanType
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,171 @@
+from types import IntType, FloatType
+import collections
+import threading
+import time
+
+from simple_menu.handlers.CachedCallback import CachedCallback
+
+
+class CallbackCache(object):
+    """
+        Bounded cache of the results of L{cached callbacks<simple_menu.handlers.CachedCallback.CachedCallback>}
+        used by L{menu handlers<simple_menu.handlers.MenuHandler.MenuHandler>}.
+
+        Results are kept by callback name until their time to live expires or they are explicitly
+        L{invalidated<CallbackCache.invalidate>}. Once L{max_size} results are held, the least recently used
+        one is evicted. The cache counts its L{hits<CallbackCache.hits>} and L{misses<CallbackCache.misses>}.
+
+        A cache can be shared by several menu handlers and is safe to use from several threads.
+    """
+
+    MAX_SIZE = 128
+    """ Default maximum number of results held. """
+
+    def __init__(self, max_size=MAX_SIZE, clock=time.time):
+        """
+            Initializes this cache.
+
+            @param max_size: maximum number of results held.
+            @type max_size: IntType
+            @param clock: function returning the current time in seconds.
+
+            @precondition: max_size > 0
+            @precondition: callable(clock)
+        """
+        assert isinstance(max_size, IntType)
+        assert max_size > 0
+        assert callable(clock)
+
+        self.__max_size = max_size
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        # callback name -> (result, expiry time or None)
+        self.__entries = collections.OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key):
+        """
+            Looks up the fresh result cached under the given L{key}.
+
+            @param key: callback name.
+            @return: a tuple C{(found, result)}. C{result} is C{None} when not found.
+            @rtype: TupleType
+        """
+        with self.__lock:
+            entries = self.__entries
+            try:
+                entry = entries.pop(key)
+            except KeyError:
+                self.__misses += 1
+                return False, None
+
+            if entry[1] is not None and entry[1] <= self.__clock():
+                self.__misses += 1
+                return False, None
+
+            entries[key] = entry # most recently used
+            self.__hits += 1
+            return True, entry[0]
+
+    def contains(self, key):
+        """
+            Returns whether a fresh result is cached under the given L{key}. Unlike L{get<CallbackCache.get>},
+            it neither counts as a hit or a miss nor marks the result as recently used.
+
+            @param key: callback name.
+            @rtype: BooleanType
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > self.__clock())
+
+    def put(self, key, result, ttl=None):
+        """
+            Caches the given L{result} under the given L{key}.
+
+            @param key: callback name.
+            @param result: result of the callback.
+            @param ttl: number of seconds the result stays fresh, C{None} for no limit.
+            @type ttl: FloatType
+
+            @precondition: ttl is None or ttl > 0
+        """
+        assert ttl is None or isinstance(ttl, (IntType, FloatType,))
+        assert ttl is None or ttl > 0
+
+        with self.__lock:
+            entries = self.__entries
+            entries.pop(key, None)
+            entries[key] = (result, None if ttl is None else self.__clock() + ttl,)
+            while len(entries) > self.__max_size:
+                entries.popitem(last=False)
+
+    def get_or_call(self, key, callback):
+        """
+            Returns the fresh result cached under the given L{key} or, if there is none, invokes the given
+            L{callback} and caches its result.
+
+            @param key: callback name.
+            @type callback: CachedCallback
+
+            @precondition: isinstance(callback, CachedCallback)
+        """
+        assert isinstance(callback, CachedCallback)
+
+        found, result = self.get(key)
+        if not found:
+            result = callback()
+            self.put(key, result, callback.ttl)
+        return result
+
+    def invalidate(self, key=None):
+        """
+            Drops the result cached under the given L{key}, or all the results if L{key} is C{None}.
+
+            @param key: callback name.
+        """
+        with self.__lock:
+            if key is None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(key, None)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def hits(): # @NoSelf
+        def fget(self):
+            return self.__hits
+        return locals()
+
+    hits = property(**hits())
+    """
+        Getter:
+        =======
+        Gets the number of lookups of this entity which found a fresh result.
+
+        @rtype: IntType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def misses(): # @NoSelf
+        def fget(self):
+            return self.__misses
+        return locals()
+
+    misses = property(**misses())
+    """
+        Getter:
+        =======
+        Gets the number of lookups of this entity which did not find a fresh result.
+
+        @rtype: IntType
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,232 @@
+from types import IntType, StringType, UnicodeType
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FlatMenu import FlatMenu
+
+
+class FrameCache(object):
+    """
+        Display frames of the sections of a L{menu<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.
+        Menu>} for a fixed width character display (16x2 LCD...), ready to be written to the display.
+
+        The frames of a section are the lines of its label (or name) encoded for the display:
+            - a label which fits the L{width<FrameCache.width>} has one frame: the label padded with spaces.
+            - a longer label has one frame per character of the label followed by the L{gap<FrameCache.gap>}:
+            the label scrolled by one character per frame (marquee), the first frame being the truncated
+            label.
+
+        Frames are computed the first time the frames of a section are L{requested<FrameCache.get>} and then
+        kept: in a list indexed by row for L{flat menus<FlatMenu>}, by section identity otherwise. The sections
+        of L{lazily fetched sections<simple_menu.builders.PagedSections.PagedSections>} are new sections each
+        time their page is fetched again: they are to be L{rendered<FrameCache.render>}, not cached. Changing the
+        L{menu<FrameCache.menu>} (after L{updating<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.
+        update_dynamic_sections>} its dynamic sections for instance) drops the frames of the sections which are
+        not part of the new menu.
+
+        The width is counted in characters: the encoding is expected to use one byte per character, as the
+        character sets of such displays do.
+    """
+
+    WIDTH = 16
+    """ Default number of characters per line. """
+
+    ENCODING = 'ascii'
+    """ Default encoding of the frames. """
+
+    GAP = u'   '
+    """ Default text separating the end of a scrolled label from its beginning. """
+
+    def __init__(self, menu, width=WIDTH, encoding=ENCODING, errors='replace', gap=GAP):
+        """
+            Initializes this frame cache.
+
+            @param menu: the menu whose sections are rendered.
+            @type menu: AbstractMenuBuilder.Menu or FlatMenu
+            @param width: number of characters per line.
+            @type width: IntType
+            @param encoding: encoding of the frames.
+            @type encoding: StringType
+            @param errors: error handling scheme of the encoding (see C{unicode.encode}).
+            @type errors: StringType
+            @param gap: text separating the end of a scrolled label from its beginning.
+            @type gap: UnicodeType
+
+            @precondition: width > 0
+        """
+        assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+        assert isinstance(width, IntType)
+        assert width > 0
+        assert isinstance(encoding, StringType)
+        assert isinstance(errors, StringType)
+        assert isinstance(gap, UnicodeType)
+
+        self.__width = width
+        self.__encoding = encoding
+        self.__errors = errors
+        self.__gap = gap
+        self.__menu = None
+        self.menu = menu
+
+    def get(self, section):
+        """
+            Returns the frames of the given L{section} of the menu, computing them on first use.
+
+            @type section: AbstractMenuBuilder.Section or FlatMenu.Node
+            @return: tuple of byte strings of L{width<FrameCache.width>} characters.
+            @rtype: TupleType
+        """
+        if self.__rows is not None:
+            row = section.row
+            frames = self.__rows[row]
+            if frames is None:
+                frames = self.__rows[row] = self.render(section.label or section.name)
+            return frames
+
+        entry = self.__sections.get(id(section))
+        # the section is kept with its frames so that its id cannot be reused by another section
+        if entry is None or entry[0] is not section:
+            entry = self.__sections[id(section)] = (section, self.render(section.label or section.name),)
+        return entry[1]
+
+    def render(self, text):
+        """
+            Returns the frames of the given L{text} without caching them. It is used for texts which are not
+            labels of the menu, such as the results of the callbacks.
+
+            @param text: UTF-8 encoded or unicode text.
+            @type text: StringType
+            @return: tuple of byte strings of L{width<FrameCache.width>} characters.
+            @rtype: TupleType
+        """
+        assert isinstance(text, (StringType, UnicodeType,))
+
+        if isinstance(text, StringType):
+            text = text.decode('utf-8')
+        width = self.__width
+        encoding = self.__encoding
+        errors = self.__errors
+
+        if len(text) <= width:
+            return (text.ljust(width).encode(encoding, errors),)
+
+        text += self.__gap
+        loop = text + text[:width]
+        return tuple(loop[i:i + width].encode(encoding, errors) for i in xrange(len(text)))
+
+    def invalidate(self):
+        """
+            Drops all the frames computed so far.
+        """
+        if isinstance(self.__menu, FlatMenu):
+            self.__rows = [None] * len(self.__menu)
+            self.__sections = None
+        else:
+            self.__rows = None
+            self.__sections = {}
+
+    def __len__(self):
+        if self.__rows is not None:
+            return len(self.__rows) - self.__rows.count(None)
+        return len(self.__sections)
+
+    def menu(): # @NoSelf
+        def fget(self):
+            return self.__menu
+
+        def fset(self, menu):
+            assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+
+            former_menu = self.__menu
+            self.__menu = menu
+            if (former_menu is None
+                or isinstance(menu, FlatMenu)
+                or isinstance(former_menu, FlatMenu)
+                or not former_menu.dynamic
+                or not any(s is f for s, f in zip(menu.sections, former_menu.sections))):
+                self.invalidate()
+                return
+
+            # only the dynamic sections and the sections leading to them are not shared by an updated menu
+            stale = set()
+            for location in former_menu.dynamic:
+                parent = former_menu
+                for idx in location.path:
+                    parent = parent.sections[idx]
+                    stale.add(id(parent))
+                sections = parent.sections
+                stale.update(id(sections[idx]) for idx in xrange(location.start, location.start + location.count))
+            for key in stale:
+                self.__sections.pop(key, None)
+        return locals()
+
+    menu = property(**menu())
+    """
+        Getter:
+        =======
+        Gets the menu whose sections are rendered by this entity.
+
+        @rtype: AbstractMenuBuilder.Menu or FlatMenu
+
+        Setter:
+        =======
+        Replaces the menu whose sections are rendered by this entity. When the new menu is an L{updated copy
+        <simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.update_dynamic_sections>} of the current
+        one (it shares sections with the current one), only the frames of the dynamic sections and of the
+        sections leading to them are dropped. All the frames are dropped otherwise.
+
+        @precondition: isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+    """
+
+    def width(): # @NoSelf
+        def fget(self):
+            return self.__width
+        return locals()
+
+    width = property(**width())
+    """
+        Getter:
+        =======
+        Gets the number of characters per line of the frames of this entity.
+
+        @rtype: IntType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def encoding(): # @NoSelf
+        def fget(self):
+            return self.__encoding
+        return locals()
+
+    encoding = property(**encoding())
+    """
+        Getter:
+        =======
+        Gets the encoding of the frames of this entity.
+
+        @rtype: StringType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def gap(): # @NoSelf
+        def fget(self):
+            return self.__gap
+        return locals()
+
+    gap = property(**gap())
+    """
+        Getter:
+        =======
+        Gets the text separating the end of a scrolled label from its beginning in the frames of this entity.
+
+        @rtype: UnicodeType
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,227 @@
+from types import TupleType, ListType
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.PagedSections import PagedSections
+
+
+class MenuCursor(object):
+    """
+        Location of a user in a L{menu<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Menu>}: the
+        indexes of the sections leading to it from the root of the menu (L{location<MenuCursor.location>}) and
+        the parent, menu or section, of each of them (L{parents<MenuCursor.parents>}), kept so that no move
+        walks the menu from its root.
+
+        The moves follow the contract of L{MenuHandler<simple_menu.handlers.MenuHandler.MenuHandler>}, which
+        navigates one cursor, and of L{SessionMenuHandler<simple_menu.handlers.SessionMenuHandler.
+        SessionMenuHandler>}, which navigates one cursor per session. They only change the location: invoking
+        the callbacks is left to the handlers.
+
+        A cursor is meant to be used by one thread at a time.
+    """
+
+    __slots__ = ('location', 'parents',)
+
+    def __init__(self, menu, location=(0,)):
+        """
+            Initializes this cursor on the given L{location} of the given L{menu}.
+
+            @type menu: AbstractMenuBuilder.Menu or FlatMenu
+            @param location: tuple of the indexes of the sections leading to the location from the root of the
+            menu.
+            @type location: TupleType
+
+            @precondition: len(location) > 0
+            @raise ValueError: if L{location} is not a location of L{menu}.
+        """
+        assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+        assert isinstance(location, (TupleType, ListType,))
+        assert location
+
+        parents = []
+        parent = menu
+        for idx in location:
+            sections = parent.sections
+            if not sections or idx < 0:
+                raise ValueError('Invalid location %s.' % (tuple(location),))
+            try:
+                section = sections[idx]
+            except IndexError:
+                raise ValueError('Invalid location %s.' % (tuple(location),))
+            parents.append(parent)
+            parent = section
+
+        self.location = list(location)
+        self.parents = parents
+
+    def back(self):
+        """
+            Moves 1 level "back", see L{MenuHandler.back<simple_menu.handlers.MenuHandler.MenuHandler.back>}.
+
+            @return: C{True} if the cursor is on the first level: it does not move and the callback of the
+            menu is to be invoked.
+            @rtype: BooleanType
+        """
+        if len(self.location) > 1:
+            self.location.pop()
+            self.parents.pop()
+            return False
+        return True
+
+    def forward(self):
+        """
+            Moves 1 level "forward", see L{MenuHandler.forward<simple_menu.handlers.MenuHandler.MenuHandler.
+            forward>}.
+
+            @return: C{True} if the cursor is on a leaf section: it does not move and the callback of the
+            section is to be invoked.
+            @rtype: BooleanType
+        """
+        section = self.parents[-1].sections[self.location[-1]]
+        if section.sections: # lazily fetched sections may turn out empty
+            self.location.append(0)
+            self.parents.append(section)
+            return False
+        return True
+
+    def next(self):
+        """
+            Moves to the "next" section of the current level, looping back to the first one at the end, see
+            L{MenuHandler.next<simple_menu.handlers.MenuHandler.MenuHandler.next>}.
+        """
+        next_idx = self.location[-1] + 1
+
+        try:
+            # the length of lazily fetched sections is only known once the last ones are fetched
+            self.parents[-1].sections[next_idx]
+        except IndexError:
+            next_idx = 0 # infinite loop
+
+        self.location[-1] = next_idx
+
+    def previous(self):
+        """
+            Moves to the "previous" section of the current level, looping back to the last one at the
+            beginning, see L{MenuHandler.previous<simple_menu.handlers.MenuHandler.MenuHandler.previous>}.
+        """
+        current_idx = self.location[-1]
+
+        if current_idx == 0:
+            current_idx = len(self.parents[-1].sections) # infinite loop
+
+        self.location[-1] = current_idx - 1
+
+    def move(self, moves):
+        """
+            Moves by the given number of sections on the current level, looping at both ends: the same as
+            L{next<MenuCursor.next>} or L{previous<MenuCursor.previous>} invoked L{moves} times.
+
+            @param moves: number of sections, negative to move backwards.
+            @type moves: IntType
+        """
+        sections = self.parents[-1].sections
+        target = self.location[-1] + moves
+        if target >= 0:
+            try:
+                # the length of lazily fetched sections is only known once the last ones are fetched
+                sections[target]
+                self.location[-1] = target
+                return
+            except IndexError:
+                pass
+        self.location[-1] = target % len(sections)
+
+    def get_section(self):
+        """
+            Returns the section of the current location.
+
+            @rtype: AbstractMenuBuilder.Section
+        """
+        return self.parents[-1].sections[self.location[-1]]
+
+    def get_node(self, use_callback):
+        """
+            Returns the node (menu or section) whose label or callback is used for the current location: the
+            menu itself when its callback is used on the first level (see L{MenuHandler.get_current_location
+            <simple_menu.handlers.MenuHandler.MenuHandler.get_current_location>}), the current section
+            otherwise.
+
+            @type use_callback: BooleanType
+        """
+        if use_callback and len(self.location) == 1: # root menu is a special sections
+            return self.parents[0]
+        return self.parents[-1].sections[self.location[-1]]
+
+    def locate(self, menu):
+        """
+            Returns a new cursor on the location of this one in the given L{menu}, found by section names
+            rather than by indexes: on each level, the section of the same name is looked for (at the same
+            index first). When a section is gone, the location falls back to its parent or, on the first level,
+            to the section at the same index (clamped). Lazily fetched sections are not searched.
+
+            @type menu: AbstractMenuBuilder.Menu or FlatMenu
+            @rtype: MenuCursor
+
+            @precondition: menu.sections
+        """
+        assert menu.sections
+
+        location = []
+        parents = []
+        parent = menu
+        for former_parent, idx in zip(self.parents, self.location):
+            sections = parent.sections
+            if not sections:
+                break
+            new_idx = MenuCursor.__find_section(sections, former_parent.sections[idx].name, idx)
+            if new_idx is None:
+                if not location:
+                    location.append(min(idx, len(sections) - 1))
+                    parents.append(parent)
+                break
+            location.append(new_idx)
+            parents.append(parent)
+            parent = sections[new_idx]
+
+        cursor = MenuCursor.__new__(MenuCursor)
+        cursor.location = location
+        cursor.parents = parents
+        return cursor
+
+    @staticmethod
+    def __find_section(sections, name, idx):
+        """
+            Returns the index of the section of the given L{name} in L{sections}, looking at the given index
+            L{idx} first. Lazily fetched sections are not searched.
+
+            @return: the index of the section, C{None} if there is none.
+        """
+        try:
+            if sections[idx].name == name:
+                return idx
+        except IndexError:
+            pass
+
+        if not isinstance(sections, PagedSections):
+            for new_idx, section in enumerate(sections):
+                if section.name == name:
+                    return new_idx
+        return None
+
+    def menu(): # @NoSelf
+        def fget(self):
+            return self.parents[0]
+        return locals()
+
+    menu = property(**menu())
+    """
+        Getter:
+        =======
+        Gets the menu of the location of this entity.
+
+        @rtype: AbstractMenuBuilder.Menu or FlatMenu
+
+        Setter:
+        =======
+        Not settable.
+    """
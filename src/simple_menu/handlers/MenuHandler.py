@@ -1,6 +1,17 @@
 from types import DictType, StringType, UnicodeType, BooleanType
+import bisect
 import collections
+import functools
 from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.CompiledMenu import CompiledMenu
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.PagedSections import PagedSections
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.CallbackCache import CallbackCache
+from simple_menu.handlers.FrameCache import FrameCache
+from simple_menu.handlers.MenuCursor import MenuCursor
+from simple_menu.handlers.Prefetcher import Prefetcher
+from simple_menu.instrumentation.Observer import Observer
 
 class MenuHandler(object):
     """
@@ -26,33 +37,99 @@ class MenuHandler(object):
             -> L3 (B.a.a)
     """
 
-    def __init__(self, menu, callbacks=None):
+    OPERATIONS = ('back', 'forward', 'next', 'previous', 'jump_to', 'process',)
+    """
+        Navigation methods timed when an L{observer<MenuHandler.observer>} is given and followed by prefetches
+        when a L{prefetcher<MenuHandler.prefetcher>} is given.
+    """
+
+    Options = collections.namedtuple('Options',
+                                     (
+                                      'callback_cache',
+                                      'observer',
+                                      'frame_cache',
+                                      'prefetcher',
+                                      )
+                                     )
+    """
+        Optional collaborators of a L{menu handler<MenuHandler>}, all C{None} by default.
+        Properties of the options:
+            - callback_cache: L{cache<CallbackCache>} of the results of the L{cached callbacks<CachedCallback>}.
+            A new cache is created if C{None}; it may be shared by several menu handlers.
+            - observer: L{observer<Observer>} notified of the timings of the L{navigation operations
+            <MenuHandler.OPERATIONS>} and of the callbacks. When C{None}, nothing is timed.
+            - frame_cache: L{display frames<FrameCache>} of the sections of the menu, used by
+            L{get_current_frames<MenuHandler.get_current_frames>}. Its menu follows the L{menu<MenuHandler.menu>}
+            of the handler.
+            - prefetcher: L{prefetcher<Prefetcher>} of the results of the callbacks of the current section and of
+            its siblings, requested after each L{navigation operation<MenuHandler.OPERATIONS>}. Only the
+            L{cached callbacks<CachedCallback>} marked for L{prefetching<CachedCallback.prefetch>} are
+            prefetched. A callback activated while being prefetched waits for its prefetch at most
+            L{Prefetcher.wait_timeout} seconds.
+    """
+    Options.__new__.__defaults__ = (None,) * len(Options._fields)
+
+    def __init__(self, menu, callbacks=None, options=None):
         """
             Initializes this menu handler.
 
-            @param menu: the menu to handle
-            @type menu:AbstractMenuBuilder.Menu
+            @param menu: the menu to handle. Menus L{compiled<CompiledMenu.compile>} with their callbacks are
+            navigated without any check or callback lookup.
+            @type menu:AbstractMenuBuilder.Menu or FlatMenu
             @param callbacks: dictionary of L{menu callback<simple_menu.builders.AbstractMenuBuilder.
             AbstractMenuBuilder.Menu.callback>} or L{section callbacks<simple_menu.builders.AbstractMenuBuilder.
             AbstractMenuBuilder.Section.callback>}. Those functions will be invoked as described by the class
-            contract.
+            contract. The results of the functions wrapped in a L{CachedCallback} are memoized in the
+            L{callback cache<MenuHandler.callback_cache>}. Defaults to the callbacks of L{menu} if it is
+            compiled. Unless they are the very callbacks of the compiled menu (its C{callbacks} dictionary, the
+            default), callbacks are looked up on each invocation.
+            @param options: optional collaborators of this handler.
+            @type options: MenuHandler.Options
 
             @precondition: callbacks is None or isinstance(callbacks, DictType)
             @precondition: callbacks is None or all( isinstance(k, (StringType, UnicodeType)
                                                                 and callable(v) for k, v in callbacks.iteritems())
+            @precondition: options.frame_cache is None or options.frame_cache.menu is menu
         """
-        assert isinstance(menu, AbstractMenuBuilder.Menu)
+        assert options is None or isinstance(options, MenuHandler.Options)
+        callback_cache, observer, frame_cache, prefetcher = options or MenuHandler.Options()
+
+        assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
         assert menu.sections
         assert callbacks is None or isinstance(callbacks, DictType)
         assert callbacks is None or callbacks
         assert callbacks is None or isinstance(callbacks, DictType)
-        assert callbacks is None or all(isinstance(k, (StringType, UnicodeType,))
-                                        and callable(v) for k, v in callbacks.iteritems())
+        # compiled menus were validated with their callbacks once and for all
+        assert ((isinstance(menu, CompiledMenu) and callbacks is menu.callbacks)
+                or callbacks is None
+                or all(isinstance(k, (StringType, UnicodeType,)) and callable(v) for k, v in callbacks.iteritems()))
+        assert callback_cache is None or isinstance(callback_cache, CallbackCache)
+        assert observer is None or isinstance(observer, Observer)
+        assert frame_cache is None or isinstance(frame_cache, FrameCache)
+        assert frame_cache is None or frame_cache.menu is menu
+        assert prefetcher is None or isinstance(prefetcher, Prefetcher)
+
+        if callbacks is None and isinstance(menu, CompiledMenu):
+            callbacks = menu.callbacks
 
-        self.__menu = menu
         self.__callbacks = callbacks
-        self.__current_location = collections.deque()
-        self.__current_location.append(0)
+        self.__callback_cache = CallbackCache() if callback_cache is None else callback_cache
+        self.__cursor = MenuCursor(menu)
+        self.__observer = observer
+        self.__frame_cache = frame_cache
+        self.__prefetcher = prefetcher
+        # callbacks of compiled menus are invoked directly unless they have to go through the hook
+        self.__hooked_callbacks = (observer is not None
+                                   or prefetcher is not None
+                                   or type(self)._invoke_callback.__func__ is not MenuHandler._invoke_callback.__func__)
+        self.__use_fast_path(menu)
+        # the wrapped methods shadow the ones of the class so that handlers without them pay nothing
+        if prefetcher is not None and callbacks is not None:
+            for operation in MenuHandler.OPERATIONS:
+                setattr(self, operation, self.__prefetch_operation(getattr(self, operation)))
+        if observer is not None:
+            for operation in MenuHandler.OPERATIONS:
+                setattr(self, operation, self.__observe_operation(getattr(self, operation), operation))
 
     def back(self):
         """
@@ -73,13 +150,7 @@ class MenuHandler(object):
 
             @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
         """
-        if len(self.__current_location) > 1:
-            self.__current_location.pop()
-            use_callback = False
-        else:
-            use_callback = True
-
-        return self.get_current_location(use_callback)
+        return self.get_current_location(self.__cursor.back())
 
     def forward(self):
         """
@@ -98,14 +169,7 @@ class MenuHandler(object):
 
             @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
         """
-        section = self.__get_location(self.__menu.sections, iter(self.__current_location))
-        if section.sections is not None:
-            use_callback = False
-            self.__current_location.append(0)
-        else:
-            use_callback = True
-
-        return self.get_current_location(use_callback)
+        return self.get_current_location(self.__cursor.forward())
 
     def next(self):
         """
@@ -125,24 +189,15 @@ class MenuHandler(object):
 
             @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
         """
-        parent_section = self.__get_parent_current_location()
-
-        if parent_section.sections is not None:
-            current_idx = self.__current_location.pop()
-            next_idx = current_idx + 1
-
-            if len(parent_section.sections) == next_idx:
-                next_idx = 0 # infinite loop
-
-            self.__current_location.append(next_idx)
-
+        self.__cursor.next()
         return self.get_current_location()
 
     def previous(self):
         """
             Sets the L{current position<MenuHandler.get_current_location>} of the user on the menu to the "previous"
             element in the menu on the same level. At the end of a level the method just loops back to the
-            last element of the level.
+            last element of the level. For lazily fetched sections, looping back to the last one fetches all of
+            them (see L{PagedSections}).
 
             Based on the class contract's sample menu:
                 - if the position before invocation was on (B) after this method the user would end on (A)
@@ -157,18 +212,60 @@ class MenuHandler(object):
 
             @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
         """
+        self.__cursor.previous()
+        return self.get_current_location()
 
-        parent_section = self.__get_parent_current_location()
-        if parent_section.sections is not None:
-            current_idx = self.__current_location.pop()
-
-            if current_idx == 0:
-                current_idx = len(parent_section.sections) # infinite loop
+    def process(self, events):
+        """
+            Applies the given sequence of navigation events, as if the matching methods were invoked one after
+            the other, and returns the result of the last one. It suits bursts of input events (held down key,
+            replay of recorded input...).
 
-            next_idx = current_idx - 1
+            Only the final location is resolved: runs of C{'next'} and C{'previous'} events are applied as one
+            move on the current level and moving L{forward<MenuHandler.forward>} then L{back<MenuHandler.back>}
+            only changes the current location. The callbacks triggered by the events are still invoked, in
+            order, but only the result of the last event is returned.
 
-            self.__current_location.append(next_idx)
+            @param events: iterable of names of the navigation methods: C{'next'}, C{'previous'}, C{'forward'}
+            or C{'back'}.
+            @return: the result of the invocation of the method of the last event, the result of the L{current
+            location method<MenuHandler.get_current_location>} if there is no event.
 
+            @precondition: all(e in ('next', 'previous', 'forward', 'back',) for e in events)
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+        """
+        cursor = self.__cursor
+        moves = 0
+        called = invoked = False
+        r = None
+
+        for event in events:
+            if event == 'next':
+                moves += 1
+                called = False
+            elif event == 'previous':
+                moves -= 1
+                called = False
+            else:
+                if moves:
+                    cursor.move(moves)
+                    moves = 0
+
+                if event == 'forward':
+                    called = cursor.forward()
+                else:
+                    assert event == 'back', event
+                    called = cursor.back()
+                if called:
+                    r = self.get_current_location(True)
+                    invoked = True
+
+        if moves:
+            cursor.move(moves)
+        if called:
+            return r
+        if invoked: # moved away from the last callback
+            self._leave_callback()
         return self.get_current_location()
 
     def get_current_location(self, use_callback=False):
@@ -189,14 +286,10 @@ class MenuHandler(object):
             @postcondition: return is None or isinstance(r, (StringType, UnicodeType,))
         """
         assert isinstance(use_callback, BooleanType)
-        if len(self.__current_location) == 1 and use_callback: # root menu is a special sections
-            section = self.__menu
-        else:
-            section = self.__get_location(self.__menu.sections, iter(self.__current_location))
-
+        section = self.__cursor.get_node(use_callback)
 
         if use_callback and section.callback is not None:
-            r = self.__callbacks[section.callback]()
+            r = self._invoke_callback(section.callback)
 
             if r is None:
                 return r
@@ -211,43 +304,379 @@ class MenuHandler(object):
         assert section.name
         return section.name
 
-    def __get_parent_current_location(self,):
+    def get_current_frames(self, use_callback=False):
+        """
+            Same as L{get_current_location<MenuHandler.get_current_location>} but returns the display frames of
+            the resulting text, as computed by the L{frame cache<MenuHandler.frame_cache>}. The frames of the
+            labels and names of the sections are cached, the ones of the results of the callbacks and of the
+            lazily fetched sections (see L{PagedSections}), which are new sections each time their page is
+            fetched again, are not.
+
+            @type use_callback: BooleanType
+            @return: tuple of byte strings, C{None} if the callback returned C{None}.
+            @rtype: TupleType
+
+            @precondition: self.frame_cache is not None
+        """
+        assert self.__frame_cache is not None
+        assert isinstance(use_callback, BooleanType)
+
+        if use_callback:
+            r = self.get_current_location(use_callback)
+            return None if r is None else self.__frame_cache.render(r)
+
+        cursor = self.__cursor
+        sections = cursor.parents[-1].sections
+        section = sections[cursor.location[-1]]
+        if isinstance(sections, PagedSections):
+            return self.__frame_cache.render(section.label or section.name)
+        return self.__frame_cache.get(section)
+
+    def __get_compiled_location(self, use_callback=False):
+        """
+            L{get_current_location<MenuHandler.get_current_location>} of the L{compiled menus<CompiledMenu>}:
+            their sections hold their text and callback function, which were validated at compile time.
         """
-            Returns the parent L{section<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Section>} or
-            the L{menu<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Menu>} for the the current
-            location internally kept.
+        cursor = self.__cursor
+        if use_callback:
+            section = cursor.get_node(use_callback)
+            function = section.function
+            if function is not None:
+                if not self.__direct_callbacks:
+                    return self._invoke_callback(section.callback)
+                if isinstance(function, CachedCallback):
+                    return self.__callback_cache.get_or_call(section.callback, function)
+                return function()
+            # as get_current_location, fails on a menu without callback: it has no text
+            return section.text
+
+        return cursor.parents[-1].sections[cursor.location[-1]].text
+
+    def __use_fast_path(self, menu):
+        """
+            Shadows L{get_current_location<MenuHandler.get_current_location>} by its fast path if the given
+            L{menu} is compiled, restores it otherwise. The callback functions resolved at compile time are only
+            invoked directly if the callbacks of this handler are the ones of the menu.
+        """
+        if isinstance(menu, CompiledMenu):
+            # compared by identity: compiled menus hold their own copy of their callbacks
+            self.__direct_callbacks = not self.__hooked_callbacks and menu.callbacks is self.__callbacks
+            self.get_current_location = self.__get_compiled_location
+        else:
+            self.__dict__.pop('get_current_location', None)
 
-            @rtype: AbstractMenuBuilder.Menu or AbstractMenuBuilder.Section
+    def jump_to(self, location):
         """
-        if len(self.__current_location) <= 1: # we want the menu
-            return self.__menu
+            Sets the L{current position<MenuHandler.get_current_location>} of the user on the menu to the given
+            L{location} directly, without walking to it.
 
-        last_index = len(self.__current_location) - 2
+            Based on the class contract's sample menu, jumping to C{(1, 0, 0,)} puts the user on (B.a.a).
 
-        section = self.__menu
-        for idx, loc in enumerate(self.__current_location):
-            section = section.sections[loc]
-            if last_index == idx:
-                return section
+            @param location: tuple of the indexes of the sections leading to the new position from the root of
+            the menu, as returned by L{MenuHandler.location} or L{MenuIndex.find<simple_menu.handlers.
+            MenuIndex.MenuIndex.find>}.
+            @type location: TupleType
+            @return: returns the result of the invocation of L{current location method<MenuHandler.
+            get_current_location>} on the new location.
 
-    def __get_location(self, sections, location_iterator):
+            @precondition: len(location) > 0
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+            @raise ValueError: if L{location} is not a location of the menu.
         """
-            Returns the L{section<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Section>} or
-            the L{menu<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Menu>} for the the current
-            location internally kept.
+        assert location
+
+        self.__cursor = MenuCursor(self.__cursor.menu, location)
+        return self.get_current_location()
 
-            @param sections: tuple of sections to travel to get to the current location
-            @type sections: TupleType
-            @param location_iterator: iterator over the current location maintaining data structure. It yields
-            integer indexes to be used in the L{sections}.
+    def search(self, index, prefix, cycle=False):
+        """
+            Jumps to the first section, in menu order from the current location, whose name or label starts
+            with the given L{prefix}. The current location is left unchanged if no section matches.
+
+            @param index: index of the menu of this handler.
+            @type index: MenuIndex
+            @type prefix: StringType
+            @param cycle: if C{True}, the current location is skipped so that successive searches with the same
+            prefix cycle through all the matching sections.
+            @type cycle: BooleanType
+            @return: returns C{None} if no section matches, the result of L{jump_to<MenuHandler.jump_to>}
+            otherwise.
+
+            @precondition: index.menu is self.menu
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+        """
+        assert index.menu is self.__cursor.menu
+        assert isinstance(cycle, BooleanType)
 
-            @rtype: AbstractMenuBuilder.Menu or AbstractMenuBuilder.Section
+        paths = index.find(prefix)
+        if not paths:
+            return None
 
-            @precondition: iter(location_iterator)
+        location = tuple(self.__cursor.location)
+        if cycle:
+            idx = bisect.bisect_right(paths, location)
+        else:
+            idx = bisect.bisect_left(paths, location)
+
+        return self.jump_to(paths[idx % len(paths)])
+
+    def remap(self, menu):
+        """
+            Replaces the menu handled by this entity by the given L{menu}, typically built from a new version of
+            the same properties file, keeping the current location by section names rather than by indexes
+            (see L{menu<MenuHandler.menu>}).
+
+            @type menu: AbstractMenuBuilder.Menu or FlatMenu
+
+            @precondition: isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+            @precondition: menu.sections
+        """
+        assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+        assert menu.sections
+
+        self.__set_menu(menu)
+
+    def __set_menu(self, menu):
+        """
+            Replaces the menu handled by this entity, keeping the current location by section names.
         """
-        idx = next(location_iterator)
+        self.__cursor = self.__cursor.locate(menu)
+        self.__use_fast_path(menu)
+        if self.__frame_cache is not None and self.__frame_cache.menu is not menu:
+            self.__frame_cache.menu = menu
+
+    def _invoke_callback(self, callback_name):
+        """
+            Hook invoking the callback registered under the given name and returning its result.
+
+            @param callback_name: L{callback<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.
+            Section.callback>} of the current section or menu.
+            @type callback_name: StringType
 
+            @postcondition: return is None or isinstance(r, (StringType, UnicodeType,))
+        """
+        callback = self.__callbacks[callback_name]
+        prefetcher = self.__prefetcher
+        if prefetcher is not None:
+            # past the timeout the result is not cached yet: the callback is invoked here
+            prefetcher.wait(self.__callback_cache, callback_name, prefetcher.wait_timeout)
+        if self.__observer is not None:
+            return self.__observe_callback(callback_name, callback)
+        if isinstance(callback, CachedCallback):
+            return self.__callback_cache.get_or_call(callback_name, callback)
+        return callback()
+
+    def _leave_callback(self):
+        """
+            Hook invoked by L{process<MenuHandler.process>} when the events following the last callback it
+            triggered moved away from it, as L{next<MenuHandler.next>} or L{forward<MenuHandler.forward>}
+            would have done after it. Does nothing by default.
+        """
+
+    def __observe_operation(self, method, operation):
+        """
+            Returns a function invoking the given navigation L{method} and notifying the observer of its timing.
+        """
+        observer = self.__observer
+        clock = observer.clock
+
+        @functools.wraps(method)
+        def observed(*args):
+            start = clock()
+            r = method(*args)
+            observer.on_navigation(operation, clock() - start, len(self.__cursor.location))
+            return r
+        return observed
+
+    def __prefetch_operation(self, method):
+        """
+            Returns a function invoking the given navigation L{method} and then requesting the prefetch of the
+            callbacks of the current section and of its siblings.
+        """
+        @functools.wraps(method)
+        def prefetching(*args):
+            r = method(*args)
+            self.__prefetch()
+            return r
+        return prefetching
+
+    def __prefetch(self):
+        """
+            Requests the prefetch of the callbacks of the current section and of its previous and next siblings.
+        """
+        cursor = self.__cursor
+        sections = cursor.parents[-1].sections
+        idx = cursor.location[-1]
+        callback_names = []
+        for sibling_idx in (idx, idx + 1, idx - 1,):
+            if sibling_idx < 0 and isinstance(sections, PagedSections):
+                continue # the last lazily fetched section is only known once all are fetched
+            try:
+                section = sections[sibling_idx]
+            except IndexError:
+                section = sections[0]
+            if section.callback is not None and section.sections is None:
+                callback_names.append(section.callback)
+
+        self.__prefetcher.prefetch(self, self.__callback_cache, self.__callbacks, callback_names)
+
+    def __observe_callback(self, callback_name, callback):
+        """
+            Invokes the given L{callback} and notifies the observer of its timing and error, if any.
+        """
+        observer = self.__observer
+        clock = observer.clock
+        start = clock()
         try:
-            return self.__get_location(sections[idx].sections, location_iterator)
-        except StopIteration:
-            return sections[idx]
+            if isinstance(callback, CachedCallback):
+                r = self.__callback_cache.get_or_call(callback_name, callback)
+            else:
+                r = callback()
+        except Exception as e:
+            observer.on_callback(callback_name, clock() - start, e)
+            raise
+        observer.on_callback(callback_name, clock() - start)
+        return r
+
+    def callbacks(): # @NoSelf
+        def fget(self):
+            return self.__callbacks
+        return locals()
+
+    callbacks = property(**callbacks())
+    """
+        Getter:
+        =======
+        Gets the dictionary of callbacks of this entity.
+
+        @rtype: DictType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def callback_cache(): # @NoSelf
+        def fget(self):
+            return self.__callback_cache
+        return locals()
+
+    callback_cache = property(**callback_cache())
+    """
+        Getter:
+        =======
+        Gets the cache of the results of the L{cached callbacks<CachedCallback>} of this entity. It is used to
+        L{invalidate<CallbackCache.invalidate>} results explicitly or to read the hit/miss counters.
+
+        @rtype: CallbackCache
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def frame_cache(): # @NoSelf
+        def fget(self):
+            return self.__frame_cache
+        return locals()
+
+    frame_cache = property(**frame_cache())
+    """
+        Getter:
+        =======
+        Gets the display frames of the sections of the menu of this entity, C{None} if there are none.
+
+        @rtype: FrameCache
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def prefetcher(): # @NoSelf
+        def fget(self):
+            return self.__prefetcher
+        return locals()
+
+    prefetcher = property(**prefetcher())
+    """
+        Getter:
+        =======
+        Gets the prefetcher of the results of the callbacks of this entity, C{None} if there is none.
+
+        @rtype: Prefetcher
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def observer(): # @NoSelf
+        def fget(self):
+            return self.__observer
+        return locals()
+
+    observer = property(**observer())
+    """
+        Getter:
+        =======
+        Gets the observer of the timings of this entity, C{None} if it is not instrumented.
+
+        @rtype: Observer
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def location(): # @NoSelf
+        def fget(self):
+            return tuple(self.__cursor.location)
+        return locals()
+
+    location = property(**location())
+    """
+        Getter:
+        =======
+        Gets the current location of the user of this entity: the tuple of the indexes of the sections
+        leading to it from the root of the menu. See L{jump_to<MenuHandler.jump_to>}.
+
+        @rtype: TupleType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def menu(): # @NoSelf
+        def fget(self):
+            return self.__cursor.menu
+
+        def fset(self, menu):
+            assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+            assert menu.sections
+
+            self.__set_menu(menu)
+        return locals()
+
+    menu = property(**menu())
+    """
+        Getter:
+        =======
+        Gets the menu handled by this entity.
+
+        @rtype: AbstractMenuBuilder.Menu or FlatMenu
+
+        Setter:
+        =======
+        Replaces the menu handled by this entity, typically by an L{updated copy<simple_menu.builders.
+        AbstractMenuBuilder.AbstractMenuBuilder.update_dynamic_sections>} of the current one. The current
+        location is kept by section names rather than by indexes: on each level the section of the same name
+        is looked for in the new menu (at the same index first), so sections moved by a dynamic block which
+        changed size are followed. When a section is gone (a dynamic section beyond the new ones...), the
+        location falls back to its parent or, on the first level, to the section at the same index (clamped).
+        The L{frame cache<MenuHandler.frame_cache>} is given the new menu as well.
+
+        @precondition: isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+        @precondition: menu.sections
+    """
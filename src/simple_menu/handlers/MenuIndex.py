@@ -0,0 +1,163 @@
+from types import StringType, UnicodeType
+import bisect
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.PagedSections import PagedSections
+
+
+class MenuIndex(object):
+    """
+        Prefix index over the L{names<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Section.
+        name>} and L{labels<simple_menu.builders.AbstractMenuBuilder.AbstractMenuBuilder.Section.label>} of
+        the sections of a menu, used to L{search<simple_menu.handlers.MenuHandler.MenuHandler.search>} and
+        jump to sections instead of walking to them.
+
+        The index is a sorted list of C{(key, path)} tuples where C{key} is the lower cased name or label of a
+        section and C{path} the tuple of indexes leading to it from the menu root (its location in a
+        L{menu handler<simple_menu.handlers.MenuHandler.MenuHandler>}). A prefix lookup is a binary search.
+
+        The index is built once per menu and L{updated<MenuIndex.update>} when the dynamic sections of the
+        menu are. Lazily fetched L{paged sections<PagedSections>} are not indexed.
+    """
+
+    def __init__(self, menu):
+        """
+            Builds the index of the given L{menu}.
+
+            @type menu: AbstractMenuBuilder.Menu or FlatMenu
+        """
+        assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+
+        self.__menu = menu
+        entries = []
+        MenuIndex.__index_sections(entries, menu.sections, (), 0)
+        entries.sort()
+        self.__entries = entries
+
+    def find(self, prefix):
+        """
+            Returns the locations of the sections whose name or label starts with the given L{prefix}, case
+            insensitively.
+
+            @type prefix: StringType
+            @return: list of paths (tuples of indexes) in menu order.
+            @rtype: ListType
+
+            @precondition: len(prefix) > 0
+        """
+        assert isinstance(prefix, (StringType, UnicodeType,))
+        assert prefix
+
+        prefix = MenuIndex.__normalize(prefix)
+        entries = self.__entries
+        paths = set()
+        for idx in xrange(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            key, path = entries[idx]
+            if not key.startswith(prefix):
+                break
+            paths.add(path)
+        return sorted(paths)
+
+    def update(self, menu, opt_name):
+        """
+            Updates this index for the given L{menu}, a copy of the indexed menu in which the sections of the
+            dynamic option L{opt_name} were L{updated<simple_menu.builders.AbstractMenuBuilder.
+            AbstractMenuBuilder.update_dynamic_sections>}. Only the sections following the first updated one in
+            their parent are indexed again.
+
+            @type menu: AbstractMenuBuilder.Menu
+            @type opt_name: StringType
+
+            @precondition: any(l.opt_name == opt_name for l in menu.dynamic)
+        """
+        assert isinstance(menu, AbstractMenuBuilder.Menu)
+        assert menu.dynamic is not None
+
+        # in the parents of the option, the sections from the first updated one moved or changed
+        starts = {}
+        for location in menu.dynamic:
+            if location.opt_name == opt_name:
+                starts[location.path] = min(location.start, starts.get(location.path, location.start))
+        added = dict(starts)
+        for location in self.__menu.dynamic or ():
+            if location.opt_name == opt_name:
+                starts[location.path] = min(location.start, starts.get(location.path, location.start))
+
+        def is_reindexed(path, ranges):
+            for parent_path, start in ranges.iteritems():
+                depth = len(parent_path)
+                if len(path) > depth and path[depth] >= start and path[:depth] == parent_path:
+                    return True
+            return False
+
+        entries = [entry for entry in self.__entries if not is_reindexed(entry[1], starts)]
+        for parent_path, start in added.iteritems():
+            if is_reindexed(parent_path, added):
+                continue # indexed with the sections of an ancestor
+            parent = menu
+            for idx in parent_path:
+                parent = parent.sections[idx]
+            MenuIndex.__index_sections(entries, parent.sections, parent_path, start)
+        entries.sort()
+
+        self.__menu = menu
+        self.__entries = entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @staticmethod
+    def __index_sections(entries, sections, path, start):
+        """
+            Adds the entries of the given L{sections}, from the L{start} index, and of their sub sections to
+            L{entries}.
+
+            @param path: path of the parent of the sections.
+        """
+        normalize = MenuIndex.__normalize
+        stack = [(sections, path, start,)]
+        while stack:
+            sections, path, start = stack.pop()
+            for idx in xrange(start, len(sections)):
+                section = sections[idx]
+                section_path = path + (idx,)
+                name = normalize(section.name)
+                entries.append((name, section_path,))
+                if section.label is not None:
+                    label = normalize(section.label)
+                    if label != name:
+                        entries.append((label, section_path,))
+
+                sub_sections = section.sections
+                if sub_sections is not None and not isinstance(sub_sections, PagedSections):
+                    stack.append((sub_sections, section_path, 0,))
+
+    @staticmethod
+    def __normalize(s):
+        """
+            Returns the key of the given name or label.
+
+            @rtype: UnicodeType
+        """
+        if isinstance(s, StringType):
+            s = s.decode('utf-8')
+        return s.lower()
+
+    def menu(): # @NoSelf
+        def fget(self):
+            return self.__menu
+        return locals()
+
+    menu = property(**menu())
+    """
+        Getter:
+        =======
+        Gets the menu indexed by this entity.
+
+        @rtype: AbstractMenuBuilder.Menu or FlatMenu
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,231 @@
+from types import IntType, FloatType, DictType
+import threading
+
+from simple_menu.builders.FileSignature import FileSignature
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+from simple_menu.handlers.MenuHandler import MenuHandler
+
+
+class MenuReloader(object):
+    """
+        Reloads the menu of live L{menu handlers<MenuHandler>} whenever its properties file changes.
+
+        A background thread polls the L{signature<FileSignature>} of the properties file every L{interval}
+        seconds: its size, times and inode and, while it was changed too recently for its time stamps to tell
+        another edit, its digest. When it changes, the menu is built again in that thread and, once built,
+        swapped into every L{registered<MenuReloader.register>} handler. Each handler keeps its user on the same
+        section, found by the names of the sections leading to it (see L{MenuHandler.remap}), so a reload neither
+        resets nor disorients its users.
+
+        The swap is done while holding the L{lock<MenuReloader.lock>} of this reloader: handlers navigated from
+        other threads than the reloader's must be navigated while holding it as well so that they never see a
+        half swapped menu. A file which cannot be built (being written, invalid...) is reported to the
+        L{error_listener} and the current menu is kept; it is built again on its next change.
+    """
+
+    INTERVAL = 1.0
+    """ Default number of seconds between two polls of the properties file. """
+
+    def __init__(self, builder, dynamic_sections_by_opt_name=None, interval=INTERVAL, menu_listener=None,
+                 error_listener=None):
+        """
+            Initializes this reloader and builds the current menu.
+
+            @param builder: builder of the menu from the properties file.
+            @type builder: PropertiesMenuBuilder
+            @param dynamic_sections_by_opt_name: see L{AbstractMenuBuilder.build<simple_menu.builders.
+            AbstractMenuBuilder.AbstractMenuBuilder.build>}, or a function invoked without parameters before
+            each build which returns them.
+            @param interval: number of seconds between two polls of the properties file.
+            @type interval: FloatType
+            @param menu_listener: function invoked with each reloaded menu, after it was swapped into the
+            handlers. It is invoked from the reloader's thread, holding the lock.
+            @param error_listener: function invoked with the exception raised by a build which failed. It is
+            invoked from the reloader's thread.
+
+            @precondition: interval > 0
+            @precondition: menu_listener is None or callable(menu_listener)
+            @precondition: error_listener is None or callable(error_listener)
+        """
+        assert isinstance(builder, PropertiesMenuBuilder)
+        assert (dynamic_sections_by_opt_name is None
+                or isinstance(dynamic_sections_by_opt_name, DictType)
+                or callable(dynamic_sections_by_opt_name))
+        assert isinstance(interval, (IntType, FloatType,))
+        assert interval > 0
+        assert menu_listener is None or callable(menu_listener)
+        assert error_listener is None or callable(error_listener)
+
+        self.__builder = builder
+        self.__dynamic_sections_by_opt_name = dynamic_sections_by_opt_name
+        self.__interval = interval
+        self.__menu_listener = menu_listener
+        self.__error_listener = error_listener
+        self.__lock = threading.RLock()
+        self.__handlers = []
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+        self.__signature = None
+        self.__signature = self.__get_signature()
+        self.__menu = self.__build()
+
+    def register(self, handler):
+        """
+            Registers the given L{handler} so that it gets the reloaded menus. Its menu is replaced by the current
+            one if it differs.
+
+            @type handler: MenuHandler
+        """
+        assert isinstance(handler, MenuHandler)
+
+        with self.__lock:
+            if handler.menu is not self.__menu:
+                handler.remap(self.__menu)
+            self.__handlers.append(handler)
+
+    def unregister(self, handler):
+        """
+            Unregisters the given L{handler}: it keeps its current menu.
+
+            @type handler: MenuHandler
+        """
+        with self.__lock:
+            self.__handlers.remove(handler)
+
+    def check(self):
+        """
+            Reloads the menu if the properties file changed since the last reload.
+
+            @return: C{True} if a new menu was swapped into the handlers.
+            @rtype: BooleanType
+        """
+        signature = self.__get_signature()
+        if signature is None: # missing while being replaced
+            return False
+        if self.__signature is not None and signature.matches(self.__signature):
+            self.__signature = signature # a racy signature is checked until it is not racy anymore
+            return False
+
+        self.__signature = signature # a file which cannot be built is only built again once it changes
+        try:
+            menu = self.__build()
+        except Exception as e:
+            if self.__error_listener is not None:
+                self.__error_listener(e)
+            return False
+
+        self.__swap(menu)
+        return True
+
+    def reload(self):
+        """
+            Builds the menu and swaps it into the handlers, whether the properties file changed or not.
+
+            @raise Exception: any exception raised by the build.
+        """
+        signature = self.__get_signature()
+        menu = self.__build()
+        self.__signature = signature
+        self.__swap(menu)
+
+    def start(self):
+        """
+            Starts polling the properties file in a background (daemon) thread.
+
+            @precondition: the reloader is not started.
+        """
+        assert self.__thread is None
+
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__poll, name='MenuReloader')
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """
+            Stops polling the properties file and waits for the background thread to end.
+        """
+        thread = self.__thread
+        if thread is None:
+            return
+        self.__stopped.set()
+        thread.join()
+        self.__thread = None
+
+    def __poll(self):
+        """
+            Body of the background thread.
+        """
+        while not self.__stopped.wait(self.__interval):
+            self.check()
+
+    def __build(self):
+        """
+            Builds and returns the menu from the properties file.
+
+            @rtype: AbstractMenuBuilder.Menu
+            @raise ValueError: if the menu has no sections (the file is being written for instance).
+        """
+        dynamic_sections_by_opt_name = self.__dynamic_sections_by_opt_name
+        if callable(dynamic_sections_by_opt_name):
+            dynamic_sections_by_opt_name = dynamic_sections_by_opt_name()
+        menu = self.__builder.build(dynamic_sections_by_opt_name)
+        if not menu.sections:
+            raise ValueError("Not sections could be found.")
+        return menu
+
+    def __swap(self, menu):
+        """
+            Swaps the given L{menu} into the registered handlers.
+        """
+        with self.__lock:
+            self.__menu = menu
+            for handler in self.__handlers:
+                handler.remap(menu)
+            if self.__menu_listener is not None:
+                self.__menu_listener(menu)
+
+    def __get_signature(self):
+        """
+            Returns the signature of the properties file, C{None} if it cannot be read.
+
+            @rtype: FileSignature
+        """
+        return FileSignature.read(self.__builder.properties_file, self.__signature)
+
+    def lock(): # @NoSelf
+        def fget(self):
+            return self.__lock
+        return locals()
+
+    lock = property(**lock())
+    """
+        Getter:
+        =======
+        Gets the (reentrant) lock held by this entity while swapping a menu into the handlers.
+
+        @rtype: threading.RLock
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def menu(): # @NoSelf
+        def fget(self):
+            return self.__menu
+        return locals()
+
+    menu = property(**menu())
+    """
+        Getter:
+        =======
+        Gets the last menu built by this entity.
+
+        @rtype: AbstractMenuBuilder.Menu
+
+        Setter:
+        =======
+        Not settable.
+    """
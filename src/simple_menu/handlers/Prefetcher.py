@@ -0,0 +1,152 @@
+from multiprocessing.pool import ThreadPool
+from types import IntType, FloatType
+import threading
+import weakref
+
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.CallbackCache import CallbackCache
+
+
+class Prefetcher(object):
+    """
+        Computes the results of L{cached callbacks<CachedCallback>} marked for L{prefetching
+        <CachedCallback.prefetch>} ahead of time, in a bounded pool of worker threads, and stores them in a
+        L{callback cache<CallbackCache>}.
+
+        A L{menu handler<simple_menu.handlers.MenuHandler.MenuHandler>} given a prefetcher requests, after each
+        move, the results of the callbacks of the current section and of its immediate siblings. Activating one
+        of them then finds its result in the cache, or waits for the prefetch already running instead of
+        invoking the callback a second time.
+
+        A handler waits for a running prefetch at most L{wait_timeout<Prefetcher.wait_timeout>} seconds: past
+        that, the callback is invoked in the foreground as if it had not been prefetched, so a hung prefetch
+        does not block its user.
+
+        Each request of a handler replaces its former one: prefetches which have not started yet when no handler
+        requests them anymore are stale and never run. Prefetches already running go to the end and their
+        results are cached, their freshness being bounded by the time to live of their callback. Errors of
+        prefetched callbacks are ignored: the callback is invoked again, in the foreground, on activation.
+
+        A prefetcher may be shared by several handlers and is safe to use from several threads.
+    """
+
+    WORKERS = 1
+    """ Default number of worker threads. """
+
+    WAIT_TIMEOUT = 1.0
+    """ Default maximum number of seconds a handler waits for a running prefetch. """
+
+    def __init__(self, workers=WORKERS, wait_timeout=WAIT_TIMEOUT):
+        """
+            Initializes this prefetcher.
+
+            @param workers: number of worker threads running the prefetches.
+            @type workers: IntType
+            @param wait_timeout: maximum number of seconds a handler activating a callback waits for its
+            running prefetch before invoking it in the foreground.
+            @type wait_timeout: FloatType
+
+            @precondition: workers > 0
+            @precondition: wait_timeout > 0
+        """
+        assert isinstance(workers, IntType)
+        assert workers > 0
+        assert isinstance(wait_timeout, (IntType, FloatType,))
+        assert wait_timeout > 0
+
+        self.__wait_timeout = wait_timeout
+        self.__pool = ThreadPool(workers)
+        self.__lock = threading.Lock()
+        # requester -> names of the callbacks of its last request
+        self.__requests = weakref.WeakKeyDictionary()
+        # (id of the cache, callback name) -> event set once the prefetch is over
+        self.__running = {}
+
+    def prefetch(self, requester, callback_cache, callbacks, callback_names):
+        """
+            Requests the results of the given callbacks. The callbacks which are not marked for prefetching,
+            whose result is fresh in the cache or which are already being prefetched are skipped. Former
+            requests of the L{requester} which have not started yet are dropped.
+
+            @param requester: entity requesting the prefetches, typically the menu handler. It must be weakly
+            referenceable.
+            @type callback_cache: CallbackCache
+            @param callbacks: dictionary of the callbacks by name.
+            @type callbacks: DictType
+            @param callback_names: names of the callbacks to prefetch, in priority order.
+        """
+        assert isinstance(callback_cache, CallbackCache)
+
+        callback_names = tuple(callback_names)
+        with self.__lock:
+            self.__requests[requester] = frozenset(callback_names)
+
+            for callback_name in callback_names:
+                callback = callbacks.get(callback_name)
+                if not isinstance(callback, CachedCallback) or not callback.prefetch:
+                    continue
+                key = (id(callback_cache), callback_name,)
+                if key in self.__running or callback_cache.contains(callback_name):
+                    continue
+                self.__running[key] = threading.Event()
+                self.__pool.apply_async(self.__run, (callback_cache, callback_name, callback,))
+
+    def wait(self, callback_cache, callback_name, timeout=None):
+        """
+            Waits for the prefetch of the given callback to be over, if it is running or scheduled.
+
+            @type callback_cache: CallbackCache
+            @type callback_name: StringType
+            @param timeout: maximum number of seconds to wait, C{None} for no limit.
+            @type timeout: FloatType
+        """
+        assert timeout is None or isinstance(timeout, (IntType, FloatType,))
+
+        event = self.__running.get((id(callback_cache), callback_name,))
+        if event is not None:
+            event.wait(timeout)
+
+    def close(self):
+        """
+            Stops the worker threads once the running prefetches are over. This entity must not be used
+            afterwards.
+        """
+        with self.__lock:
+            self.__requests.clear() # drops the scheduled prefetches
+        self.__pool.close()
+        self.__pool.join()
+
+    def __run(self, callback_cache, callback_name, callback):
+        """
+            Runs the prefetch of the given callback in a worker thread, unless it is stale.
+        """
+        try:
+            with self.__lock:
+                requested = any(callback_name in names for names in self.__requests.itervalues())
+            if requested:
+                value = callback()
+                callback_cache.put(callback_name, value, callback.ttl)
+        except Exception:
+            pass # invoked again in the foreground on activation
+        finally:
+            with self.__lock:
+                event = self.__running.pop((id(callback_cache), callback_name,))
+            event.set()
+
+    def wait_timeout(): # @NoSelf
+        def fget(self):
+            return self.__wait_timeout
+        return locals()
+
+    wait_timeout = property(**wait_timeout())
+    """
+        Getter:
+        =======
+        Gets the maximum number of seconds a handler activating a callback waits for its running prefetch.
+
+        @rtype: FloatType
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,88 @@
+from types import DictType, StringType, UnicodeType, IntType, FloatType
+import threading
+import time
+
+
+class RateLimiter(object):
+    """
+        Token bucket rate limiter keyed by callback name.
+
+        Each key has a bucket holding at most C{burst} tokens and refilled at C{rate} tokens per second. An
+        L{acquisition<RateLimiter.acquire>} takes one token; it is refused when the bucket is empty. Keys
+        without a configured rate are never limited.
+
+        A rate limiter is safe to use from several threads.
+    """
+
+    def __init__(self, rates, clock=time.time):
+        """
+            Initializes this rate limiter.
+
+            @param rates: C{(rate, burst)} tuple by key: C{rate} is the number of acquisitions allowed per
+            second on average and C{burst} the number of acquisitions allowed at once.
+            @type rates: DictType
+            @param clock: function returning the current time in seconds.
+
+            @precondition: all(isinstance(k, (StringType, UnicodeType)) and v[0] > 0 and v[1] >= 1
+                               for k, v in rates.iteritems())
+            @precondition: callable(clock)
+        """
+        assert isinstance(rates, DictType)
+        assert all(isinstance(k, (StringType, UnicodeType,))
+                   and isinstance(v[0], (IntType, FloatType,))
+                   and v[0] > 0
+                   and isinstance(v[1], IntType)
+                   and v[1] >= 1 for k, v in rates.iteritems())
+        assert callable(clock)
+
+        self.__rates = dict(rates)
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        # key -> [tokens, time of the last refill]
+        self.__buckets = {}
+        self.__refused = 0
+
+    def acquire(self, key):
+        """
+            Takes one token for the given L{key}.
+
+            @return: C{True} if the token was taken, C{False} if the rate of L{key} is exceeded.
+            @rtype: BooleanType
+        """
+        try:
+            rate, burst = self.__rates[key]
+        except KeyError:
+            return True
+
+        with self.__lock:
+            now = self.__clock()
+            bucket = self.__buckets.get(key)
+            if bucket is None:
+                self.__buckets[key] = bucket = [float(burst), now]
+            else:
+                bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] < 1:
+                self.__refused += 1
+                return False
+            bucket[0] -= 1
+            return True
+
+    def refused(): # @NoSelf
+        def fget(self):
+            return self.__refused
+        return locals()
+
+    refused = property(**refused())
+    """
+        Getter:
+        =======
+        Gets the number of acquisitions refused by this entity.
+
+        @rtype: IntType
+
+        Setter:
+        =======
+        Not settable.
+    """
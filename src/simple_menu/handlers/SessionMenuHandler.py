@@ -0,0 +1,248 @@
+from array import array
+from types import DictType, StringType, UnicodeType, BooleanType
+import sys
+import threading
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.CallbackCache import CallbackCache
+from simple_menu.handlers.MenuCursor import MenuCursor
+from simple_menu.handlers.RateLimiter import RateLimiter
+
+
+class SessionMenuHandler(object):
+    """
+        Menu handler shared by many users (sessions) navigating the same immutable menu.
+
+        Where a L{MenuHandler<simple_menu.handlers.MenuHandler.MenuHandler>} is needed per user, this handler
+        keeps no per user state: each session only owns a L{cursor<MenuCursor>}, which is given to every
+        navigation method. Cursors can be L{serialized<SessionMenuHandler.dump_cursor>} as compact arrays
+        holding one fixed width index per level of their location, and L{restored<SessionMenuHandler.
+        load_cursor>}.
+
+        Navigation is the one of L{MenuHandler<simple_menu.handlers.MenuHandler.MenuHandler>}, both move
+        L{cursors<MenuCursor>}.
+
+        Callbacks are shared by all the sessions. The results of L{cached callbacks<CachedCallback>} are
+        shared through one L{callback cache<CallbackCache>} and the invocations can be L{rate limited
+        <RateLimiter>} across all sessions: when the rate of a callback is exceeded, its last result (from
+        any session) is returned instead of invoking it.
+
+        A session handler is safe to use from several threads as long as a given cursor is only used by one
+        thread at a time.
+    """
+
+    TYPECODE = 'I'
+    """ Type code of the cursor arrays. """
+
+    def __init__(self, menu, callbacks=None, callback_cache=None, rate_limiter=None):
+        """
+            Initializes this session handler.
+
+            @param menu: the menu shared by the sessions.
+            @type menu: AbstractMenuBuilder.Menu or FlatMenu
+            @param callbacks: see L{MenuHandler.__init__<simple_menu.handlers.MenuHandler.MenuHandler.
+            __init__>}
+            @param callback_cache: see L{MenuHandler.Options<simple_menu.handlers.MenuHandler.MenuHandler.
+            Options>}
+            @param rate_limiter: limiter of the callback invocations, keyed by callback name.
+            @type rate_limiter: RateLimiter
+
+            @precondition: callbacks is None or isinstance(callbacks, DictType)
+            @precondition: callbacks is None or all( isinstance(k, (StringType, UnicodeType)
+                                                                and callable(v) for k, v in callbacks.iteritems())
+        """
+        assert isinstance(menu, (AbstractMenuBuilder.Menu, FlatMenu,))
+        assert menu.sections
+        assert callbacks is None or isinstance(callbacks, DictType)
+        assert callbacks is None or all(isinstance(k, (StringType, UnicodeType,))
+                                        and callable(v) for k, v in callbacks.iteritems())
+        assert callback_cache is None or isinstance(callback_cache, CallbackCache)
+        assert rate_limiter is None or isinstance(rate_limiter, RateLimiter)
+
+        self.__menu = menu
+        self.__callbacks = callbacks
+        self.__callback_cache = CallbackCache() if callback_cache is None else callback_cache
+        self.__rate_limiter = rate_limiter
+        self.__last_results = {}
+        self.__lock = threading.Lock()
+
+    def new_cursor(self):
+        """
+            Returns a new cursor, located on the first section of the menu.
+
+            @rtype: MenuCursor
+        """
+        return MenuCursor(self.__menu)
+
+    def dump_cursor(self, cursor):
+        """
+            Serializes the given L{cursor}.
+
+            @type cursor: MenuCursor
+            @return: the indexes of the location of the cursor as little endian unsigned integers.
+            @rtype: StringType
+        """
+        assert isinstance(cursor, MenuCursor)
+        location = array(SessionMenuHandler.TYPECODE, cursor.location)
+        if sys.byteorder == 'big':
+            location.byteswap()
+        return location.tostring()
+
+    def load_cursor(self, data):
+        """
+            Restores a cursor L{serialized<SessionMenuHandler.dump_cursor>} by this entity or another one
+            handling the same menu.
+
+            @type data: StringType
+            @rtype: MenuCursor
+
+            @precondition: len(data) > 0
+            @raise ValueError: if L{data} is not the location of a section of the menu.
+        """
+        assert isinstance(data, StringType)
+        assert data
+
+        location = array(SessionMenuHandler.TYPECODE)
+        location.fromstring(data) # raises ValueError on truncated data
+        if sys.byteorder == 'big':
+            location.byteswap()
+        # the array holds longs: sections are indexed by ints
+        return MenuCursor(self.__menu, [int(idx) for idx in location])
+
+    def back(self, cursor):
+        """
+            Moves the given L{cursor} 1 level "back", see L{MenuHandler.back<simple_menu.handlers.MenuHandler.
+            MenuHandler.back>}.
+
+            @type cursor: MenuCursor
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+        """
+        return self.get_current_location(cursor, cursor.back())
+
+    def forward(self, cursor):
+        """
+            Moves the given L{cursor} 1 level "forward", see L{MenuHandler.forward<simple_menu.handlers.
+            MenuHandler.MenuHandler.forward>}.
+
+            @type cursor: MenuCursor
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+        """
+        return self.get_current_location(cursor, cursor.forward())
+
+    def next(self, cursor):
+        """
+            Moves the given L{cursor} to the "next" element of its level, see L{MenuHandler.next<simple_menu.
+            handlers.MenuHandler.MenuHandler.next>}.
+
+            @type cursor: MenuCursor
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+        """
+        cursor.next()
+        return self.__get_label(cursor.get_section())
+
+    def previous(self, cursor):
+        """
+            Moves the given L{cursor} to the "previous" element of its level, see L{MenuHandler.previous
+            <simple_menu.handlers.MenuHandler.MenuHandler.previous>}.
+
+            @type cursor: MenuCursor
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+        """
+        cursor.previous()
+        return self.__get_label(cursor.get_section())
+
+    def get_current_location(self, cursor, use_callback=False):
+        """
+            Returns the label of the current location of the given L{cursor} or the result of its callback,
+            see L{MenuHandler.get_current_location<simple_menu.handlers.MenuHandler.MenuHandler.
+            get_current_location>}.
+
+            @type cursor: MenuCursor
+            @type use_callback: BooleanType
+            @postcondition: return is None or isinstance(return, (StringType, UnicodeType,))
+        """
+        assert isinstance(use_callback, BooleanType)
+        section = cursor.get_node(use_callback)
+
+        if use_callback and section.callback is not None:
+            r = self.__invoke_callback(section.callback)
+
+            if r is None:
+                return r
+
+            assert isinstance(r, (StringType, UnicodeType,)), str(r)
+            return r
+
+        return self.__get_label(section)
+
+    def __get_label(self, section):
+        """
+            Returns the label of the given L{section} or its name if it has no label.
+        """
+        if section.label is not None:
+            assert section.label
+            return section.label
+
+        assert section.name
+        return section.name
+
+    def __invoke_callback(self, callback_name):
+        """
+            Invokes the callback registered under the given name unless its rate is exceeded, in which case its
+            last result is returned.
+
+            @type callback_name: StringType
+        """
+        callback = self.__callbacks[callback_name]
+        if isinstance(callback, CachedCallback):
+            found, r = self.__callback_cache.get(callback_name)
+            if found:
+                return r
+
+        if self.__rate_limiter is not None and not self.__rate_limiter.acquire(callback_name):
+            return self.__last_results.get(callback_name)
+
+        r = callback()
+        if isinstance(callback, CachedCallback):
+            self.__callback_cache.put(callback_name, r, callback.ttl)
+        with self.__lock:
+            self.__last_results[callback_name] = r
+        return r
+
+    def menu(): # @NoSelf
+        def fget(self):
+            return self.__menu
+        return locals()
+
+    menu = property(**menu())
+    """
+        Getter:
+        =======
+        Gets the menu shared by the sessions of this entity.
+
+        @rtype: AbstractMenuBuilder.Menu or FlatMenu
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def callback_cache(): # @NoSelf
+        def fget(self):
+            return self.__callback_cache
+        return locals()
+
+    callback_cache = property(**callback_cache())
+    """
+        Getter:
+        =======
+        Gets the cache of the results of the L{cached callbacks<CachedCallback>} of this entity.
+
+        @rtype: CallbackCache
+
+        Setter:
+        =======
+        Not settable.
+    """
@@ -0,0 +1,279 @@
+from timeit import default_timer
+import bisect
+import collections
+import threading
+
+from simple_menu.instrumentation.Observer import Observer
+
+
+class MetricsObserver(Observer):
+    """
+        L{Observer} keeping L{latency histograms<MetricsObserver.Histogram>}:
+            - per build operation (L{builds<MetricsObserver.builds>});
+            - per navigation operation (L{navigation<MetricsObserver.navigation>}) and per navigation operation
+            and depth (L{navigation_by_depth<MetricsObserver.navigation_by_depth>});
+            - per callback name (L{callbacks<MetricsObserver.callbacks>});
+        and counters of the L{callback errors<MetricsObserver.callback_errors>} and L{callback timeouts
+        <MetricsObserver.callback_timeouts>} per callback name.
+
+        A metrics observer is safe to use from several threads and may be shared by several builders and
+        handlers.
+    """
+
+    class Histogram(object):
+        """
+            Latency histogram. Durations are counted in buckets whose upper bounds double from 1 microsecond,
+            so percentiles are estimated within a factor of 2.
+        """
+
+        BOUNDS = tuple(1e-6 * 2 ** i for i in xrange(25))
+        """ Upper bounds in seconds of the buckets, the last bucket (not listed) holding longer durations. """
+
+        def __init__(self):
+            self.count = 0
+            self.total = 0.0
+            self.minimum = None
+            self.maximum = None
+            self.buckets = [0] * (len(MetricsObserver.Histogram.BOUNDS) + 1)
+
+        def record(self, duration):
+            """
+                Counts the given L{duration}, in seconds.
+            """
+            self.count += 1
+            self.total += duration
+            if self.minimum is None or duration < self.minimum:
+                self.minimum = duration
+            if self.maximum is None or duration > self.maximum:
+                self.maximum = duration
+            self.buckets[bisect.bisect_left(MetricsObserver.Histogram.BOUNDS, duration)] += 1
+
+        def mean(self):
+            """
+                Returns the mean duration in seconds, C{None} if nothing was recorded.
+            """
+            if not self.count:
+                return None
+            return self.total / self.count
+
+        def percentile(self, percent):
+            """
+                Returns the upper bound in seconds of the bucket holding the given percentile of the recorded
+                durations (the maximum for the last bucket), C{None} if nothing was recorded.
+
+                @type percent: FloatType
+
+                @precondition: 0 < percent <= 100
+            """
+            assert 0 < percent <= 100
+
+            if not self.count:
+                return None
+            rank = self.count * percent / 100.0
+            seen = 0
+            for idx, count in enumerate(self.buckets):
+                seen += count
+                if seen >= rank:
+                    break
+            if idx == len(MetricsObserver.Histogram.BOUNDS):
+                return self.maximum
+            return min(MetricsObserver.Histogram.BOUNDS[idx], self.maximum)
+
+        def copy(self):
+            histogram = MetricsObserver.Histogram()
+            histogram.count = self.count
+            histogram.total = self.total
+            histogram.minimum = self.minimum
+            histogram.maximum = self.maximum
+            histogram.buckets = list(self.buckets)
+            return histogram
+
+    def __init__(self, clock=default_timer):
+        """
+            Initializes this observer.
+
+            @param clock: see L{Observer.__init__}
+        """
+        super(MetricsObserver, self).__init__(clock)
+
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+            Drops all the histograms and counters of this entity.
+        """
+        with self.__lock:
+            self.__builds = collections.defaultdict(MetricsObserver.Histogram)
+            self.__navigation = collections.defaultdict(MetricsObserver.Histogram)
+            self.__navigation_by_depth = collections.defaultdict(MetricsObserver.Histogram)
+            self.__callbacks = collections.defaultdict(MetricsObserver.Histogram)
+            self.__callback_errors = collections.Counter()
+            self.__callback_timeouts = collections.Counter()
+
+    def on_build(self, operation, duration):
+        with self.__lock:
+            self.__builds[operation].record(duration)
+
+    def on_navigation(self, operation, duration, depth):
+        with self.__lock:
+            self.__navigation[operation].record(duration)
+            self.__navigation_by_depth[(operation, depth,)].record(duration)
+
+    def on_callback(self, callback_name, duration, error=None):
+        with self.__lock:
+            self.__callbacks[callback_name].record(duration)
+            if error is not None:
+                self.__callback_errors[callback_name] += 1
+
+    def on_callback_timeout(self, callback_name):
+        with self.__lock:
+            self.__callback_timeouts[callback_name] += 1
+
+    def report(self):
+        """
+            Returns a human readable summary of the histograms and counters of this entity: one line per
+            histogram with its count, mean, 50th, 99th percentiles and maximum in milliseconds.
+
+            @rtype: StringType
+        """
+        lines = []
+
+        def add_histograms(title, histograms):
+            for key in sorted(histograms):
+                histogram = histograms[key]
+                if isinstance(key, tuple):
+                    key = '%s@%d' % key
+                lines.append('%-10s %-24s n=%-8d mean=%.3f p50=%.3f p99=%.3f max=%.3f' % (
+                                                                        title,
+                                                                        key,
+                                                                        histogram.count,
+                                                                        histogram.mean() * 1000,
+                                                                        histogram.percentile(50) * 1000,
+                                                                        histogram.percentile(99) * 1000,
+                                                                        histogram.maximum * 1000,))
+
+        add_histograms('build', self.builds)
+        add_histograms('navigation', self.navigation)
+        add_histograms('depth', self.navigation_by_depth)
+        add_histograms('callback', self.callbacks)
+        for name, count in sorted(self.callback_errors.iteritems()):
+            lines.append('%-10s %-24s n=%d' % ('error', name, count,))
+        for name, count in sorted(self.callback_timeouts.iteritems()):
+            lines.append('%-10s %-24s n=%d' % ('timeout', name, count,))
+        return '\n'.join(lines)
+
+    def __copy(self, histograms):
+        with self.__lock:
+            return dict((k, h.copy()) for k, h in histograms.iteritems())
+
+    def builds(): # @NoSelf
+        def fget(self):
+            return self.__copy(self.__builds)
+        return locals()
+
+    builds = property(**builds())
+    """
+        Getter:
+        =======
+        Gets a copy of the L{histograms<MetricsObserver.Histogram>} of this entity by build operation.
+
+        @rtype: DictType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def navigation(): # @NoSelf
+        def fget(self):
+            return self.__copy(self.__navigation)
+        return locals()
+
+    navigation = property(**navigation())
+    """
+        Getter:
+        =======
+        Gets a copy of the L{histograms<MetricsObserver.Histogram>} of this entity by navigation operation.
+
+        @rtype: DictType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def navigation_by_depth(): # @NoSelf
+        def fget(self):
+            return self.__copy(self.__navigation_by_depth)
+        return locals()
+
+    navigation_by_depth = property(**navigation_by_depth())
+    """
+        Getter:
+        =======
+        Gets a copy of the L{histograms<MetricsObserver.Histogram>} of this entity by C{(operation, depth)}
+        tuple, the depth being the one of the location reached by the operation.
+
+        @rtype: DictType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def callbacks(): # @NoSelf
+        def fget(self):
+            return self.__copy(self.__callbacks)
+        return locals()
+
+    callbacks = property(**callbacks())
+    """
+        Getter:
+        =======
+        Gets a copy of the L{histograms<MetricsObserver.Histogram>} of this entity by callback name.
+
+        @rtype: DictType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def callback_errors(): # @NoSelf
+        def fget(self):
+            with self.__lock:
+                return dict(self.__callback_errors)
+        return locals()
+
+    callback_errors = property(**callback_errors())
+    """
+        Getter:
+        =======
+        Gets the number of errors raised by callback name.
+
+        @rtype: DictType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def callback_timeouts(): # @NoSelf
+        def fget(self):
+            with self.__lock:
+                return dict(self.__callback_timeouts)
+        return locals()
+
+    callback_timeouts = property(**callback_timeouts())
+    """
+        Getter:
+        =======
+        Gets the number of timeouts by callback name.
+
+        @rtype: DictType
+
+        Setter:
+        =======
+        Not settable.
+    """
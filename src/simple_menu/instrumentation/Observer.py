@@ -0,0 +1,89 @@
+from timeit import default_timer
+
+
+class Observer(object):
+    """
+        Observer of the timings of the L{menu builders<simple_menu.builders.AbstractMenuBuilder.
+        AbstractMenuBuilder>} and the L{menu handlers<simple_menu.handlers.MenuHandler.MenuHandler>}.
+
+        The builders and handlers given an observer time their operations with its L{clock<Observer.clock>}
+        and notify it once each operation is over. This class ignores every notification: it is meant to be
+        extended, see L{MetricsObserver<simple_menu.instrumentation.MetricsObserver.MetricsObserver>}.
+
+        Builders and handlers are not instrumented at all when they are given no observer (the default), so
+        production builds do not pay for the timings.
+
+        Notifications may come from several threads (L{asynchronous handlers<simple_menu.handlers.
+        AsyncMenuHandler.AsyncMenuHandler>} run their callbacks in worker threads).
+    """
+
+    def __init__(self, clock=default_timer):
+        """
+            Initializes this observer.
+
+            @param clock: function returning the current time in seconds, used to time the operations.
+
+            @precondition: callable(clock)
+        """
+        assert callable(clock)
+
+        self.__clock = clock
+
+    def on_build(self, operation, duration):
+        """
+            Notifies that a builder completed the given L{operation}.
+
+            @param operation: C{'build'}, C{'build_flat'} or C{'parse'} (parsing of the properties file, which
+            is skipped when the snapshot is up to date).
+            @type operation: StringType
+            @param duration: duration of the operation in seconds.
+            @type duration: FloatType
+        """
+
+    def on_navigation(self, operation, duration, depth):
+        """
+            Notifies that a handler completed the given navigation L{operation}. The duration includes the
+            callback invoked by the operation, if any.
+
+            @param operation: name of the navigation method: C{'forward'}, C{'back'}, C{'next'}, C{'previous'},
+            C{'jump_to'} or C{'process'} (one notification for the whole sequence of events).
+            @type operation: StringType
+            @param duration: duration of the operation in seconds.
+            @type duration: FloatType
+            @param depth: depth of the location reached by the operation, 1 on the first level of the menu.
+            @type depth: IntType
+        """
+
+    def on_callback(self, callback_name, duration, error=None):
+        """
+            Notifies that a handler invoked the callback registered under the given name.
+
+            @type callback_name: StringType
+            @param duration: duration of the invocation in seconds.
+            @type duration: FloatType
+            @param error: exception raised by the callback, C{None} if it returned.
+        """
+
+    def on_callback_timeout(self, callback_name):
+        """
+            Notifies that the callback registered under the given name did not end within its timeout.
+
+            @type callback_name: StringType
+        """
+
+    def clock(): # @NoSelf
+        def fget(self):
+            return self.__clock
+        return locals()
+
+    clock = property(**clock())
+    """
+        Getter:
+        =======
+        Gets the function returning the current time in seconds used to time the operations observed by this
+        entity.
+
+        Setter:
+        =======
+        Not settable.
+    """
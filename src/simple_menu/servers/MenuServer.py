@@ -0,0 +1,244 @@
+from types import StringType, UnicodeType, TupleType, IntType, FloatType
+import SocketServer
+import binascii
+import collections
+import os
+import threading
+import time
+
+from simple_menu.handlers.SessionMenuHandler import SessionMenuHandler
+
+
+class MenuServer(object):
+    """
+        Socket front end of a L{session handler<SessionMenuHandler>}: remote panels send it navigation commands
+        for any number of sessions sharing the same menu.
+
+        The protocol is line based. Each request line is C{<session> <command> [<argument>]} where the session
+        is any token chosen by the client (a session is created on its first command) and the command one of:
+            - C{back}, C{forward}, C{next}, C{previous}: navigation, see L{MenuHandler<simple_menu.handlers.
+            MenuHandler.MenuHandler>}.
+            - C{current}: label of the current location.
+            - C{dump}: cursor of the session, hexadecimal encoded.
+            - C{load <cursor>}: restores a cursor returned by C{dump}.
+            - C{close}: forgets the session.
+        Each response line is C{OK} followed by the resulting label (or the dumped cursor) if any, or C{ERR}
+        followed by an error message. Labels are UTF-8 encoded.
+
+        Each connection is served by its own thread and can carry the commands of many sessions; the commands
+        of a given session should come from one connection at a time.
+
+        Sessions idle for longer than the session time to live are forgotten and, past the maximum number of
+        sessions, the least recently used one is: a forgotten session starts over on the first section of the
+        menu.
+    """
+
+    COMMANDS = frozenset(('back', 'forward', 'next', 'previous', 'current', 'dump', 'load', 'close',))
+    """ Commands understood by the server. """
+
+    MAX_SESSIONS = 10000
+    """ Default maximum number of sessions. """
+
+    SESSION_TTL = 3600.0
+    """ Default time to live of idle sessions, in seconds. """
+
+    class RequestHandler(SocketServer.StreamRequestHandler):
+        """
+            Serves the request lines of one connection.
+        """
+
+        def setup(self):
+            # responses are small lines, they are sent right away over TCP
+            self.disable_nagle_algorithm = isinstance(self.server, MenuServer.TCPServer)
+            SocketServer.StreamRequestHandler.setup(self)
+
+        def handle(self):
+            dispatch = self.server.menu_server.dispatch
+            readline = self.rfile.readline
+            write = self.wfile.write
+
+            line = readline()
+            while line:
+                parts = line.split(None, 2)
+                if len(parts) < 2:
+                    response = 'ERR malformed request'
+                else:
+                    try:
+                        response = dispatch(*parts)
+                    except Exception as e: # reported to the client, the server keeps running
+                        response = 'ERR %s' % (e,)
+                write(response.replace('\n', ' ') + '\n')
+                line = readline()
+
+    class TCPServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+        """ Threaded TCP server. """
+        daemon_threads = True
+        allow_reuse_address = True
+
+    class UnixServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+        """ Threaded Unix domain socket server. """
+        daemon_threads = True
+
+    def __init__(self, session_handler, address, max_sessions=MAX_SESSIONS, session_ttl=SESSION_TTL,
+                 clock=time.time):
+        """
+            Initializes this server and binds it to the given L{address}. Requests are only served once
+            L{serve_forever<MenuServer.serve_forever>} is invoked.
+
+            @type session_handler: SessionMenuHandler
+            @param address: path of a Unix domain socket or C{(host, port)} tuple of a TCP socket.
+            @param max_sessions: maximum number of sessions, the least recently used one is forgotten beyond.
+            @type max_sessions: IntType
+            @param session_ttl: time (in seconds) after which an idle session is forgotten.
+            @type session_ttl: FloatType
+            @param clock: function returning the current time in seconds.
+
+            @precondition: isinstance(address, (StringType, TupleType))
+            @precondition: max_sessions > 0
+            @precondition: session_ttl > 0
+        """
+        assert isinstance(session_handler, SessionMenuHandler)
+        assert isinstance(address, (StringType, TupleType,))
+        assert isinstance(max_sessions, IntType) and max_sessions > 0
+        assert isinstance(session_ttl, (IntType, FloatType,)) and session_ttl > 0
+        assert callable(clock)
+
+        self.__session_handler = session_handler
+        # session -> (cursor, time of its last command), least recently used first
+        self.__cursors = collections.OrderedDict()
+        self.__max_sessions = max_sessions
+        self.__session_ttl = session_ttl
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        if isinstance(address, StringType):
+            self.__server = MenuServer.UnixServer(address, MenuServer.RequestHandler)
+        else:
+            self.__server = MenuServer.TCPServer(address, MenuServer.RequestHandler)
+        self.__server.menu_server = self
+
+    def dispatch(self, session, command, argument=None):
+        """
+            Runs one command for the given L{session} and returns the response line (without end of line).
+
+            @param session: session token.
+            @type session: StringType
+            @param command: one of L{MenuServer.COMMANDS}.
+            @type command: StringType
+            @param argument: argument of the command, if any.
+            @type argument: StringType
+            @rtype: StringType
+
+            @raise ValueError: if the command is unknown or its argument invalid.
+        """
+        command = command.strip()
+        if command not in MenuServer.COMMANDS:
+            raise ValueError('unknown command %s' % (command,))
+
+        handler = self.__session_handler
+        if command == 'close':
+            with self.__lock:
+                self.__cursors.pop(session, None)
+            return 'OK'
+
+        if command == 'load':
+            if argument is None:
+                raise ValueError('missing cursor')
+            try:
+                data = binascii.unhexlify(argument.strip())
+            except TypeError:
+                raise ValueError('invalid cursor')
+            if not data:
+                raise ValueError('invalid cursor')
+            cursor = handler.load_cursor(data)
+            with self.__lock:
+                self.__touch(session, cursor)
+            return MenuServer.__format(handler.get_current_location(cursor))
+
+        with self.__lock:
+            entry = self.__cursors.pop(session, None)
+            cursor = handler.new_cursor() if entry is None else entry[0]
+            self.__touch(session, cursor)
+
+        if command == 'dump':
+            return 'OK ' + binascii.hexlify(handler.dump_cursor(cursor))
+        if command == 'current':
+            return MenuServer.__format(handler.get_current_location(cursor))
+        return MenuServer.__format(getattr(handler, command)(cursor))
+
+    def __touch(self, session, cursor):
+        """
+            Records the given L{cursor} as the most recently used one, for the given L{session}, and forgets the
+            expired and the least recently used sessions. Invoked under the lock.
+        """
+        cursors = self.__cursors
+        now = self.__clock()
+        cursors.pop(session, None)
+        cursors[session] = (cursor, now,)
+
+        expiry = now - self.__session_ttl
+        while len(cursors) > self.__max_sessions or cursors[next(iter(cursors))][1] <= expiry:
+            cursors.popitem(last=False)
+
+    @staticmethod
+    def __format(label):
+        """
+            Returns the response line of the given L{label}.
+        """
+        if label is None:
+            return 'OK'
+        if isinstance(label, UnicodeType):
+            label = label.encode('utf-8')
+        return 'OK ' + label
+
+    def serve_forever(self):
+        """
+            Serves requests until L{shutdown<MenuServer.shutdown>} is invoked.
+        """
+        self.__server.serve_forever()
+
+    def shutdown(self):
+        """
+            Stops serving requests (from another thread than the one running L{serve_forever
+            <MenuServer.serve_forever>}) and closes the socket. A Unix domain socket file is removed.
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+        if isinstance(self.__server, MenuServer.UnixServer):
+            try:
+                os.remove(self.__server.server_address)
+            except OSError:
+                pass
+
+    def session_count(): # @NoSelf
+        def fget(self):
+            return len(self.__cursors)
+        return locals()
+
+    session_count = property(**session_count())
+    """
+        Getter:
+        =======
+        Gets the number of sessions of this entity.
+
+        @rtype: IntType
+
+        Setter:
+        =======
+        Not settable.
+    """
+
+    def server_address(): # @NoSelf
+        def fget(self):
+            return self.__server.server_address
+        return locals()
+
+    server_address = property(**server_address())
+    """
+        Getter:
+        =======
+        Gets the address the socket of this entity is bound to.
+
+        Setter:
+        =======
+        Not settable.
+    """
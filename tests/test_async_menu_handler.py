@@ -0,0 +1,187 @@
+import Queue
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+from simple_menu.handlers.AsyncMenuHandler import AsyncMenuHandler
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.CallbackCache import CallbackCache
+from simple_menu.handlers.MenuHandler import MenuHandler
+
+
+PROPERTIES = u"""[menu]
+slow.callback = SLOW
+fast.callback = FAST
+cached.callback = CACHED
+fail.callback = FAIL
+[default_settings]
+callback = ROOT
+"""
+
+
+class AsyncMenuHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.menu = PropertiesMenuBuilder(properties_file).build()
+
+        self.release = threading.Event()
+        self.cached_calls = []
+
+        def slow():
+            self.release.wait(5)
+            return 'slow'
+
+        def cached():
+            self.cached_calls.append(None)
+            return 'cached'
+
+        def fail():
+            raise RuntimeError('failed')
+
+        self.callbacks = {'ROOT': lambda: 'root',
+                          'SLOW': slow,
+                          'FAST': lambda: 'fast',
+                          'CACHED': CachedCallback(cached),
+                          'FAIL': fail}
+        self.results = Queue.Queue()
+        self.handlers = []
+
+    def tearDown(self):
+        self.release.set()
+        for handler in self.handlers:
+            handler.close()
+        shutil.rmtree(self.work_dir)
+
+    def make_handler(self, **kwargs):
+        handler = AsyncMenuHandler(self.menu, self.callbacks, result_listener=self.results.put, **kwargs)
+        self.handlers.append(handler)
+        handler.forward()
+        return handler
+
+    def activate(self, handler, idx):
+        handler.jump_to((0, idx,))
+        return handler.forward()
+
+    def next_result(self, timeout=2):
+        return self.results.get(timeout=timeout)
+
+    def test_result(self):
+        handler = self.make_handler()
+        self.assertEqual(self.activate(handler, 1), AsyncMenuHandler.PLACEHOLDER)
+        self.assertEqual(self.next_result(), AsyncMenuHandler.Result('FAST', 'fast', None, False))
+        self.assertEqual(handler.poll(), AsyncMenuHandler.Result('FAST', 'fast', None, False))
+        self.assertEqual(handler.poll(), None)
+        self.assertEqual(handler.pending, None)
+
+    def test_error(self):
+        handler = self.make_handler()
+        self.activate(handler, 3)
+        result = self.next_result()
+        self.assertEqual(result.callback, 'FAIL')
+        self.assertTrue(isinstance(result.error, RuntimeError))
+
+    def test_cached_result_is_returned_right_away(self):
+        handler = self.make_handler()
+        self.assertEqual(self.activate(handler, 2), AsyncMenuHandler.PLACEHOLDER)
+        self.assertEqual(self.next_result().value, 'cached')
+        self.assertEqual(self.activate(handler, 2), 'cached')
+        self.assertEqual(len(self.cached_calls), 1)
+
+    def test_moving_away_cancels(self):
+        handler = self.make_handler(workers=2) # the cancelled callback keeps running in its worker
+        self.activate(handler, 0)
+        self.assertEqual(handler.pending, 'SLOW')
+        handler.next()
+        self.assertEqual(handler.pending, None)
+
+        self.activate(handler, 1)
+        self.assertEqual(self.next_result().callback, 'FAST')
+        self.release.set()
+        self.assertRaises(Queue.Empty, self.next_result, 0.2)
+
+    def test_results_in_order(self):
+        handler = self.make_handler(workers=2)
+        for idx in (1, 3, 1,):
+            self.activate(handler, idx)
+            self.next_result()
+        self.assertEqual([handler.poll().callback for _ in xrange(3)], ['FAST', 'FAIL', 'FAST'])
+        self.assertEqual(handler.poll(), None)
+
+    def test_timeout_does_not_hold_the_worker(self):
+        handler = self.make_handler(workers=1, timeouts={'SLOW': 0.05})
+        self.activate(handler, 0)
+        self.assertEqual(self.next_result(), AsyncMenuHandler.Result('SLOW', None, None, True))
+
+        self.activate(handler, 1) # SLOW is still running
+        self.assertEqual(self.next_result(0.5).callback, 'FAST')
+        self.release.set()
+        self.assertRaises(Queue.Empty, self.next_result, 0.2)
+
+    def test_hung_callback_runs_in_one_thread(self):
+        handler = self.make_handler(timeouts={'SLOW': 0.01})
+        threads = threading.active_count()
+        for _ in xrange(20):
+            self.activate(handler, 0)
+            self.assertEqual(self.next_result(), AsyncMenuHandler.Result('SLOW', None, None, True))
+        time.sleep(0.05) # lets the fired timers end
+        self.assertEqual(threading.active_count(), threads + 1)
+
+        self.release.set()
+        self.assertRaises(Queue.Empty, self.next_result, 0.2)
+
+    def test_activation_waits_for_the_former_run(self):
+        # long enough for the second activation not to time out before the release, even on a loaded host
+        handler = self.make_handler(timeouts={'SLOW': 0.5})
+        self.activate(handler, 0)
+        self.assertTrue(self.next_result().timed_out)
+
+        handler.jump_to((0, 0,))
+        self.activate(handler, 0)
+        self.assertEqual(handler.pending, 'SLOW')
+        self.release.set()
+        self.assertEqual(self.next_result(), AsyncMenuHandler.Result('SLOW', 'slow', None, False))
+
+    def test_positional_parameters(self):
+        handler = AsyncMenuHandler(self.menu, self.callbacks, 2, {'SLOW': 0.05}, None, '?', self.results.put)
+        self.handlers.append(handler)
+        handler.forward()
+        self.assertEqual(self.activate(handler, 0), '?')
+        self.assertTrue(self.next_result().timed_out)
+
+    def test_shared_callback_cache(self):
+        callback_cache = CallbackCache()
+        options = MenuHandler.Options(callback_cache=callback_cache)
+        handler = self.make_handler(options=options)
+        self.assertTrue(handler.callback_cache is callback_cache)
+
+        self.activate(handler, 2)
+        self.next_result()
+        self.assertEqual(self.activate(self.make_handler(options=options), 2), 'cached')
+
+    def test_replacing_the_menu_cancels(self):
+        handler = self.make_handler()
+        self.activate(handler, 0)
+        handler.menu = self.menu
+        self.assertEqual(handler.pending, None)
+
+        self.activate(handler, 0)
+        handler.remap(self.menu)
+        self.assertEqual(handler.pending, None)
+
+        self.release.set()
+        self.assertRaises(Queue.Empty, self.next_result, 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.CallbackCache import CallbackCache
+
+
+class Clock(object):
+    """ Clock moved by hand. """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CallbackCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+
+    def test_ttl_expiry(self):
+        cache = CallbackCache(clock=self.clock)
+        cache.put('A', 'a', ttl=10)
+        cache.put('B', 'b')
+        self.clock.now = 9.9
+        self.assertEqual(cache.get('A'), (True, 'a',))
+        self.assertTrue(cache.contains('A'))
+        self.clock.now = 10
+        self.assertEqual(cache.get('A'), (False, None,))
+        self.assertFalse(cache.contains('A'))
+        self.clock.now = 1e9
+        self.assertEqual(cache.get('B'), (True, 'b',)) # no ttl
+
+        cache.put('A', 'a2', ttl=10) # put again: fresh from now on
+        self.clock.now += 5
+        self.assertEqual(cache.get('A'), (True, 'a2',))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = CallbackCache(max_size=3, clock=self.clock)
+        for key in ('A', 'B', 'C',):
+            cache.put(key, key.lower())
+        cache.get('A') # B is now the least recently used
+        cache.put('D', 'd')
+        self.assertEqual(len(cache), 3)
+        self.assertFalse(cache.contains('B'))
+
+        cache.contains('C') # does not count as a use
+        cache.put('A', 'a2') # neither does a put over a held key evict
+        cache.put('E', 'e')
+        self.assertEqual([k for k in ('A', 'B', 'C', 'D', 'E',) if cache.contains(k)], ['A', 'D', 'E'])
+
+    def test_counters(self):
+        cache = CallbackCache(clock=self.clock)
+        calls = []
+        callback = CachedCallback(lambda: calls.append(None) or 'c', ttl=1)
+
+        cache.get('A') # miss
+        cache.put('A', 'a', ttl=1)
+        cache.get('A') # hit
+        cache.get('A') # hit
+        cache.contains('A') # not counted
+        self.clock.now = 1
+        cache.get('A') # miss: expired
+        cache.get_or_call('C', callback) # miss, called
+        cache.get_or_call('C', callback) # hit
+        cache.invalidate('C')
+        cache.get_or_call('C', callback) # miss, called
+        self.assertEqual((cache.hits, cache.misses,), (3, 4,))
+        self.assertEqual(len(calls), 2)
+
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.AbstractMenuBuilder import AbstractMenuBuilder
+from simple_menu.builders.CompiledMenu import CompiledMenu
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.MenuHandler import MenuHandler
+
+
+PROPERTIES = u"""[menu 1]
+feed.label = Feed
+feed.callback = FEED
+items.dynamic = true
+sub.leaf.callback = LEAF
+[menu 2]
+section.callback = CACHED
+[default_settings]
+callback = ROOT
+"""
+
+EVENTS = ('next', 'previous', 'forward', 'back',)
+
+
+class CompiledMenuTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.menu = StreamingMenuBuilder(properties_file).build({'items': [(u'Item 0', 'LEAF'), (u'Item 1', None)]})
+        self.cached_calls = []
+
+        def cached():
+            self.cached_calls.append(None)
+            return 'cached'
+
+        self.callbacks = {'ROOT': lambda: 'root',
+                          'FEED': lambda: 'feed',
+                          'LEAF': lambda: 'leaf',
+                          'CACHED': CachedCallback(cached)}
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_compile_reports_all_problems(self):
+        Section = AbstractMenuBuilder.Section
+        menu = AbstractMenuBuilder.Menu((Section('a', '', 'MISSING', None),
+                                         Section('', None, None, ()),
+                                         Section('c', None, 'NOT_CALLABLE', None),),
+                                        'ROOT',
+                                        (AbstractMenuBuilder.DynamicLocation('items', (), 0, 1),))
+        with self.assertRaises(ValueError) as context:
+            CompiledMenu.compile(menu, {'ROOT': lambda: None, 'NOT_CALLABLE': 'not callable'})
+        message = str(context.exception)
+        for problem in ('a: empty label.',
+                        'a: callback MISSING is not registered.',
+                        '/: section 1 has no name.',
+                        ': no sections.',
+                        'c: callback NOT_CALLABLE is not callable.',
+                        'Dynamic location of items does not match the sections.',):
+            self.assertTrue(problem in message, problem)
+
+    def test_compiled_menu_is_sealed(self):
+        compiled = CompiledMenu.compile(self.menu, self.callbacks)
+        self.assertEqual(compiled.sections[0].sections[0].text, 'Feed')
+        self.assertEqual(compiled.sections[0].sections[3].text, 'sub')
+        self.assertTrue(compiled.function is self.callbacks['ROOT'])
+        self.assertRaises(AttributeError, setattr, compiled.sections[0], 'text', 'x')
+        self.assertRaises(AttributeError, setattr, compiled, 'function', None)
+        self.assertRaises(AttributeError, setattr, compiled, 'other', None)
+
+    def test_compiled_nodes_are_slotted_tuples(self):
+        compiled = CompiledMenu.compile(self.menu, self.callbacks)
+        section = compiled.sections[0].sections[0]
+        # no instance dictionary to hold other attributes
+        self.assertRaises(AttributeError, object.__setattr__, compiled, 'other', None)
+        self.assertRaises(AttributeError, object.__setattr__, section, 'other', None)
+        self.assertTrue(isinstance(compiled, AbstractMenuBuilder.Menu))
+        self.assertTrue(isinstance(section, AbstractMenuBuilder.Section))
+        self.assertEqual(section[:4], ('feed', 'Feed', 'FEED', None,))
+        self.assertEqual(compiled.callbacks, self.callbacks)
+
+    def test_same_navigation_as_the_menu(self):
+        rnd = random.Random(42)
+        handler = MenuHandler(self.menu, self.callbacks)
+        compiled_handler = MenuHandler(CompiledMenu.compile(self.menu, self.callbacks))
+        for _ in xrange(1000):
+            event = rnd.choice(EVENTS)
+            self.assertEqual(getattr(compiled_handler, event)(), getattr(handler, event)(), event)
+            self.assertEqual(compiled_handler.location, handler.location)
+
+    def test_fast_path_needs_the_compiled_callbacks(self):
+        compiled = CompiledMenu.compile(self.menu, self.callbacks)
+        self.assertTrue(MenuHandler(compiled)._MenuHandler__direct_callbacks)
+        self.assertTrue(MenuHandler(compiled, compiled.callbacks)._MenuHandler__direct_callbacks)
+        self.assertFalse(MenuHandler(compiled, self.callbacks)._MenuHandler__direct_callbacks)
+
+    def test_back_on_the_first_level_without_root_callback(self):
+        menu = self.menu._replace(callback=None)
+        callbacks = dict(self.callbacks)
+        del callbacks['ROOT']
+        for handler in (MenuHandler(menu, callbacks), MenuHandler(CompiledMenu.compile(menu, callbacks)),):
+            self.assertRaises(AttributeError, handler.back)
+            self.assertEqual(handler.location, (0,))
+            self.assertEqual(handler.forward(), 'Feed')
+            self.assertEqual(handler.back(), 'menu 1')
+
+    def test_cached_callback(self):
+        handler = MenuHandler(CompiledMenu.compile(self.menu, self.callbacks))
+        handler.jump_to((1, 0,))
+        self.assertEqual(handler.forward(), 'cached')
+        self.assertEqual(handler.forward(), 'cached')
+        self.assertEqual(len(self.cached_calls), 1)
+
+    def test_other_callbacks_than_the_compiled_ones(self):
+        compiled = CompiledMenu.compile(self.menu, self.callbacks)
+        callbacks = dict(self.callbacks, FEED=lambda: 'new feed')
+        handler = MenuHandler(compiled, callbacks)
+        handler.forward()
+        self.assertEqual(handler.forward(), 'new feed')
+
+        handler = MenuHandler(compiled, dict(self.callbacks))
+        handler.forward()
+        self.assertEqual(handler.forward(), 'feed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.CompositeMenuBuilder import CompositeMenuBuilder
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+
+
+class CountingMenuBuilder(PropertiesMenuBuilder):
+    """ Builder recording the fragments it parses. """
+
+    parsed = []
+
+    def _parse(self):
+        CountingMenuBuilder.parsed.append(os.path.basename(self.properties_file))
+        return PropertiesMenuBuilder._parse(self)
+
+
+class CompositeMenuBuilderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        CountingMenuBuilder.parsed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def write(self, name, properties, mtime=None):
+        fragment_file = os.path.join(self.work_dir, name)
+        with open(fragment_file, 'w') as f:
+            f.write(properties.encode('utf-8'))
+        if mtime is not None:
+            os.utime(fragment_file, (mtime, mtime,))
+        return fragment_file
+
+    def make_builder(self, fragment_files, use_processes=False):
+        return CompositeMenuBuilder(fragment_files, builder_class=CountingMenuBuilder, use_processes=use_processes)
+
+    def test_merge_order(self):
+        fragments = [self.write('b', u'[menu b]\nb.label = B\n'),
+                     self.write('a', u'[menu a1]\na.label = A\n[menu a2]\nc.label = C\n[default_settings]\n'
+                                     u'callback = ROOT\n'),
+                     self.write('c', u'[menu c]\nc.label = C\n')]
+        menu = self.make_builder(fragments).build()
+        self.assertEqual([s.name for s in menu.sections], ['menu b', 'menu a1', 'menu a2', 'menu c'])
+        self.assertEqual(menu.callback, 'ROOT')
+
+    def test_conflicts_are_all_reported(self):
+        fragments = [self.write('a', u'[menu]\na.label = A\n[default_settings]\ncallback = ROOT\n'),
+                     self.write('b', u'[other]\nb.label = B\n[menu]\nb.label = B\n'),
+                     self.write('c', u'[default_settings]\ncallback = ROOT2\n')]
+        with self.assertRaises(ValueError) as context:
+            self.make_builder(fragments).build()
+        message = str(context.exception)
+        self.assertTrue('Section menu defined in %s and %s' % (fragments[0], fragments[1],) in message, message)
+        self.assertTrue('default_settings defined in %s and %s' % (fragments[0], fragments[2],) in message,
+                        message)
+
+    def test_only_changed_fragments_are_parsed_again(self):
+        fragments = [self.write(name, u'[menu %s]\na.label = A\n' % (name,)) for name in ('a', 'b', 'c',)]
+        builder = self.make_builder(fragments)
+        builder.build()
+        self.assertEqual(sorted(CountingMenuBuilder.parsed), ['a', 'b', 'c'])
+
+        CountingMenuBuilder.parsed = []
+        builder.build()
+        self.assertEqual(CountingMenuBuilder.parsed, [])
+
+        self.write('b', u'[menu b]\na.label = Changed\n')
+        menu = builder.build()
+        self.assertEqual(CountingMenuBuilder.parsed, ['b'])
+        self.assertEqual(menu.sections[1].sections[0].label, 'Changed')
+
+    def test_process_pool_lives_for_one_build(self):
+        fragments = [self.write(name, u'[menu %s]\na.label = A\n' % (name,)) for name in ('a', 'b', 'c',)]
+        menu = self.make_builder(fragments, use_processes=True).build()
+        self.assertEqual([s.name for s in menu.sections], ['menu a', 'menu b', 'menu c'])
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_edit_keeping_size_and_modification_time(self):
+        fragments = [self.write('a', u'[menu a]\na.label = A\n', 1000000000),
+                     self.write('b', u'[menu b]\nb.label = B\n', 1000000000)]
+        builder = self.make_builder(fragments)
+        builder.build()
+
+        CountingMenuBuilder.parsed = []
+        self.write('b', u'[menu b]\nb.label = C\n', 1000000000)
+        menu = builder.build()
+        self.assertEqual(CountingMenuBuilder.parsed, ['b'])
+        self.assertEqual(menu.sections[1].sections[0].label, 'C')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.FlatMenu import FlatMenu
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+from simple_menu.handlers.MenuHandler import MenuHandler
+
+
+PROPERTIES = u"""[menu 1]
+a.label = A
+a.callback = A_CALLBACK
+items.dynamic = true
+b.x.label = X
+b.y.z.label = Z \xe9
+b.y.items.dynamic = true
+b.other.callback = OTHER
+[menu 2]
+c.label = A
+[default_settings]
+callback = ROOT
+"""
+
+ITEMS = [(u'Item %d' % (idx,), 'ITEM') for idx in xrange(3)] + [(u'Item \xe9', None)]
+
+EVENTS = ('next', 'previous', 'forward', 'back',)
+
+
+class FlatMenuTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        builder = StreamingMenuBuilder(properties_file)
+        self.menu = builder.build({'items': ITEMS})
+        self.flat_menu = FlatMenu(builder.build_template(), {'items': ITEMS})
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def assertSameSections(self, flat_sections, sections):
+        self.assertEqual(len(flat_sections), len(sections))
+        for flat_section, section in zip(flat_sections, sections):
+            self.assertEqual((flat_section.name, flat_section.label, flat_section.callback,),
+                             (section.name, section.label, section.callback,))
+            if section.sections is None:
+                self.assertEqual(flat_section.sections, None)
+            else:
+                self.assertSameSections(flat_section.sections, section.sections)
+
+    def test_same_sections_as_the_menu(self):
+        self.assertSameSections(self.flat_menu.sections, self.menu.sections)
+        self.assertEqual(self.flat_menu.callback, 'ROOT')
+        self.assertEqual(self.flat_menu.dynamic, self.menu.dynamic)
+
+    def test_sections(self):
+        sections = self.flat_menu.sections[0].sections
+        self.assertEqual((sections[0].name, sections[0].label, sections[0].callback,), ('a', 'A', 'A_CALLBACK',))
+        self.assertEqual([sections[idx].label for idx in xrange(1, 5)],
+                         ['Item 0', 'Item 1', 'Item 2', u'Item \xe9'.encode('utf-8')])
+        self.assertEqual(sections[1].name, 'items0')
+        self.assertEqual(sections[1].callback, 'ITEM')
+        self.assertEqual(sections[4].callback, None)
+        z = sections[5].sections[1].sections[0]
+        self.assertEqual((z.name, z.label, z.sections,), ('z', u'Z \xe9'.encode('utf-8'), None,))
+        self.assertEqual(len(sections[5].sections[1].sections), 5)
+        self.assertEqual(sections[-1], sections[5])
+        # strings are interned: both A labels are one string
+        self.assertEqual(self.flat_menu.strings.count('A'), 1)
+
+    def test_index_out_of_range(self):
+        sections = self.flat_menu.sections
+        self.assertRaises(IndexError, sections.__getitem__, 2)
+        self.assertRaises(IndexError, sections.__getitem__, -3)
+        self.assertRaises(IndexError, sections[0].sections.__getitem__, 6)
+        self.assertEqual(len(list(sections[0].sections)), 6)
+
+    def test_same_navigation_as_the_menu(self):
+        rnd = random.Random(42)
+        callbacks = dict((name, (lambda name=name: name.lower())) for name in ('ROOT', 'A_CALLBACK', 'ITEM', 'OTHER',))
+        handler = MenuHandler(self.menu, callbacks)
+        flat_handler = MenuHandler(self.flat_menu, callbacks)
+        for _ in xrange(2000):
+            event = rnd.choice(EVENTS)
+            self.assertEqual(getattr(flat_handler, event)(), getattr(handler, event)(), event)
+            self.assertEqual(flat_handler.location, handler.location)
+
+
+if __name__ == '__main__':
+    unittest.main()
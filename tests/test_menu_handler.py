@@ -0,0 +1,291 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'benchmarks'))
+
+from simple_menu.builders.CompiledMenu import CompiledMenu
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+from simple_menu.handlers.AsyncMenuHandler import AsyncMenuHandler
+from simple_menu.handlers.FrameCache import FrameCache
+from simple_menu.handlers.MenuHandler import MenuHandler
+from simple_menu.handlers.Prefetcher import Prefetcher
+from simple_menu.instrumentation.Observer import Observer
+from navigation_benchmark import WalkingMenuHandler
+
+
+PROPERTIES = u"""[menu 1]
+before.label = Before
+items.dynamic = true
+after.label = After
+sub.leaf.label = Leaf
+sub.other.label = Other
+[menu 2]
+section.label = Section
+[default_settings]
+callback = ROOT
+"""
+
+
+def make_items(count):
+    return [(u'Item %d' % (idx,), None) for idx in xrange(count)]
+
+
+class UpdatedMenuTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.builder = StreamingMenuBuilder(properties_file)
+        self.menu = self.builder.build({'items': make_items(3)})
+        self.handler = MenuHandler(self.menu, {'ROOT': lambda: None})
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def update(self, count):
+        self.menu = self.builder.update_dynamic_sections(self.menu, 'items', make_items(count))
+        self.handler.menu = self.menu
+
+    def test_section_after_resized_block(self):
+        self.handler.forward()
+        self.assertEqual(self.handler.jump_to((0, 4,)), 'After')
+
+        self.update(1)
+        self.assertEqual(self.handler.location, (0, 2,))
+        self.assertEqual(self.handler.get_current_location(), 'After')
+
+        self.update(5)
+        self.assertEqual(self.handler.location, (0, 6,))
+        self.assertEqual(self.handler.next(), 'sub')
+
+    def test_subtree_after_resized_block(self):
+        self.assertEqual(self.handler.jump_to((0, 5, 1,)), 'Other')
+
+        self.update(0)
+        self.assertEqual(self.handler.location, (0, 2, 1,))
+        self.assertEqual(self.handler.get_current_location(), 'Other')
+        self.assertEqual(self.handler.back(), 'sub')
+
+    def test_removed_dynamic_section_falls_back_to_parent(self):
+        self.assertEqual(self.handler.jump_to((0, 3,)), 'Item 2')
+
+        self.update(2)
+        self.assertEqual(self.handler.location, (0,))
+        self.assertEqual(self.handler.get_current_location(), 'menu 1')
+
+    def test_kept_dynamic_section(self):
+        self.assertEqual(self.handler.jump_to((0, 2,)), 'Item 1')
+
+        self.update(2)
+        self.assertEqual(self.handler.location, (0, 2,))
+
+    def test_remap_by_name(self):
+        self.handler.jump_to((1, 0,))
+        menu = self.builder.build({'items': make_items(3)})
+        reordered = menu._replace(sections=menu.sections[::-1])
+
+        self.handler.remap(reordered)
+        self.assertEqual(self.handler.location, (0, 0,))
+        self.assertEqual(self.handler.get_current_location(), 'Section')
+
+
+class FrameCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.builder = StreamingMenuBuilder(properties_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_lazily_fetched_sections_are_not_cached(self):
+        items = make_items(1000)
+        menu = self.builder.build({'items': lambda offset, limit: items[offset:offset + limit]})
+        frame_cache = FrameCache(menu)
+        handler = MenuHandler(menu, {'ROOT': lambda: None}, MenuHandler.Options(frame_cache=frame_cache))
+        handler.jump_to((0, 1,))
+        self.assertEqual(handler.get_current_frames(), ('items           ',))
+        handler.forward()
+        for _ in xrange(5 * len(items)):
+            handler.next()
+            handler.get_current_frames()
+        self.assertEqual(handler.get_current_frames(), ('Item 0          ',))
+        self.assertEqual(len(frame_cache), 1)
+
+    def test_frames_of_the_sections_are_cached(self):
+        menu = self.builder.build({'items': make_items(3)})
+        frame_cache = FrameCache(menu, width=4)
+        handler = MenuHandler(menu, {'ROOT': lambda: None}, MenuHandler.Options(frame_cache=frame_cache))
+        handler.forward()
+        frames = handler.get_current_frames()
+        self.assertEqual(frames, ('Befo', 'efor', 'fore', 'ore ', 're  ', 'e   ', '   B', '  Be', ' Bef',))
+        self.assertTrue(handler.get_current_frames() is frames)
+        self.assertEqual(len(frame_cache), 1)
+
+
+PROCESS_PROPERTIES = u"""[menu 1]
+before.callback = BEFORE
+items.dynamic = true
+sub.leaf.callback = LEAF
+sub.paged.dynamic = true
+sub.other.label = Other
+[menu 2]
+section.callback = SECTION
+[default_settings]
+callback = ROOT
+"""
+
+EVENTS = ('next', 'previous', 'forward', 'back',)
+
+
+class NavigationTest(unittest.TestCase):
+    """ Navigation against the former handler, which walked the menu from its root on every move. """
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROCESS_PROPERTIES.encode('utf-8'))
+        items = [(u'Item %d' % (idx,), 'ITEM') for idx in xrange(3)]
+        paged_items = [(u'Paged %d' % (idx,), 'PAGED') for idx in xrange(70)]
+        self.menu = StreamingMenuBuilder(properties_file).build(
+                                {'items': items, 'paged': lambda offset, limit: paged_items[offset:offset + limit]})
+        self.callbacks = dict((name, (lambda name=name: name.lower()))
+                              for name in ('ROOT', 'BEFORE', 'ITEM', 'LEAF', 'PAGED', 'SECTION',))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def assertSameMoves(self, handler, walking, events):
+        for event in events:
+            self.assertEqual(getattr(handler, event)(), getattr(walking, event)(), event)
+            self.assertEqual(handler.get_current_location(), walking.get_current_location(), event)
+
+    def test_random_walk(self):
+        rnd = random.Random(42)
+        handler = MenuHandler(self.menu, self.callbacks)
+        walking = WalkingMenuHandler(self.menu, self.callbacks)
+        self.assertSameMoves(handler, walking, [rnd.choice(EVENTS) for _ in xrange(5000)])
+
+    def test_edge_cases(self):
+        handler = MenuHandler(self.menu, self.callbacks)
+        walking = WalkingMenuHandler(self.menu, self.callbacks)
+        # back on the first level, previous from index 0 of the first level
+        self.assertSameMoves(handler, walking, ['back', 'previous', 'next', 'back'])
+        self.assertEqual(handler.location, (0,))
+        # previous from index 0 of a sub level, forward on leaves with and without a callback
+        self.assertSameMoves(handler, walking, ['forward', 'previous', 'forward', 'forward', 'previous', 'forward',
+                                                'back'])
+        self.assertEqual(handler.location, (0, 4,))
+        # tuple dynamic level
+        self.assertSameMoves(handler, walking, ['previous', 'previous', 'forward'])
+        self.assertEqual(handler.location, (0, 2,))
+        # paged dynamic level: previous from index 0 fetches up to the last section
+        self.assertSameMoves(handler, walking, ['next', 'next', 'forward', 'next', 'forward', 'previous'])
+        self.assertEqual(handler.location, (0, 4, 1, 69,))
+        self.assertSameMoves(handler, walking, ['forward', 'next', 'next', 'back', 'back', 'back'])
+        self.assertEqual(handler.location, (0,))
+
+
+class ProcessTest(unittest.TestCase):
+    """ process() against the same events applied one method call at a time. """
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROCESS_PROPERTIES.encode('utf-8'))
+        self.builder = StreamingMenuBuilder(properties_file)
+        self.rnd = random.Random(42)
+        self.release = threading.Event()
+        self.closed = []
+
+    def tearDown(self):
+        self.release.set()
+        for close in self.closed:
+            close()
+        shutil.rmtree(self.work_dir)
+
+    def build(self, paged=True):
+        items = [(u'Item %d' % (idx,), 'ITEM') for idx in xrange(3)]
+        paged_items = [(u'Paged %d' % (idx,), 'PAGED') for idx in xrange(70)]
+        if paged:
+            return self.builder.build({'items': items,
+                                       'paged': lambda offset, limit: paged_items[offset:offset + limit]})
+        return self.builder.build({'items': items, 'paged': paged_items})
+
+    def make_callbacks(self, calls):
+        def make_callback(name):
+            def callback():
+                calls.append(name)
+                return name.lower()
+            return callback
+        return dict((name, make_callback(name)) for name in ('ROOT', 'BEFORE', 'ITEM', 'LEAF', 'PAGED', 'SECTION',))
+
+    def replay(self, make_handler, moves=300):
+        sequential_calls = []
+        processed_calls = []
+        sequential = make_handler(self.make_callbacks(sequential_calls))
+        processed = make_handler(self.make_callbacks(processed_calls))
+        for _ in xrange(moves):
+            events = [self.rnd.choice(EVENTS) for _ in xrange(self.rnd.randint(0, 8))]
+            expected = sequential.get_current_location()
+            for event in events:
+                expected = getattr(sequential, event)()
+            self.assertEqual(processed.process(events), expected, events)
+            self.assertEqual(processed.location, sequential.location, events)
+            self.assertEqual(processed_calls, sequential_calls, events)
+            self.assertEqual(getattr(processed, 'pending', None), getattr(sequential, 'pending', None), events)
+        return sequential, processed
+
+    def test_plain(self):
+        menu = self.build()
+        self.replay(lambda callbacks: MenuHandler(menu, callbacks))
+
+    def test_compiled(self):
+        menu = self.build(paged=False)
+        self.replay(lambda callbacks: MenuHandler(CompiledMenu.compile(menu, callbacks)))
+
+    def test_observed(self):
+        menu = self.build()
+        self.replay(lambda callbacks: MenuHandler(menu, callbacks, MenuHandler.Options(observer=Observer())))
+
+    def test_prefetching(self):
+        menu = self.build()
+        prefetcher = Prefetcher()
+        self.closed.append(prefetcher.close)
+        self.replay(lambda callbacks: MenuHandler(menu, callbacks, MenuHandler.Options(prefetcher=prefetcher)))
+
+    def test_async_cancellation(self):
+        menu = self.build()
+
+        def block(callback): # pending until the end of the test
+            def blocked():
+                self.release.wait(5)
+                return callback()
+            return blocked
+
+        def make_handler(callbacks):
+            handler = AsyncMenuHandler(menu, dict((name, block(c)) for name, c in callbacks.iteritems()))
+            self.closed.append(handler.close)
+            return handler
+
+        processed = self.replay(make_handler, 100)[1]
+        processed.process(['forward'] * 3)
+        processed.process(['next'])
+        self.assertEqual(processed.pending, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
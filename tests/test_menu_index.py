@@ -0,0 +1,118 @@
+import os
+import random
+import shutil
+import string
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+from simple_menu.handlers.MenuHandler import MenuHandler
+from simple_menu.handlers.MenuIndex import MenuIndex
+
+
+PROPERTIES = u"""[menu 1]
+alpha.label = Alpha
+items.dynamic = true
+beta.label = Beta
+sub.x.label = Xray
+sub.more.dynamic = true
+sub.y.label = Yankee
+items2.dynamic = true
+[menu 2]
+others.dynamic = true
+gamma.label = Gamma
+[default_settings]
+callback = ROOT
+"""
+
+OPT_NAMES = ('items', 'more', 'items2', 'others',)
+
+
+def make_items(rnd, count):
+    return [(u''.join(rnd.choice(u'abgxy') for _ in xrange(3)), None) for _ in xrange(count)]
+
+
+class MenuIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.builder = StreamingMenuBuilder(properties_file)
+        self.rnd = random.Random(42)
+        self.menu = self.builder.build(dict((opt_name, make_items(self.rnd, 2)) for opt_name in OPT_NAMES))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def assertSameIndex(self, index, expected):
+        self.assertEqual(len(index), len(expected))
+        for prefix in string.ascii_lowercase + u' ':
+            for length in (1, 2, 3,):
+                self.assertEqual(index.find(prefix * length), expected.find(prefix * length))
+        for prefix in (u'items', u'items2', u'more', u'others', u'menu 1', u'sub',):
+            self.assertEqual(index.find(prefix), expected.find(prefix))
+
+    def test_update_matches_a_full_rebuild(self):
+        index = MenuIndex(self.menu)
+        for _ in xrange(300):
+            opt_name = self.rnd.choice(OPT_NAMES)
+            count = self.rnd.randint(0, 4)
+            self.menu = self.builder.update_dynamic_sections(self.menu, opt_name, make_items(self.rnd, count))
+            index.update(self.menu, opt_name)
+            self.assertTrue(index.menu is self.menu)
+            self.assertSameIndex(index, MenuIndex(self.menu))
+
+    def test_find(self):
+        index = MenuIndex(self.menu)
+        self.assertEqual(index.find(u'ALPHA'), [(0, 0,)])
+        self.assertEqual(index.find(u'gamma'), [(1, 2,)])
+        self.assertEqual(index.find(u'more'), [(0, 4, 1,), (0, 4, 2,)])
+        self.assertEqual(index.find(u'zulu'), [])
+
+
+class SearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        items = [(u'Item %d' % (idx,), None) for idx in xrange(3)]
+        self.menu = StreamingMenuBuilder(properties_file).build(
+                                                dict((opt_name, items) for opt_name in OPT_NAMES))
+        self.handler = MenuHandler(self.menu, {'ROOT': lambda: None})
+        self.index = MenuIndex(self.menu)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_search_from_the_current_location(self):
+        self.assertEqual(self.handler.search(self.index, u'item 1'), 'Item 1')
+        self.assertEqual(self.handler.location, (0, 2,))
+        self.assertEqual(self.handler.search(self.index, u'item 1'), 'Item 1')
+        self.assertEqual(self.handler.location, (0, 2,))
+
+        self.handler.jump_to((0, 5,))
+        self.assertEqual(self.handler.search(self.index, u'item 1'), 'Item 1')
+        self.assertEqual(self.handler.location, (0, 5, 2,))
+
+    def test_search_cycles(self):
+        locations = []
+        for _ in xrange(5):
+            self.assertEqual(self.handler.search(self.index, u'item 2', cycle=True), 'Item 2')
+            locations.append(self.handler.location)
+        self.assertEqual(locations, [(0, 3,), (0, 5, 3,), (0, 8,), (1, 2,), (0, 3,)])
+
+    def test_no_match_keeps_the_location(self):
+        self.handler.jump_to((0, 1,))
+        self.assertEqual(self.handler.search(self.index, u'zulu'), None)
+        self.assertEqual(self.handler.location, (0, 1,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.FileSignature import FileSignature
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+from simple_menu.handlers.MenuHandler import MenuHandler
+from simple_menu.handlers.MenuReloader import MenuReloader
+
+
+PROPERTIES = u"""[menu 1]
+section1.label = %s
+section2.label = Other
+[default_settings]
+callback = ROOT
+"""
+
+
+class MenuReloaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        self.properties_file = os.path.join(self.work_dir, 'menu.properties')
+        self.write('Feed')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def write(self, label, mtime=None):
+        with open(self.properties_file, 'w') as f:
+            f.write((PROPERTIES % (label,)).encode('utf-8'))
+        if mtime is not None:
+            os.utime(self.properties_file, (mtime, mtime,))
+
+    def test_unchanged_file_is_not_reloaded(self):
+        reloader = MenuReloader(PropertiesMenuBuilder(self.properties_file))
+        self.assertFalse(reloader.check())
+        self.assertFalse(reloader.check())
+
+    def test_reload_keeps_the_location(self):
+        reloader = MenuReloader(PropertiesMenuBuilder(self.properties_file))
+        handler = MenuHandler(reloader.menu, {'ROOT': lambda: None})
+        reloader.register(handler)
+        handler.jump_to((0, 1,))
+
+        self.write('Food label')
+        self.assertTrue(reloader.check())
+        self.assertTrue(handler.menu is reloader.menu)
+        self.assertEqual(handler.location, (0, 1,))
+        self.assertEqual(handler.back(), 'menu 1')
+        self.assertEqual(handler.forward(), 'Food label')
+
+    def test_edit_keeping_size_and_modification_time(self):
+        self.write('Feed', 1000000000)
+        reloader = MenuReloader(PropertiesMenuBuilder(self.properties_file))
+
+        self.write('Food', 1000000000)
+        self.assertTrue(reloader.check())
+        self.assertEqual(reloader.menu.sections[0].sections[0].label, 'Food')
+
+    def test_racy_signature_checks_the_digest(self):
+        signature = FileSignature.read(self.properties_file)
+        self.assertTrue(signature.is_racy())
+        self.assertTrue(signature.digest is not None)
+        self.assertTrue(FileSignature.read(self.properties_file, signature).matches(signature))
+
+        edited = signature._replace(digest='0' * 20) # same time stamps, other content
+        self.assertFalse(FileSignature.read(self.properties_file, edited).matches(edited))
+
+        settled = signature._replace(taken=signature.ctime + 60, digest=None)
+        self.assertFalse(settled.is_racy())
+        self.assertTrue(FileSignature.read(self.properties_file, settled).matches(settled))
+
+    def test_missing_file(self):
+        self.assertEqual(FileSignature.read(os.path.join(self.work_dir, 'missing')), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
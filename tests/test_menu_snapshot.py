@@ -0,0 +1,86 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.MenuSnapshot import MenuSnapshot
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+
+
+PROPERTIES = u"""[menu 1]
+section1.label = Feed
+section1.callback = %s
+[default_settings]
+callback = ROOT
+"""
+
+
+class MenuSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        self.properties_file = os.path.join(self.work_dir, 'menu.properties')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def write(self, callback):
+        with open(self.properties_file, 'w') as f:
+            f.write((PROPERTIES % (callback,)).encode('utf-8'))
+
+    def build(self):
+        return PropertiesMenuBuilder(self.properties_file, use_snapshot=True).build()
+
+    def test_snapshot_matches_parsed_menu(self):
+        self.write('FEED')
+        parsed = PropertiesMenuBuilder(self.properties_file).build()
+        self.assertEqual(self.build(), parsed) # writes the snapshot
+        self.assertTrue(os.path.exists(self.properties_file + MenuSnapshot.EXTENSION))
+        self.assertEqual(self.build(), parsed) # loads it
+
+    def test_snapshot_is_reused_without_compiling(self):
+        self.write('FEED')
+        snapshot = MenuSnapshot(self.properties_file)
+        builder = PropertiesMenuBuilder(self.properties_file)
+        template = snapshot.load(builder.build_template)
+
+        def fail():
+            self.fail('the template was compiled again')
+        self.assertEqual(snapshot.load(fail), template)
+
+    def test_edit_keeping_size_and_modification_time(self):
+        self.write('FEED')
+        os.utime(self.properties_file, (1000000000, 1000000000,))
+        self.assertEqual(self.build().sections[0].sections[0].callback, 'FEED')
+
+        st = os.stat(self.properties_file)
+        self.write('FOOD')
+        os.utime(self.properties_file, (1000000000, 1000000000,))
+        self.assertEqual(os.stat(self.properties_file).st_size, st.st_size)
+        self.assertEqual(os.stat(self.properties_file).st_mtime, st.st_mtime)
+
+        self.assertEqual(self.build().sections[0].sections[0].callback, 'FOOD')
+
+    def test_replaced_file_is_compiled_again(self):
+        self.write('FEED')
+        self.build()
+        replacement = os.path.join(self.work_dir, 'replacement')
+        with open(replacement, 'w') as f:
+            f.write((PROPERTIES % ('FOOD',)).encode('utf-8'))
+        os.rename(replacement, self.properties_file)
+
+        self.assertEqual(self.build().sections[0].sections[0].callback, 'FOOD')
+
+    def test_invalid_snapshot_is_ignored(self):
+        self.write('FEED')
+        with open(self.properties_file + MenuSnapshot.EXTENSION, 'w') as f:
+            f.write('garbage')
+
+        self.assertEqual(self.build().sections[0].sections[0].callback, 'FEED')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+from simple_menu.handlers.AsyncMenuHandler import AsyncMenuHandler
+from simple_menu.handlers.MenuHandler import MenuHandler
+from simple_menu.instrumentation.MetricsObserver import MetricsObserver
+
+
+PROPERTIES = u"""[menu 1]
+a.callback = SLOW
+b.callback = FAST
+c.callback = FAILING
+d.sub.label = Sub
+[default_settings]
+callback = ROOT
+"""
+
+
+class Clock(object):
+    """ Clock moved by hand (by the callbacks here). """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MetricsObserverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.clock = Clock()
+        self.observer = MetricsObserver(self.clock)
+        self.menu = StreamingMenuBuilder(properties_file).build()
+
+        def take(duration, error=None):
+            def callback():
+                self.clock.now += duration
+                if error is not None:
+                    raise error
+                return 'done'
+            return callback
+
+        self.callbacks = {'ROOT': take(0),
+                          'SLOW': take(0.003),
+                          'FAST': take(0.000003),
+                          'FAILING': take(0.0005, ValueError('failing'))}
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_percentiles(self):
+        histogram = MetricsObserver.Histogram()
+        self.assertEqual(histogram.percentile(50), None)
+        self.assertEqual(histogram.mean(), None)
+        for _ in xrange(90):
+            histogram.record(0.000003)
+        for _ in xrange(10):
+            histogram.record(0.001)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.mean(), (90 * 0.000003 + 10 * 0.001) / 100)
+        self.assertEqual((histogram.minimum, histogram.maximum,), (0.000003, 0.001,))
+        self.assertEqual(histogram.percentile(50), 0.000004) # upper bound of the bucket
+        self.assertEqual(histogram.percentile(90), 0.000004)
+        self.assertEqual(histogram.percentile(91), 0.001) # bucket bound above the maximum
+        self.assertEqual(histogram.percentile(100), 0.001)
+
+        histogram.record(100.0) # past the last bound
+        self.assertEqual(histogram.percentile(100), 100.0)
+
+    def test_handler_timings(self):
+        handler = MenuHandler(self.menu, self.callbacks, MenuHandler.Options(observer=self.observer))
+        handler.forward()
+        self.assertEqual(handler.forward(), 'done') # SLOW
+        handler.next()
+        self.assertEqual(handler.forward(), 'done') # FAST
+        self.assertEqual(handler.forward(), 'done')
+        handler.next()
+        self.assertRaises(ValueError, handler.forward) # FAILING: an interrupted move is not timed
+        handler.next()
+        handler.process(['forward', 'back', 'back'])
+
+        navigation = self.observer.navigation
+        self.assertEqual(dict((k, h.count) for k, h in navigation.iteritems()),
+                         {'forward': 4, 'next': 3, 'process': 1})
+        self.assertEqual(navigation['forward'].maximum, 0.003)
+        self.assertEqual(navigation['forward'].percentile(50), 0.000004)
+        self.assertEqual(navigation['next'].maximum, 0)
+        by_depth = self.observer.navigation_by_depth
+        self.assertEqual(dict((k, h.count) for k, h in by_depth.iteritems()),
+                         {('forward', 2,): 4, ('next', 2,): 3, ('process', 1,): 1})
+
+        callbacks = self.observer.callbacks
+        self.assertEqual(dict((k, h.count) for k, h in callbacks.iteritems()),
+                         {'SLOW': 1, 'FAST': 2, 'FAILING': 1})
+        self.assertEqual(callbacks['SLOW'].total, 0.003)
+        self.assertEqual(callbacks['FAILING'].maximum, 0.0005)
+        self.assertEqual(self.observer.callback_errors, {'FAILING': 1})
+        self.assertEqual(self.observer.callback_timeouts, {})
+
+        report = self.observer.report().splitlines()
+        self.assertTrue('callback   SLOW                     n=1        mean=3.000 p50=3.000 p99=3.000 max=3.000'
+                        in report, report)
+        self.assertTrue('depth      forward@2                n=4        mean=0.751 p50=0.004 p99=3.000 max=3.000'
+                        in report, report)
+        self.assertTrue('error      FAILING                  n=1' in report, report)
+
+        self.observer.reset()
+        self.assertEqual(self.observer.navigation, {})
+        self.assertEqual(self.observer.report(), '')
+
+    def test_timeouts(self):
+        release = threading.Event()
+        results = []
+        done = threading.Event()
+
+        def listen(result):
+            results.append(result)
+            done.set()
+
+        def hung():
+            release.wait(5)
+            return 'late'
+
+        handler = AsyncMenuHandler(self.menu, dict(self.callbacks, SLOW=hung), timeouts={'SLOW': 0.05},
+                                   result_listener=listen, options=MenuHandler.Options(observer=self.observer))
+        try:
+            handler.forward()
+            handler.forward()
+            self.assertTrue(done.wait(5))
+            self.assertTrue(results[0].timed_out)
+            self.assertEqual(self.observer.callback_timeouts, {'SLOW': 1})
+            self.assertTrue('timeout    SLOW                     n=1' in self.observer.report().splitlines())
+        finally:
+            release.set()
+            handler.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.PagedSections import PagedSections
+
+
+ENTRIES = [(u'Entry %d' % (idx,), 'CALLBACK%d' % (idx,)) for idx in xrange(100)]
+
+
+class CountingList(object):
+    """ Iterable which can be iterated again, counting its iterations. """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        return iter(self.entries)
+
+
+class PagedSectionsTest(unittest.TestCase):
+
+    def assertSections(self, sections, indexes):
+        for idx in indexes:
+            section = sections[idx]
+            idx %= len(ENTRIES)
+            self.assertEqual(section.name, 'items%d' % (idx,))
+            self.assertEqual(section.label, ENTRIES[idx][0].encode('utf-8'))
+            self.assertEqual(section.callback, ENTRIES[idx][1])
+
+    def test_callable_provider(self):
+        calls = []
+
+        def provider(offset, limit):
+            calls.append(offset)
+            return ENTRIES[offset:offset + limit]
+        sections = PagedSections('items', provider, page_size=10, max_pages=2)
+
+        self.assertSections(sections, [0, 5, 9])
+        self.assertEqual(calls, [0])
+        self.assertSections(sections, [15, 25, 3])
+        self.assertEqual(calls, [0, 10, 20, 0])
+        self.assertEqual(len(sections), 100)
+        self.assertRaises(IndexError, sections.__getitem__, 100)
+        self.assertSections(sections, [-1])
+
+    def test_iterable_provider_is_evicted(self):
+        provider = CountingList(ENTRIES)
+        sections = PagedSections('items', provider, page_size=10, max_pages=2)
+
+        self.assertSections(sections, [0, 55, 99, 12, 3])
+        self.assertEqual(len(sections), 100)
+        self.assertTrue(len(sections._PagedSections__pages) <= 2)
+        self.assertTrue(provider.iterations > 1)
+
+    def test_iterator_provider_is_kept(self):
+        sections = PagedSections('items', iter(ENTRIES), page_size=10, max_pages=2)
+
+        self.assertSections(sections, [55, 3, 99, 0])
+        self.assertEqual(len(sections), 100)
+        self.assertEqual(sum(len(page) for page in sections._PagedSections__pages.itervalues()), 100)
+
+    def test_end_of_entries(self):
+        sections = PagedSections('items', lambda offset, limit: ENTRIES[offset:offset + limit], page_size=10)
+
+        self.assertEqual(len(list(sections)), 100)
+        self.assertFalse(PagedSections('items', lambda offset, limit: [], page_size=10))
+        self.assertFalse(PagedSections('items', [], page_size=10))
+
+    def test_invalidate(self):
+        entries = list(ENTRIES[:20])
+        sections = PagedSections('items', lambda offset, limit: entries[offset:offset + limit], page_size=10)
+        self.assertEqual(len(sections), 20)
+
+        del entries[5:]
+        sections.invalidate()
+        self.assertEqual(len(sections), 5)
+
+    def test_concurrent_reads(self):
+        def provider(offset, limit):
+            time.sleep(0.0001)
+            return ENTRIES[offset:offset + limit]
+
+        errors = []
+        for provider in (provider, CountingList(ENTRIES),):
+            sections = PagedSections('items', provider, page_size=7, max_pages=3)
+
+            def read(seed):
+                rnd = random.Random(seed)
+                try:
+                    self.assertSections(sections, [rnd.randrange(-100, 100) for _ in xrange(300)])
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=read, args=(seed,)) for seed in xrange(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertTrue(len(sections._PagedSections__pages) <= 3)
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+from simple_menu.handlers.CachedCallback import CachedCallback
+from simple_menu.handlers.MenuHandler import MenuHandler
+from simple_menu.handlers.Prefetcher import Prefetcher
+
+
+NAMES = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H',)
+
+PROPERTIES = u"""[menu 1]
+%s
+[default_settings]
+callback = ROOT
+""" % (u'\n'.join(u'%s.callback = %s' % (name.lower(), name,) for name in NAMES),)
+
+
+class PrefetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.menu = StreamingMenuBuilder(properties_file).build()
+        self.release = threading.Event()
+        self.blocked = threading.Event()
+        self.calls = []
+        self.callbacks = dict((name, CachedCallback(self.make_callback(name), prefetch=True)) for name in NAMES)
+        self.callbacks['ROOT'] = lambda: None
+
+    def tearDown(self):
+        self.release.set()
+        shutil.rmtree(self.work_dir)
+
+    def make_callback(self, name, blocking=False):
+        def callback():
+            if blocking and not self.calls.count(name): # only the first invocation blocks
+                self.calls.append(name)
+                self.blocked.set()
+                self.release.wait(5)
+                return name.lower()
+            self.calls.append(name)
+            return name.lower()
+        return callback
+
+    def make_handler(self, prefetcher):
+        self.addCleanup(prefetcher.close)
+        return MenuHandler(self.menu, self.callbacks, MenuHandler.Options(prefetcher=prefetcher))
+
+    def wait_all(self, handler):
+        for name in NAMES:
+            handler.prefetcher.wait(handler.callback_cache, name, 5)
+
+    def test_prefetch_fills_the_cache(self):
+        handler = self.make_handler(Prefetcher())
+        handler.forward()
+        self.wait_all(handler)
+        # the current section and its siblings, the previous one being the last
+        self.assertEqual(sorted(self.calls), ['A', 'B', 'H'])
+        for name in ('A', 'B', 'H',):
+            self.assertTrue(handler.callback_cache.contains(name), name)
+
+        self.assertEqual(handler.forward(), 'a')
+        self.assertEqual(handler.previous(), 'h')
+        self.assertEqual(handler.forward(), 'h')
+        self.wait_all(handler)
+        self.assertEqual(sorted(self.calls), ['A', 'B', 'G', 'H'])
+
+    def test_stale_prefetches_are_skipped(self):
+        self.callbacks['A'] = CachedCallback(self.make_callback('A', blocking=True), prefetch=True)
+        handler = self.make_handler(Prefetcher(workers=1))
+        handler.forward()
+        self.assertTrue(self.blocked.wait(5)) # A holds the only worker, B and H are scheduled
+        for _ in xrange(3):
+            handler.next() # the cursor moves on before B and H start
+        self.release.set()
+        self.wait_all(handler)
+        self.assertEqual(sorted(self.calls), ['A', 'C', 'D', 'E'])
+        self.assertFalse(handler.callback_cache.contains('B'))
+        self.assertFalse(handler.callback_cache.contains('H'))
+
+    def test_hung_prefetch_does_not_block_the_activation(self):
+        self.callbacks['A'] = CachedCallback(self.make_callback('A', blocking=True), prefetch=True)
+        handler = self.make_handler(Prefetcher(wait_timeout=0.05))
+        handler.forward()
+        start = time.time()
+        self.assertEqual(handler.forward(), 'a') # invoked in the foreground
+        self.assertTrue(time.time() - start < 2)
+        self.assertEqual(self.calls.count('A'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
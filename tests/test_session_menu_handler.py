@@ -0,0 +1,156 @@
+import binascii
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+from simple_menu.handlers.MenuHandler import MenuHandler
+from simple_menu.handlers.SessionMenuHandler import SessionMenuHandler
+from simple_menu.servers.MenuServer import MenuServer
+
+
+PROPERTIES = u"""[menu 1]
+a.label = A
+b.x.label = X
+b.y.label = Y
+b.y.z.label = Z
+c.callback = C
+[menu 2]
+d.label = D
+[default_settings]
+callback = ROOT
+"""
+
+PAGED_PROPERTIES = u"""[menu]
+a.label = A
+items.dynamic = true
+[default_settings]
+callback = ROOT
+"""
+
+EVENTS = ('back', 'forward', 'next', 'previous',)
+
+
+class Clock(object):
+    """ Clock moved by hand. """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SessionMenuHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PROPERTIES.encode('utf-8'))
+        self.menu = StreamingMenuBuilder(properties_file).build()
+        self.callbacks = {'ROOT': lambda: 'root', 'C': lambda: 'c'}
+        self.handler = SessionMenuHandler(self.menu, self.callbacks)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def make_server(self, **kwargs):
+        server = MenuServer(self.handler, os.path.join(self.work_dir, 'socket'), **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_same_navigation_as_menu_handler(self):
+        rnd = random.Random(42)
+        menu_handler = MenuHandler(self.menu, self.callbacks)
+        cursor = self.handler.new_cursor()
+        for _ in xrange(500):
+            event = rnd.choice(EVENTS)
+            self.assertEqual(getattr(self.handler, event)(cursor), getattr(menu_handler, event)())
+            self.assertEqual(tuple(cursor.location), menu_handler.location)
+
+    def test_dump_and_load(self):
+        cursor = self.handler.new_cursor()
+        self.handler.forward(cursor)
+        self.handler.next(cursor)
+        self.handler.forward(cursor)
+        self.handler.next(cursor)
+        loaded = self.handler.load_cursor(self.handler.dump_cursor(cursor))
+        self.assertEqual(loaded.location, [0, 1, 1])
+        self.assertEqual(self.handler.forward(loaded), 'Z')
+
+    def test_invalid_cursor_is_rejected(self):
+        for location in ('ffffffff', '0000000005000000', '00000000010000000000000000000000', '000000'):
+            self.assertRaises(ValueError, self.handler.load_cursor, binascii.unhexlify(location))
+
+    def test_dump_and_load_flat_menu(self):
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        handler = SessionMenuHandler(StreamingMenuBuilder(properties_file).build_flat(), self.callbacks)
+        cursor = handler.new_cursor()
+        handler.forward(cursor)
+        handler.next(cursor)
+        handler.forward(cursor)
+        handler.next(cursor)
+        loaded = handler.load_cursor(handler.dump_cursor(cursor))
+        self.assertEqual(loaded.location, [0, 1, 1])
+        self.assertEqual(handler.forward(loaded), 'Z')
+        for location in ('ffffffff', '0000000005000000', '00000000010000000000000000000000'):
+            self.assertRaises(ValueError, handler.load_cursor, binascii.unhexlify(location))
+
+    def test_dump_and_load_paged_sections(self):
+        properties_file = os.path.join(self.work_dir, 'menu.properties')
+        with open(properties_file, 'w') as f:
+            f.write(PAGED_PROPERTIES.encode('utf-8'))
+        entries = [(u'Entry %d' % (idx,), None) for idx in xrange(70)]
+        menu = StreamingMenuBuilder(properties_file).build(
+                                                    {'items': lambda offset, limit: entries[offset:offset + limit]})
+        handler = SessionMenuHandler(menu, self.callbacks)
+        cursor = handler.new_cursor()
+        handler.forward(cursor)
+        handler.next(cursor)
+        handler.forward(cursor)
+        handler.previous(cursor)
+        loaded = handler.load_cursor(handler.dump_cursor(cursor))
+        self.assertEqual(loaded.location, [0, 1, 69])
+        self.assertEqual(handler.get_current_location(loaded), 'Entry 69')
+        for location in ('000000000100000046000000', '000000000000000000000000'):
+            self.assertRaises(ValueError, handler.load_cursor, binascii.unhexlify(location))
+
+    def test_server_rejects_invalid_cursor(self):
+        server = self.make_server()
+        self.assertRaises(ValueError, server.dispatch, 's', 'load', 'ffffffff')
+        self.assertEqual(server.dispatch('s', 'load', '0100000000000000'), 'OK D')
+
+    def test_least_recently_used_session_is_forgotten(self):
+        server = self.make_server(max_sessions=2)
+        server.dispatch('a', 'next')
+        server.dispatch('b', 'next')
+        server.dispatch('a', 'current')
+        server.dispatch('c', 'next')
+        self.assertEqual(server.session_count, 2)
+        self.assertEqual(server.dispatch('a', 'current'), 'OK menu 2')
+        self.assertEqual(server.dispatch('b', 'current'), 'OK menu 1')
+
+    def test_idle_session_expires(self):
+        clock = Clock()
+        server = self.make_server(session_ttl=10, clock=clock)
+        server.dispatch('a', 'next')
+        clock.now = 5
+        server.dispatch('b', 'next')
+        clock.now = 12
+        server.dispatch('b', 'current')
+        self.assertEqual(server.session_count, 1)
+        self.assertEqual(server.dispatch('a', 'current'), 'OK menu 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
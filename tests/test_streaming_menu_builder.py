@@ -0,0 +1,134 @@
+from ConfigParser import NoOptionError
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from simple_menu.builders.PropertiesMenuBuilder import PropertiesMenuBuilder
+from simple_menu.builders.StreamingMenuBuilder import StreamingMenuBuilder
+
+
+TWO_LEVELS = u"""# comment
+; comment
+rem comment
+REM comment
+[menu 1] ; comment
+a.label = A ; comment
+a.callback = A_CALLBACK
+B.Label = B;not a comment
+c.dynamic = true
+d.label = first
+ second
+
+  third
+e.label = ""
+[DEFAULT]
+z.label = Default
+a.label = Default A
+[menu 2]
+f.label : F
+f.callback = F_CALLBACK
+z.callback = Z_CALLBACK
+[menu 1]
+g.label = G \xe9
+[default_settings]
+callback = ROOT
+"""
+
+
+class StreamingMenuBuilderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='simple_menu_test')
+        self.properties_file = os.path.join(self.work_dir, 'menu.properties')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def parse(self, properties):
+        with open(self.properties_file, 'w') as f:
+            f.write(properties.encode('utf-8'))
+        return StreamingMenuBuilder(self.properties_file).build_template()
+
+    def assertError(self, properties, lineno):
+        with self.assertRaises(ValueError) as context:
+            self.parse(properties)
+        self.assertTrue(str(context.exception).startswith('%s:%d: ' % (self.properties_file, lineno,)),
+                        str(context.exception))
+
+    def test_same_template_as_properties_builder(self):
+        template = self.parse(TWO_LEVELS)
+        self.assertEqual(template, PropertiesMenuBuilder(self.properties_file).build_template())
+        self.assertEqual(template.roots[0][3][0], ('z', 'Default', None, None,))
+        self.assertEqual(template.roots[0][3][1], ('a', 'A', 'A_CALLBACK', None,))
+        self.assertEqual(template.roots[0][3][4][1], 'first\nsecond\nthird')
+
+    def test_default_root_callback(self):
+        properties = u"[DEFAULT]\ncallback = ROOT\n[menu]\na.label = A\n[default_settings]\n"
+        template = self.parse(properties)
+        self.assertEqual(template.callback, 'ROOT')
+        self.assertEqual(template, PropertiesMenuBuilder(self.properties_file).build_template())
+
+    def test_non_ascii_names(self):
+        properties = (u"[men\xfc]\ncaf\xe9.label = Caf\xe9\ncaf\xe9.callback = CAF\xc9\n"
+                      u"th\xe9.dynamic = true\n[default_settings]\ncallback = ROOT\n")
+        template = self.parse(properties)
+        self.assertEqual(template, PropertiesMenuBuilder(self.properties_file).build_template())
+        self.assertEqual(template.roots[0][0], u'men\xfc'.encode('utf-8'))
+        self.assertEqual(template.roots[0][3], ((u'caf\xe9', u'Caf\xe9'.encode('utf-8'), u'CAF\xc9', None,),
+                                                (u'th\xe9',),))
+        self.assertEqual(type(template.roots[0][3][0][0]), unicode)
+
+        builder = StreamingMenuBuilder(self.properties_file)
+        menu = builder.build({u'th\xe9': [(u'Item', None)]})
+        self.assertEqual(menu, PropertiesMenuBuilder(self.properties_file).build({u'th\xe9': [(u'Item', None)]}))
+        self.assertEqual(menu.sections[0].sections[1].name, u'th\xe90')
+
+    def test_missing_default_callback(self):
+        properties = u"[menu]\na.label = A\n[default_settings]\n"
+        self.assertRaises(NoOptionError, self.parse, properties)
+        self.assertRaises(NoOptionError, PropertiesMenuBuilder(self.properties_file).build_template)
+        self.assertEqual(self.parse(u"[menu]\na.label = A\n").callback, None)
+
+    def test_nested_sections(self):
+        template = self.parse(u"[menu]\n"
+                              u"a.b.c.label = C\n"
+                              u"a.label = A\n"
+                              u"a.b.items.dynamic = true\n"
+                              u"a.b.d.callback = D\n"
+                              u"  continued\n"
+                              u"e.label = E\n")
+        self.assertEqual(template.roots,
+                         (('menu', None, None, (('a', 'A', None, (('b', None, None, (('c', 'C', None, None,),
+                                                                                     ('items',),
+                                                                                     ('d', None, 'D\ncontinued',
+                                                                                      None,),),),),),
+                                                ('e', 'E', None, None,),),),))
+
+    def test_nested_defaults(self):
+        template = self.parse(u"[DEFAULT]\n"
+                              u"a.b.label = Default B\n"
+                              u"a.c.label = Default C\n"
+                              u"[menu]\n"
+                              u"a.d.label = D\n"
+                              u"a.c.label = C\n")
+        self.assertEqual(template.roots[0][3],
+                         (('a', None, None, (('b', 'Default B', None, None,),
+                                             ('c', 'C', None, None,),
+                                             ('d', 'D', None, None,),),),))
+
+    def test_errors_report_their_line(self):
+        self.assertError(u"[menu]\na.label = A\nnot an option\n", 3)
+        self.assertError(u"[menu\na.label = A\n", 1)
+        self.assertError(u"a.label = A\n[menu]\n", 1)
+        self.assertError(u"[menu]\n continued\n", 2)
+        self.assertError(u"[menu]\na.label = A\nlabel = B\n", 3)
+        self.assertError(u"[menu]\na..label = A\n", 2)
+        self.assertError(u"[menu 1]\na.label = A\n[menu 2]\n[default_settings]\ncallback = ROOT\n", 3)
+
+
+if __name__ == '__main__':
+    unittest.main()